@@ -1,19 +1,33 @@
+import asyncio
 import json
-import time
-import websocket
+import aiohttp
 from datetime import datetime, timedelta
 from news_listener import (
     logger,
-    SAVE_DIR,
-    handle_news,
     send_error_notification,
-    initialize_webull
+    initialize_market_data,
+    enqueue_news,
+    start_ingest_workers,
+    get_ingest_stats,
+    monitor_scheduler,
+    webull_breaker,
+    get_cache_stats,
+    start_scheduler,
+    resume_monitoring,
+    start_quote_stream,
+    headline_prescorer,
+    ROUTE_DROP,
+    metrics,
+    start_metrics_server,
+    start_llm_summary,
+    telegram_dispatcher,
+    news_event_store
 )
 
 # 글로벌 변수로 마지막 메시지 시간 기록
 last_message_time = None
 
-def on_message(ws, message):
+async def on_message(ws, message):
     """웹소켓 메시지 수신 처리"""
     global last_message_time
     
@@ -26,7 +40,15 @@ def on_message(ws, message):
             last_message_time = datetime.now()
             payload = data.get("payload", {})
             k_value = payload.get("k", "")
-            logger.info(f"🔄 핑퐁 수신... {k_value} {datetime.now().strftime('%H:%M:%S')}")
+            stats = get_ingest_stats()
+            monitor_stats = monitor_scheduler.get_stats()
+            cache_stats = get_cache_stats()
+            logger.info(f"🔄 핑퐁 수신... {k_value} {datetime.now().strftime('%H:%M:%S')} "
+                        f"(큐: {stats['depth']}/{stats['capacity']}, 대기 p95: {stats['wait_p95']:.2f}s, "
+                        f"활성 모니터링 창: {monitor_stats['active_windows']}개, 수집 지연 p95: {monitor_stats['lateness_p95']:.2f}s, "
+                        f"Webull 브레이커: {webull_breaker.state}, "
+                        f"분석 캐시 적중률: {cache_stats['hit_rate']:.0%}, 절약 토큰: {cache_stats['saved_tokens']:,}, "
+                        f"LLM 누적 비용: ${metrics.get_snapshot()['counters'].get('llm_cost_usd_total', 0.0):.4f})")
             
         elif message_type == "news":
             # 뉴스 수신 시 시간 기록
@@ -48,30 +70,38 @@ def on_message(ws, message):
                 logger.info(f"🚫 낮은 품질 뉴스 필터링됨 (임팩트: {impact_score}, 감정: {sentiment_score}): {payload.get('title', 'Unknown')}")
                 return
             
-            # 필터링 통과한 뉴스만 처리
-            filepath = handle_news(data, SAVE_DIR)
-            logger.info(f"📰 뉴스 처리 완료 (임팩트: {impact_score}, 감정: {sentiment_score}): {filepath}")
+            # 로컬 사전 점수로 GPT 호출 경로 결정 (버림/저가 모델/전체 모델)
+            title = payload.get("news", {}).get("title", "")
+            prescore = headline_prescorer.route(title)
+            if prescore["route"] == ROUTE_DROP:
+                logger.info(f"🚫 사전 점수 낮은 뉴스 필터링됨 (점수: {prescore['score']:.3f}): {title}")
+                return
+            data["prescore"] = prescore
+            
+            # 필터링 통과한 뉴스만 처리 큐에 등록 (처리는 워커 스레드에서)
+            if enqueue_news(data):
+                logger.info(f"📥 뉴스 큐 등록 (임팩트: {impact_score}, 감정: {sentiment_score}, 경로: {prescore['route']}): {payload.get('title', 'Unknown')}")
             
         else:
             error_msg = f"알 수 없는 메시지 타입: {message_type}"
             logger.error(f"❌ {error_msg}")
-            send_error_notification("알 수 없는 메시지 타입", f"{error_msg}\n\n전체 데이터: {str(data)[:500]}...")
+            await send_error_notification("알 수 없는 메시지 타입", f"{error_msg}\n\n전체 데이터: {str(data)[:500]}...")
             
     except json.JSONDecodeError as e:
         logger.error(f"❌ JSON 파싱 실패: {e}")
     except Exception as e:
         logger.error(f"❌ 메시지 처리 오류: {e}")
-        send_error_notification("메시지 처리 오류", str(e))
+        await send_error_notification("메시지 처리 오류", str(e))
 
-def on_error(ws, error):
+async def on_error(ws, error):
     """웹소켓 에러 처리"""
     logger.error(f"🔌 WebSocket 에러: {error}")
-    send_error_notification("WebSocket 에러", str(error))
+    await send_error_notification("WebSocket 에러", str(error))
 
-def on_close(ws, close_status_code, close_msg):
+async def on_close(ws, close_status_code, close_msg):
     """웹소켓 연결 종료 처리"""
     logger.error("🔌 WebSocket 연결 끊어짐")
-    send_error_notification("WebSocket 연결 끊어짐", f"코드: {close_status_code}, 메시지: {close_msg}")
+    await send_error_notification("WebSocket 연결 끊어짐", f"코드: {close_status_code}, 메시지: {close_msg}")
 
 def on_open(ws):
     """웹소켓 연결 성공 처리"""
@@ -79,7 +109,7 @@ def on_open(ws):
     last_message_time = datetime.now()
     logger.info("🔌 WebSocket 연결 성공")
 
-def main():
+async def main():
     """
     메인 실행 함수
     """
@@ -87,27 +117,48 @@ def main():
     
     logger.info("🚀 StockTitan 웹소켓 리스너 시작")
     
-    # Webull 초기화
-    initialize_webull()
+    # 헤드라인 사전 점수 모델 로드 (없으면 모든 뉴스를 전체 모델로 분석)
+    headline_prescorer.load()
+    
+    # 시세 제공자 초기화 (기본: Webull)
+    await initialize_market_data()
+    
+    # 뉴스 처리 워커, 모니터링 스케줄러, 스트리밍 시세 시작
+    start_ingest_workers()
+    start_scheduler()
+    await start_quote_stream()
+
+    # 재시작 전 진행 중이던 모니터링 창과 저장소에 쓰지 못한 이벤트 복원
+    await resume_monitoring()
+    news_event_store.recover()
+    
+    # 메트릭 HTTP 서버(METRICS_PORT)와 주기적 LLM 호출 요약 로그
+    await start_metrics_server()
+    start_llm_summary()
     
     # 웹소켓 연결
     websocket_url = "wss://ws1.stocktitan.net:9011/"
     
     logger.info(f"🔌 웹소켓 연결 시도: {websocket_url}")
     
-    # 웹소켓 클라이언트 생성
-    ws = websocket.WebSocketApp(
-        websocket_url,
-        on_open=on_open,
-        on_message=on_message,
-        on_error=on_error,
-        on_close=on_close
-    )
-    
-    # 연결 시작
-    ws.run_forever()
+    # 웹소켓 클라이언트 생성 및 수신 루프
+    async with aiohttp.ClientSession() as session:
+        async with session.ws_connect(websocket_url) as ws:
+            on_open(ws)
+            
+            while True:
+                msg = await ws.receive()
+                if msg.type == aiohttp.WSMsgType.TEXT:
+                    await on_message(ws, msg.data)
+                elif msg.type == aiohttp.WSMsgType.ERROR:
+                    await on_error(ws, ws.exception())
+                    break
+                elif msg.type in (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSING, aiohttp.WSMsgType.CLOSED):
+                    break
+            
+            await on_close(ws, ws.close_code, msg.extra)
 
-def run_with_auto_restart():
+async def run_with_auto_restart():
     """
     자동 재시작 기능이 있는 메인 실행 함수
     """
@@ -120,34 +171,42 @@ def run_with_auto_restart():
             
             # 재시작 알림 (첫 시작이 아닌 경우)
             if restart_count > 0:
-                send_error_notification(
+                await send_error_notification(
                     "시스템 재시작", 
                     f"뉴스 리스너가 자동으로 재시작되었습니다. (재시작 횟수: {restart_count})"
                 )
             
-            main()
+            await main()
             
-        except KeyboardInterrupt:
+        except (KeyboardInterrupt, asyncio.CancelledError):
             logger.info("👋 사용자에 의해 종료됨")
-            send_error_notification("시스템 종료", "사용자에 의해 뉴스 리스너가 종료되었습니다.")
+            await send_error_notification("시스템 종료", "사용자에 의해 뉴스 리스너가 종료되었습니다.")
             break
             
         except Exception as e:
             restart_count += 1
             error_msg = f"메인 프로세스 오류: {e}"
             logger.error(f"❌ {error_msg}")
-            send_error_notification("메인 프로세스 오류", f"{error_msg}\n\n{restart_count}/{max_restarts} 재시작 시도 중...")
+            await send_error_notification("메인 프로세스 오류", f"{error_msg}\n\n{restart_count}/{max_restarts} 재시작 시도 중...")
             
             if restart_count < max_restarts:
                 logger.info("⏰ 10초 후 재시작...")
-                time.sleep(10)
+                await asyncio.sleep(10)
             else:
                 logger.error(f"❌ 최대 재시작 횟수({max_restarts}) 초과. 프로그램 종료.")
-                send_error_notification(
+                await send_error_notification(
                     "시스템 완전 종료", 
                     f"최대 재시작 횟수({max_restarts})를 초과하여 뉴스 리스너가 완전히 종료되었습니다."
                 )
                 break
+    
+    # 종료 전 체크포인트/이벤트 저장소와 발송 큐에 남은 알림 정리
+    await monitor_scheduler.flush_checkpoint()
+    await news_event_store.close()
+    await telegram_dispatcher.close()
 
 if __name__ == "__main__":
-    run_with_auto_restart()
\ No newline at end of file
+    try:
+        asyncio.run(run_with_auto_restart())
+    except KeyboardInterrupt:
+        logger.info("👋 사용자에 의해 종료됨")
\ No newline at end of file
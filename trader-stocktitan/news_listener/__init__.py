@@ -19,34 +19,191 @@ from .config import (
 
 from .llm_analyzer import (
     analyze_news_with_gpt,
+    EarlyFieldParser,
     predict_price_with_gpt,
     analyze_prediction_accuracy_with_gpt,
     analyze_price_movement_with_gpt
 )
 
+from .token_budget import (
+    count_tokens,
+    strip_boilerplate,
+    fit_to_budget
+)
+
+from .llm_client import (
+    chat_completion,
+    chat_completion_with_usage,
+    llm_gate,
+    PriorityGate,
+    PRIORITY_CRITICAL,
+    PRIORITY_NORMAL,
+    PRIORITY_BACKGROUND
+)
+
+from .llm_metrics import (
+    record_completion,
+    record_outcome,
+    estimate_cost,
+    get_llm_summary,
+    format_llm_summary,
+    start_llm_summary
+)
+
+from .metrics import (
+    start_metrics_server,
+    render_prometheus
+)
+
+from .llm_scheduler import (
+    retrospective_scheduler,
+    RetrospectiveScheduler,
+    deferred_completion
+)
+
+from .llm_cache import (
+    LLMResultCache,
+    analysis_cache,
+    news_cache_key,
+    get_cache_stats
+)
+
 from .webull_client import (
     initialize_webull,
+    warm_up_ticker_ids,
+    webull_breaker,
+    webull_limiter
+)
+
+from .ticker_cache import (
+    TickerIdCache,
+    ticker_ids,
+    load_universe
+)
+
+from .market_data import (
+    MarketDataProvider,
+    WebullProvider,
+    get_provider,
+    set_provider,
+    initialize_market_data,
     get_historical_data,
-    get_realtime_data
+    get_realtime_data,
+    get_realtime_data_batch
+)
+
+from .simulator import (
+    SimulatorProvider,
+    run_load_test
+)
+
+from .prescorer import (
+    HeadlinePrescorer,
+    headline_prescorer,
+    headline_features,
+    ROUTE_DROP,
+    ROUTE_CHEAP,
+    ROUTE_FULL
+)
+
+from .rate_limiter import (
+    TokenBucket,
+    CircuitBreaker,
+    CircuitOpenError,
+    RateLimiter
+)
+
+from .bar_cache import (
+    BarCache,
+    bar_history
+)
+
+from .quote_cache import (
+    QuoteSnapshot,
+    quote_snapshot
+)
+
+from .quote_stream import (
+    BarAggregator,
+    FakeQuoteStream,
+    WebullQuoteStream,
+    StreamingQuoteService,
+    streaming_quotes,
+    start_quote_stream
+)
+
+from .telegram_dispatcher import (
+    TelegramDispatcher,
+    telegram_dispatcher
+)
+
+from .error_digest import (
+    ErrorCoalescer
+)
+
+from .live_alert import (
+    LiveAlert
 )
 
 from .telegram_notifier import (
     send_error_notification,
+    error_coalescer,
     send_final_result_notification,
     send_monitoring_completion_notification,
-    send_historical_analysis_notification
+    send_historical_analysis_notification,
+    send_preliminary_analysis_notification,
+    send_price_move_alert,
+    update_live_price
 )
 
 from .price_monitor import (
-    monitor_price_thread,
-    update_csv_with_price_data,
-    start_monitoring_threads
+    load_history,
+    predict_and_save,
+    monitor_price_task,
+    finish_post_news_window,
+    check_price_move_alert,
+    on_window_sample,
+    store_event,
+    start_monitoring_window,
+    resume_monitoring
+)
+
+from .event_record import (
+    EventRecord
+)
+
+from .news_event import (
+    NewsEvent
+)
+
+from .event_store import (
+    EventStore,
+    news_event_store,
+    read_events,
+    migrate_legacy_files
+)
+
+from .checkpoint import (
+    save_checkpoint,
+    load_checkpoint
+)
+
+from .scheduler import (
+    MonitorWindow,
+    monitor_scheduler,
+    start_scheduler
 )
 
 from .news_handler import (
     handle_news
 )
 
+from .ingest_queue import (
+    enqueue_news,
+    start_ingest_workers,
+    get_ingest_stats
+)
+
 __version__ = "1.0.0"
 __author__ = "News Listener Team"
 
@@ -65,26 +222,158 @@ __all__ = [
     
     # LLM Analyzer
     "analyze_news_with_gpt",
+    "EarlyFieldParser",
     "predict_price_with_gpt", 
     "analyze_prediction_accuracy_with_gpt",
     "analyze_price_movement_with_gpt",
+
+    # Token Budget
+    "count_tokens",
+    "strip_boilerplate",
+    "fit_to_budget",
+
+    # LLM Client
+    "chat_completion",
+    "chat_completion_with_usage",
+    "llm_gate",
+    "PriorityGate",
+    "PRIORITY_CRITICAL",
+    "PRIORITY_NORMAL",
+    "PRIORITY_BACKGROUND",
+
+    # LLM Metrics
+    "record_completion",
+    "record_outcome",
+    "estimate_cost",
+    "get_llm_summary",
+    "format_llm_summary",
+    "start_llm_summary",
+
+    # Metrics
+    "start_metrics_server",
+    "render_prometheus",
+
+    # LLM Scheduler
+    "retrospective_scheduler",
+    "RetrospectiveScheduler",
+    "deferred_completion",
+
+    # LLM Cache
+    "LLMResultCache",
+    "analysis_cache",
+    "news_cache_key",
+    "get_cache_stats",
     
     # Webull Client
     "initialize_webull",
+    "warm_up_ticker_ids",
+    "webull_breaker",
+    "webull_limiter",
+
+    # Ticker Cache
+    "TickerIdCache",
+    "ticker_ids",
+    "load_universe",
+
+    # Market Data
+    "MarketDataProvider",
+    "WebullProvider",
+    "get_provider",
+    "set_provider",
+    "initialize_market_data",
     "get_historical_data",
     "get_realtime_data",
+    "get_realtime_data_batch",
+
+    # Simulator
+    "SimulatorProvider",
+    "run_load_test",
+
+    # Prescorer
+    "HeadlinePrescorer",
+    "headline_prescorer",
+    "headline_features",
+    "ROUTE_DROP",
+    "ROUTE_CHEAP",
+    "ROUTE_FULL",
+
+    # Rate Limiter
+    "TokenBucket",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "RateLimiter",
+
+    # Bar Cache
+    "BarCache",
+    "bar_history",
+
+    # Quote Snapshot
+    "QuoteSnapshot",
+    "quote_snapshot",
+
+    # Quote Stream
+    "BarAggregator",
+    "FakeQuoteStream",
+    "WebullQuoteStream",
+    "StreamingQuoteService",
+    "streaming_quotes",
+    "start_quote_stream",
     
+    # Telegram Dispatcher
+    "TelegramDispatcher",
+    "telegram_dispatcher",
+
+    # Live Alert
+    "LiveAlert",
+
     # Telegram Notifier
+    "ErrorCoalescer",
+    "error_coalescer",
     "send_error_notification",
     "send_final_result_notification", 
     "send_monitoring_completion_notification",
     "send_historical_analysis_notification",
+    "send_preliminary_analysis_notification",
+    "send_price_move_alert",
+    "update_live_price",
     
     # Price Monitor
-    "monitor_price_thread",
-    "update_csv_with_price_data",
-    "start_monitoring_threads",
+    "load_history",
+    "predict_and_save",
+    "monitor_price_task",
+    "finish_post_news_window",
+    "check_price_move_alert",
+    "on_window_sample",
+    "store_event",
+    "start_monitoring_window",
+    "resume_monitoring",
+
+    # Event Record
+    "EventRecord",
+
+    # News Event
+    "NewsEvent",
+
+    # Event Store
+    "EventStore",
+    "news_event_store",
+    "read_events",
+    "migrate_legacy_files",
+
+    # Checkpoint
+    "save_checkpoint",
+    "load_checkpoint",
+
+    # Scheduler
+    "MonitorWindow",
+    "monitor_scheduler",
+    "start_scheduler",
     
     # News Handler
-    "handle_news"
+    "handle_news",
+
+    # Ingest Queue
+    "enqueue_news",
+    "start_ingest_workers",
+    "get_ingest_stats"
 ]
@@ -0,0 +1,161 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict
+import numpy as np
+from .config import logger, BAR_CACHE_CAPACITY, BAR_CACHE_TTL, BAR_CACHE_MAX_SYMBOLS
+from . import metrics
+
+def minute_floor(ts: float) -> float:
+    """epoch 초를 분 시작 시각으로 내립니다."""
+    return math.floor(ts / 60) * 60
+
+class SymbolBars:
+    """
+    종목 하나의 1분봉 링 버퍼 (봉 시작 시각/종가/거래량을 NumPy 배열에 보관)
+    """
+    __slots__ = ("times", "closes", "volumes", "start", "size", "complete_until", "exhausted", "touched_at")
+
+    def __init__(self, capacity: int = BAR_CACHE_CAPACITY):
+        self.times = np.full(capacity, np.nan)
+        self.closes = np.full(capacity, np.nan)
+        self.volumes = np.full(capacity, np.nan)
+        self.start = 0
+        self.size = 0
+        self.complete_until = 0.0  # 이 시각 이전에 시작한 봉은 확정됨 (마지막 조회 시점의 분 시작)
+        self.exhausted = False     # 업스트림에 더 오래된 봉이 없음
+        self.touched_at = time.monotonic()
+
+    @property
+    def capacity(self) -> int:
+        return len(self.times)
+
+    def reset(self):
+        self.start = 0
+        self.size = 0
+        self.exhausted = False
+
+    def _order(self) -> np.ndarray:
+        """오래된 순 버퍼 인덱스"""
+        return (self.start + np.arange(self.size)) % self.capacity
+
+    def append(self, bar_time: float, close: float, volume: float):
+        """봉 하나를 추가합니다. 같은 분이면 덮어쓰고 (진행 중이던 봉 갱신), 더 오래된 봉은 무시합니다."""
+        if self.size:
+            last = (self.start + self.size - 1) % self.capacity
+            if bar_time == self.times[last]:
+                self.closes[last] = close
+                self.volumes[last] = volume
+                return
+            if bar_time < self.times[last]:
+                return
+
+        index = (self.start + self.size) % self.capacity
+        self.times[index] = bar_time
+        self.closes[index] = close
+        self.volumes[index] = volume
+        if self.size < self.capacity:
+            self.size += 1
+        else:
+            self.start = (self.start + 1) % self.capacity
+
+    def count_before(self, end_minute: float) -> int:
+        """end_minute 이전에 시작한 봉 수"""
+        return int(np.count_nonzero(self.times[self._order()] < end_minute))
+
+    def window(self, end_minute: float, minutes: int) -> tuple:
+        """end_minute 이전에 시작한 마지막 minutes개 봉을 (times, closes, volumes) 배열로 반환합니다."""
+        order = self._order()
+        order = order[self.times[order] < end_minute][-minutes:]
+        return self.times[order], self.closes[order], self.volumes[order]
+
+class BarCache:
+    """
+    종목별 1분봉 공유 캐시
+
+    같은 종목의 반복/겹치는 히스토리 요청은 캐시에서 응답하고, 업스트림에서는 아직 없는 최근 구간만 가져옵니다.
+    오래 쓰이지 않은 종목은 TTL로, 종목 수가 상한을 넘으면 LRU로 제거합니다.
+    """
+
+    def __init__(self, ttl: float = BAR_CACHE_TTL, max_symbols: int = BAR_CACHE_MAX_SYMBOLS,
+                 capacity: int = BAR_CACHE_CAPACITY):
+        self.ttl = ttl
+        self.max_symbols = max_symbols
+        self.capacity = capacity
+        self._entries = OrderedDict()  # symbol -> SymbolBars
+        self._locks = {}
+
+    def lock(self, symbol: str) -> asyncio.Lock:
+        """종목별 조회 잠금 (동시 요청은 한 번의 업스트림 조회를 공유)"""
+        if symbol not in self._locks:
+            self._locks[symbol] = asyncio.Lock()
+        return self._locks[symbol]
+
+    def get(self, symbol: str):
+        """캐시된 종목 봉 버퍼를 반환합니다. 없거나 만료됐으면 None"""
+        entry = self._entries.get(symbol)
+        if entry is None:
+            return None
+        if time.monotonic() - entry.touched_at > self.ttl:
+            self._remove(symbol)
+            return None
+        entry.touched_at = time.monotonic()
+        self._entries.move_to_end(symbol)
+        return entry
+
+    def missing_count(self, entry, end_minute: float, minutes: int, now: float) -> tuple:
+        """
+        (업스트림에서 가져올 봉 수, 전체 재조회 여부)를 계산합니다. 캐시만으로 충분하면 (0, False)
+        """
+        now_minute = minute_floor(now)
+        full_count = min(self.capacity, minutes + int((now_minute - end_minute) // 60) + 1)
+
+        if entry is None or (entry.count_before(end_minute) < minutes and not entry.exhausted):
+            return full_count, True
+        if entry.complete_until >= end_minute:
+            return 0, False
+
+        # 마지막으로 확정된 분부터 현재 진행 중인 봉까지만 가져옴
+        tail_count = int((now_minute - entry.complete_until) // 60) + 1
+        if tail_count >= full_count:
+            return full_count, True
+        return tail_count, False
+
+    def store(self, symbol: str, times: np.ndarray, closes: np.ndarray, volumes: np.ndarray,
+              fetched_at: float, requested: int, full: bool) -> SymbolBars:
+        """업스트림에서 가져온 봉들을 종목 버퍼에 병합합니다."""
+        entry = self._entries.get(symbol)
+        if entry is None:
+            entry = SymbolBars(self.capacity)
+            self._entries[symbol] = entry
+        if full:
+            entry.reset()
+            entry.exhausted = len(times) < requested
+
+        for bar_time, close, volume in zip(times.tolist(), closes.tolist(), volumes.tolist()):
+            entry.append(bar_time, close, volume)
+
+        entry.complete_until = minute_floor(fetched_at)
+        entry.touched_at = time.monotonic()
+        self._entries.move_to_end(symbol)
+        self._evict()
+        return entry
+
+    def _remove(self, symbol: str):
+        self._entries.pop(symbol, None)
+        lock = self._locks.get(symbol)
+        if lock is not None and not lock.locked():
+            del self._locks[symbol]
+
+    def _evict(self):
+        now = time.monotonic()
+        for symbol in [s for s, entry in self._entries.items() if now - entry.touched_at > self.ttl]:
+            self._remove(symbol)
+        while len(self._entries) > self.max_symbols:
+            symbol = next(iter(self._entries))
+            self._remove(symbol)
+            logger.debug(f"🧹 1분봉 캐시 LRU 제거: {symbol}")
+        metrics.set_gauge("bar_cache_symbols", len(self._entries))
+
+# 프로세스 전역 1분봉 캐시
+bar_history = BarCache()
@@ -0,0 +1,147 @@
+import json
+import math
+import os
+import tempfile
+import time
+from .config import logger, MONITOR_CHECKPOINT_PATH
+from .event_record import EventRecord
+from .news_event import NewsEvent
+from .live_alert import LiveAlert
+
+CHECKPOINT_VERSION = 3
+
+def _slots_to_list(slots, count: int = None) -> list:
+    """배열 슬롯을 JSON 리스트로 변환합니다. (NaN은 null, 값은 짧게 반올림)"""
+    values = slots if count is None else slots[:count]
+    return [None if math.isnan(v) else round(v, 6) for v in values]
+
+def _list_to_slots(slots, values: list):
+    for i, value in enumerate(values[:len(slots)]):
+        slots[i] = math.nan if value is None else value
+
+def serialize_window(window) -> dict:
+    """진행 중인 모니터링 창의 상태를 체크포인트 항목으로 변환합니다. (뉴스 원문/분석은 문맥 기록에 따로 저장)"""
+    event = window.event
+    record = event.record
+    return {
+        "event_id": record.event_id,
+        "symbol": record.symbol,
+        "market_cap": record.market_cap,
+        "news_flag": record.news_flag,
+        "llm_rating": record.llm_rating,
+        "news_ts": window.news_ts,
+        "minutes": window.minutes,
+        "samples": window.samples,
+        "history_done": window.history_done,
+        "alert": event.alert.to_dict() if event.alert is not None else None,
+        "pct_m": _slots_to_list(record.pct_m),
+        "volume_m": _slots_to_list(record.volume_m),
+        "pct_p": _slots_to_list(record.pct_p, window.samples),
+        "volume_p": _slots_to_list(record.volume_p, window.samples),
+        "ts_p": _slots_to_list(record.ts_p, window.samples),
+        "lag_p": _slots_to_list(record.lag_p, window.samples)
+    }
+
+def serialize_context(event: NewsEvent) -> dict:
+    """뉴스 이벤트의 문맥(뉴스 원문, 분석, 사전 점수, 예측)을 문맥 기록 한 줄로 변환합니다."""
+    return {
+        "event_id": event.event_id,
+        "news": event.news,
+        "llm_result": event.llm_result,
+        "prescore": event.prescore,
+        "prediction": event.prediction
+    }
+
+def restore_record(entry: dict) -> EventRecord:
+    """체크포인트 항목에서 이벤트 레코드를 복원합니다."""
+    record = EventRecord(entry["event_id"], entry["symbol"], entry["market_cap"], entry["llm_rating"], entry["news_flag"])
+    for name in ("pct_m", "volume_m", "pct_p", "volume_p", "ts_p", "lag_p"):
+        _list_to_slots(getattr(record, name), entry.get(name, []))
+    return record
+
+def restore_event(entry: dict) -> NewsEvent:
+    """체크포인트 항목에서 뉴스 이벤트를 복원합니다."""
+    event = NewsEvent(restore_record(entry), entry.get("news"), entry["news_ts"], entry.get("prescore"))
+    event.llm_result = entry.get("llm_result")
+    event.prediction = entry.get("prediction")
+    if entry.get("alert"):
+        event.alert = LiveAlert.from_dict(entry["alert"])
+    return event
+
+def context_path(path: str = MONITOR_CHECKPOINT_PATH) -> str:
+    """체크포인트 파일 옆의 문맥 기록(JSONL) 경로"""
+    return os.path.splitext(path)[0] + "_context.jsonl"
+
+def _write_atomic(path: str, write):
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def _dump_line(f, entry: dict):
+    f.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+def save_checkpoint(entries: list, path: str = MONITOR_CHECKPOINT_PATH):
+    """serialize_window 항목들을 체크포인트 파일에 원자적으로 저장합니다."""
+    data = {
+        "version": CHECKPOINT_VERSION,
+        "saved_at": time.time(),
+        "windows": entries
+    }
+    _write_atomic(path, lambda f: json.dump(data, f, ensure_ascii=False, separators=(",", ":")))
+
+def append_contexts(contexts: list, path: str = MONITOR_CHECKPOINT_PATH):
+    """바뀐 이벤트 문맥을 문맥 기록에 덧붙입니다. (같은 event_id는 마지막 줄이 유효)"""
+    with open(context_path(path), "a", encoding="utf-8") as f:
+        for context in contexts:
+            _dump_line(f, context)
+
+def rewrite_contexts(contexts: list, path: str = MONITOR_CHECKPOINT_PATH):
+    """문맥 기록을 진행 중인 이벤트들의 문맥만으로 다시 씁니다. (완료된 이벤트 줄 정리)"""
+    def write(f):
+        for context in contexts:
+            _dump_line(f, context)
+    _write_atomic(context_path(path), write)
+
+def load_contexts(path: str = MONITOR_CHECKPOINT_PATH) -> dict:
+    """문맥 기록을 event_id별 마지막 문맥으로 읽습니다. (끝이 잘린 줄은 건너뜀)"""
+    contexts = {}
+    if not os.path.exists(context_path(path)):
+        return contexts
+    with open(context_path(path), "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                context = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            contexts[context["event_id"]] = context
+    return contexts
+
+def load_checkpoint(path: str = MONITOR_CHECKPOINT_PATH) -> list:
+    """체크포인트 파일에서 창 항목들을 읽고 이벤트 문맥을 합칩니다. 없거나 손상됐으면 빈 리스트"""
+    if not os.path.exists(path):
+        return []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != CHECKPOINT_VERSION:
+            logger.warning(f"⚠️ 체크포인트 버전 불일치 - 무시: {data.get('version')}")
+            return []
+        entries = data.get("windows", [])
+        contexts = load_contexts(path)
+        for entry in entries:
+            context = contexts.get(entry["event_id"])
+            if context is None:
+                logger.warning(f"⚠️ 이벤트 문맥 없음 - 뉴스 원문 없이 복원: {entry['event_id']}")
+                continue
+            entry.update({key: value for key, value in context.items() if key != "event_id"})
+        return entries
+    except Exception as e:
+        logger.error(f"❌ 체크포인트 읽기 실패: {e}")
+        return []
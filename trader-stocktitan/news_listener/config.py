@@ -1,4 +1,5 @@
 import os
+import json
 import logging
 from datetime import datetime
 from dotenv import load_dotenv
@@ -29,6 +30,48 @@ logger = logging.getLogger(__name__)
 WB_EMAIL = os.getenv("WB_EMAIL")
 WB_PASSWORD = os.getenv("WB_PASSWORD")
 WB_TRADE_PIN = os.getenv("WB_TRADE_PIN")
+WEBULL_EXECUTOR_WORKERS = int(os.getenv("WEBULL_EXECUTOR_WORKERS", "4"))
+
+# Webull 호출 예산 (엔드포인트별 초당 호출 수), 재시도 및 서킷 브레이커 설정
+WEBULL_QUOTE_RATE = float(os.getenv("WEBULL_QUOTE_RATE", "5"))
+WEBULL_BARS_RATE = float(os.getenv("WEBULL_BARS_RATE", "2"))
+WEBULL_TICKER_RATE = float(os.getenv("WEBULL_TICKER_RATE", "2"))
+WEBULL_RATE_BURST = int(os.getenv("WEBULL_RATE_BURST", "5"))
+WEBULL_MAX_CONCURRENCY = int(os.getenv("WEBULL_MAX_CONCURRENCY", "4"))
+WEBULL_MAX_RETRIES = int(os.getenv("WEBULL_MAX_RETRIES", "2"))
+WEBULL_BACKOFF_BASE = float(os.getenv("WEBULL_BACKOFF_BASE", "0.5"))
+WEBULL_BREAKER_THRESHOLD = int(os.getenv("WEBULL_BREAKER_THRESHOLD", "5"))
+WEBULL_BREAKER_COOLDOWN = float(os.getenv("WEBULL_BREAKER_COOLDOWN", "60"))
+
+# 시세 제공자 설정 (webull / simulator)
+MARKET_DATA_PROVIDER = os.getenv("MARKET_DATA_PROVIDER", "webull")
+SIM_SEED = int(os.getenv("SIM_SEED", "0"))
+SIM_CLOCK_SPEED = float(os.getenv("SIM_CLOCK_SPEED", "1"))
+SIM_LATENCY_MS = float(os.getenv("SIM_LATENCY_MS", "0"))
+SIM_ERROR_RATE = float(os.getenv("SIM_ERROR_RATE", "0"))
+
+# 티커 ID 캐시 설정 (TICKER_UNIVERSE: 쉼표로 구분한 종목들 또는 종목 목록 파일 경로)
+TICKER_CACHE_PATH = os.getenv("TICKER_CACHE_PATH", os.path.join(SAVE_DIR, "ticker_ids.json"))
+TICKER_UNIVERSE = os.getenv("TICKER_UNIVERSE", "")
+TICKER_WARMUP_CONCURRENCY = int(os.getenv("TICKER_WARMUP_CONCURRENCY", "2"))
+
+# 시세 스냅샷 설정 (같은 틱 안의 동시 요청 병합 및 배치 조회)
+QUOTE_SNAPSHOT_TTL = float(os.getenv("QUOTE_SNAPSHOT_TTL", "5"))
+QUOTE_BATCH_WINDOW_MS = int(os.getenv("QUOTE_BATCH_WINDOW_MS", "50"))
+QUOTE_BATCH_SIZE = int(os.getenv("QUOTE_BATCH_SIZE", "50"))
+
+# 1분봉 캐시 설정 (종목별 링 버퍼, 유휴 TTL/LRU 제거)
+BAR_CACHE_CAPACITY = int(os.getenv("BAR_CACHE_CAPACITY", "240"))
+BAR_CACHE_TTL = float(os.getenv("BAR_CACHE_TTL", "1800"))
+BAR_CACHE_MAX_SYMBOLS = int(os.getenv("BAR_CACHE_MAX_SYMBOLS", "500"))
+
+# 스트리밍 시세 설정 (QUOTE_MODE=stream 이면 webull 푸시 피드 사용)
+QUOTE_MODE = os.getenv("QUOTE_MODE", "poll")
+QUOTE_STREAM_SOURCE = os.getenv("QUOTE_STREAM_SOURCE", "webull")  # webull / fake
+STREAM_STALE_SECONDS = float(os.getenv("STREAM_STALE_SECONDS", "60"))
+STREAM_BAR_HISTORY = int(os.getenv("STREAM_BAR_HISTORY", "120"))
+STREAM_ALERT_PCT = float(os.getenv("STREAM_ALERT_PCT", "5"))
+FAKE_STREAM_TICK_MS = int(os.getenv("FAKE_STREAM_TICK_MS", "200"))
 
 # 텔레그램 봇 설정 (일반 알림용)
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
@@ -38,16 +81,94 @@ TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
 TELEGRAM_ERROR_BOT_TOKEN = os.getenv("TELEGRAM_ERROR_BOT_TOKEN")
 TELEGRAM_ERROR_CHAT_ID = os.getenv("TELEGRAM_ERROR_CHAT_ID")
 
+# 에러 알림 묶음 창(초) - 같은 유형은 창마다 첫 건만 즉시 보내고 나머지는 요약 (0이면 끔)
+ERROR_COALESCE_WINDOW = float(os.getenv("ERROR_COALESCE_WINDOW", "60"))
+
+# 텔레그램 발송 설정 (채팅별 큐 크기, 채팅별/봇 전역 초당 발송 한도, 재시도, 요청 타임아웃)
+TELEGRAM_QUEUE_SIZE = int(os.getenv("TELEGRAM_QUEUE_SIZE", "500"))
+TELEGRAM_CHAT_RATE = float(os.getenv("TELEGRAM_CHAT_RATE", "1"))
+TELEGRAM_CHAT_BURST = int(os.getenv("TELEGRAM_CHAT_BURST", "3"))
+TELEGRAM_GLOBAL_RATE = float(os.getenv("TELEGRAM_GLOBAL_RATE", "25"))
+TELEGRAM_MAX_RETRIES = int(os.getenv("TELEGRAM_MAX_RETRIES", "3"))
+TELEGRAM_REQUEST_TIMEOUT = float(os.getenv("TELEGRAM_REQUEST_TIMEOUT", "10"))
+
+# 뉴스 알림 방식 (messages: 단계마다 새 메시지, live: 이벤트당 메시지 하나를 editMessageText로 갱신)
+TELEGRAM_ALERT_MODE = os.getenv("TELEGRAM_ALERT_MODE", "messages").lower()
+
+# live 알림 수정 디바운스(초) - 이 시간 동안 들어온 갱신은 한 번의 수정으로 묶음
+TELEGRAM_EDIT_DEBOUNCE = float(os.getenv("TELEGRAM_EDIT_DEBOUNCE", "3"))
+
+# live 알림 현재가 갱신 간격(분) - 분 샘플마다 수정하지 않고 이 간격마다만 반영
+TELEGRAM_LIVE_PRICE_MINUTES = max(1, int(os.getenv("TELEGRAM_LIVE_PRICE_MINUTES", "10")))
+
 # OpenAI 설정
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 GPT_MODEL = os.getenv("GPT_MODEL")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "")
+
+# LLM 호출 설정 (동시 호출 수, 요청당 타임아웃, 429/5xx 재시도, 용도별 전체 마감 시간)
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+LLM_BACKGROUND_MAX_CONCURRENCY = int(os.getenv("LLM_BACKGROUND_MAX_CONCURRENCY", "1"))
+LLM_REQUEST_TIMEOUT = float(os.getenv("LLM_REQUEST_TIMEOUT", "20"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+LLM_ANALYSIS_DEADLINE = float(os.getenv("LLM_ANALYSIS_DEADLINE", "8"))
+LLM_PREDICTION_DEADLINE = float(os.getenv("LLM_PREDICTION_DEADLINE", "15"))
+LLM_REVIEW_DEADLINE = float(os.getenv("LLM_REVIEW_DEADLINE", "30"))
+# 사후 분석 호출 지연 실행 (모아서 실행할 대기 시간/개수, 선택적으로 OpenAI Batch API 사용)
+LLM_DEFER_SECONDS = float(os.getenv("LLM_DEFER_SECONDS", "30"))
+LLM_DEFER_BATCH_SIZE = int(os.getenv("LLM_DEFER_BATCH_SIZE", "20"))
+LLM_BATCH_API = os.getenv("LLM_BATCH_API", "false").lower() in ("1", "true", "yes")
+LLM_BATCH_POLL_SECONDS = float(os.getenv("LLM_BATCH_POLL_SECONDS", "15"))
+LLM_BATCH_MAX_WAIT = float(os.getenv("LLM_BATCH_MAX_WAIT", "3600"))
+
+# LLM 비용/지연 계측 (모델별 100만 토큰당 USD 가격 JSON, 요약 로그 주기)
+LLM_PRICING = json.loads(os.getenv("LLM_PRICING", "{}"))
+LLM_SUMMARY_INTERVAL = float(os.getenv("LLM_SUMMARY_INTERVAL", "600"))
+
+# 프롬프트 입력 예산 (기사 본문 토큰 수 상한) / JSON 스키마 강제 응답
+LLM_INPUT_TOKEN_BUDGET = int(os.getenv("LLM_INPUT_TOKEN_BUDGET", "1500"))
+LLM_STRUCTURED_OUTPUT = os.getenv("LLM_STRUCTURED_OUTPUT", "true").lower() in ("1", "true", "yes")
+# 뉴스 분석 스트리밍 (평점/감성/영향도가 완성되는 즉시 예비 알림)
+LLM_STREAMING = os.getenv("LLM_STREAMING", "true").lower() in ("1", "true", "yes")
+
+# 헤드라인 사전 점수 설정 (로컬 모델 점수로 버림/저가 모델/전체 모델 라우팅)
+PRESCORER_MODEL_PATH = os.getenv("PRESCORER_MODEL_PATH", os.path.join(SAVE_DIR, "prescorer.npz"))
+PRESCORER_DROP_BELOW = float(os.getenv("PRESCORER_DROP_BELOW", "0.1"))
+PRESCORER_FULL_ABOVE = float(os.getenv("PRESCORER_FULL_ABOVE", "0.4"))
+# 버림/저가 모델 경로 뉴스 중 전체 모델로 보내 학습 라벨을 남기는 비율 (탐색)
+PRESCORER_EXPLORE_RATE = float(os.getenv("PRESCORER_EXPLORE_RATE", "0.05"))
+LLM_CHEAP_MODEL = os.getenv("LLM_CHEAP_MODEL", "")
+
+# LLM 결과 캐시 설정 (메모리 LRU + SQLite 디스크 저장소)
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(SAVE_DIR, "llm_cache.sqlite3"))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+LLM_CACHE_MEMORY_SIZE = int(os.getenv("LLM_CACHE_MEMORY_SIZE", "512"))
+
+# 뉴스 처리 큐 설정
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", "100"))
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "4"))
+
+# 가격 모니터링 설정
+MONITOR_MINUTES = int(os.getenv("MONITOR_MINUTES", "60"))
+MONITOR_CHECKPOINT_PATH = os.getenv("MONITOR_CHECKPOINT_PATH", os.path.join(SAVE_DIR, "monitor_checkpoint.json"))
+
+# 뉴스 이벤트 저장소 (날짜별 Parquet) - 배치 크기(건) 또는 최대 대기(초)가 차면 한 번에 씀
+EVENT_STORE_DIR = os.getenv("EVENT_STORE_DIR", os.path.join(SAVE_DIR, "events"))
+EVENT_STORE_BATCH_SIZE = int(os.getenv("EVENT_STORE_BATCH_SIZE", "50"))
+EVENT_STORE_FLUSH_SECONDS = float(os.getenv("EVENT_STORE_FLUSH_SECONDS", "300"))
+
+# 메트릭 HTTP 노출 포트 (/metrics, /metrics.json - 0이면 끔)
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
 
 # 컬럼명 구성 함수
 def generate_columns():
-    """CSV 파일의 컬럼명을 생성합니다."""
+    """기존 이벤트 CSV 파일의 컬럼명을 생성합니다. (event_store migrate에서 사용)"""
     cols = ["symbol", "market_cap", "news_flag", "llm_rating"]
     cols += [f"pct_m{m}" for m in range(60, 0, -1)]
     cols += [f"volume_m{m}" for m in range(60, 0, -1)]
     cols += [f"pct_p{m}" for m in range(1, 61)]
     cols += [f"volume_p{m}" for m in range(1, 61)]
+    cols += [f"ts_p{m}" for m in range(1, 61)]   # 실제 수집 시각 (epoch 초)
+    cols += [f"lag_p{m}" for m in range(1, 61)]  # 목표 시각 대비 지연 (초)
     return cols
@@ -0,0 +1,80 @@
+import asyncio
+import time
+from collections import Counter
+from .config import ERROR_COALESCE_WINDOW
+from . import metrics
+
+class _ErrorGroup:
+    """한 오류 유형의 현재 창 집계 (종목은 세부 정보로만 셈)"""
+    __slots__ = ("started_at", "count", "symbols", "last_message")
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.count = 0
+        self.symbols = Counter()
+        self.last_message = ""
+
+class ErrorCoalescer:
+    """
+    오류 알림 폭주 제어
+
+    오류 유형별로 창의 첫 오류만 바로 보내고, 같은 창 안의 나머지는 종목별로 세기만 합니다.
+    창은 첫 오류 시각부터 window초 동안인 고정(tumbling) 창이며, 오류가 계속 들어와도 늘어나지 않습니다.
+    창이 끝났을 때 묻힌 오류가 있으면 on_summary(error_type, summary)로 요약을 한 번 보냅니다.
+    (예: "Webull 실시간 조회 오류 ×143, 37개 종목, 최근 60초")
+    업스트림 장애로 여러 종목이 한꺼번에 실패해도 유형당 즉시 알림 1건과 요약 1건만 나갑니다.
+    오류 유형별 누적 횟수는 창과 관계없이 유지됩니다.
+    """
+
+    def __init__(self, on_summary, window: float = ERROR_COALESCE_WINDOW):
+        self.on_summary = on_summary
+        self.window = window
+        self._groups = {}
+        self._totals = Counter()
+        self._suppressed = Counter()
+        self._tasks = set()
+
+    def admit(self, error_type: str, error_message: str, symbol: str = "") -> bool:
+        """오류를 기록하고, 지금 바로 알림을 보내야 하면 True를 반환합니다."""
+        self._totals[error_type] += 1
+        metrics.inc_counter("error_notifications_total")
+        if self.window <= 0:
+            return True
+
+        group = self._groups.get(error_type)
+        first = group is None
+        if first:
+            group = self._groups[error_type] = _ErrorGroup()
+            asyncio.get_running_loop().call_later(self.window, self._close, error_type)
+        group.count += 1
+        if symbol:
+            group.symbols[symbol] += 1
+        group.last_message = error_message
+        if not first:
+            self._suppressed[error_type] += 1
+            metrics.inc_counter("error_notifications_suppressed_total")
+        return first
+
+    def _close(self, error_type: str):
+        """창을 닫고, 첫 오류 뒤에 묻힌 오류가 있으면 요약을 보냅니다."""
+        group = self._groups.pop(error_type, None)
+        if group is None or group.count <= 1:
+            return
+        summary = {
+            "count": group.count,
+            "suppressed": group.count - 1,
+            "symbols": len(group.symbols),
+            "top_symbols": [symbol for symbol, _ in group.symbols.most_common(5)],
+            "seconds": time.monotonic() - group.started_at,
+            "last_message": group.last_message
+        }
+        task = asyncio.create_task(self.on_summary(error_type, summary))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def get_stats(self) -> dict:
+        """오류 유형별 누적 횟수와 묻힌 횟수"""
+        return {
+            error_type: {"total": total, "suppressed": self._suppressed[error_type]}
+            for error_type, total in self._totals.most_common()
+        }
@@ -0,0 +1,68 @@
+import math
+from array import array
+
+# 뉴스 전/후 각각 수집하는 분 수 (저장소 스키마 고정)
+WINDOW_MINUTES = 60
+
+def _empty_slots():
+    return array('d', [math.nan] * WINDOW_MINUTES)
+
+def _to_slot(value) -> float:
+    """None이나 숫자가 아닌 값은 NaN으로 저장합니다."""
+    try:
+        return math.nan if value is None else float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+class EventRecord:
+    """
+    뉴스 이벤트 한 건의 분 단위 가격/거래량 슬롯을 메모리에 보관합니다.
+
+    이벤트 루프만 값을 기록하는 단일 작성자 구조이며, 진행 중에는 모니터링 체크포인트에,
+    수집이 끝나면 이벤트 저장소(event_store)에 한 행으로 저장됩니다.
+    """
+    __slots__ = (
+        "event_id", "symbol", "market_cap", "news_flag", "llm_rating",
+        "pct_m", "volume_m", "pct_p", "volume_p", "ts_p", "lag_p"
+    )
+
+    def __init__(self, event_id: str, symbol: str, market_cap, llm_rating, news_flag: int = 1):
+        self.event_id = event_id  # {종목}_{뉴스 발생 시각 YYYY-MM-DD_HH-MM}
+        self.symbol = symbol
+        self.market_cap = market_cap
+        self.news_flag = news_flag
+        self.llm_rating = llm_rating
+        self.pct_m = _empty_slots()
+        self.volume_m = _empty_slots()
+        self.pct_p = _empty_slots()
+        self.volume_p = _empty_slots()
+        self.ts_p = _empty_slots()
+        self.lag_p = _empty_slots()
+
+    def set_before(self, prices, volumes):
+        """
+        뉴스 발생 전 60분 데이터를 기록합니다. (오래된 순)
+
+        마지막 슬롯이 항상 뉴스 직전 분이 되도록 오른쪽 정렬하며,
+        상장 직후처럼 히스토리가 짧으면 앞쪽 슬롯은 NaN으로 남습니다.
+        """
+        n = min(WINDOW_MINUTES, len(prices))
+        offset = WINDOW_MINUTES - n
+        start = len(prices) - n
+        for i in range(n):
+            self.pct_m[offset + i] = _to_slot(prices[start + i])
+            self.volume_m[offset + i] = _to_slot(volumes[start + i])
+
+    def set_after_sample(self, index: int, price, volume, captured_at: float, lateness: float):
+        """뉴스 발생 후 index번째(0부터) 분 샘플을 기록합니다."""
+        if index >= WINDOW_MINUTES:
+            return
+        self.pct_p[index] = _to_slot(price)
+        self.volume_p[index] = _to_slot(volume)
+        self.ts_p[index] = captured_at
+        self.lag_p[index] = lateness
+
+    @staticmethod
+    def values(slots) -> list:
+        """슬롯 값을 리스트로 반환합니다. (NaN은 None)"""
+        return [None if math.isnan(v) else v for v in slots]
@@ -0,0 +1,389 @@
+import argparse
+import asyncio
+import csv
+import glob
+import itertools
+import json
+import math
+import os
+import re
+import tempfile
+import time
+from datetime import datetime
+import numpy as np
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from .config import (
+    logger, SAVE_DIR, EVENT_STORE_DIR, EVENT_STORE_BATCH_SIZE, EVENT_STORE_FLUSH_SECONDS, generate_columns
+)
+from .event_record import EventRecord, WINDOW_MINUTES
+from .news_event import NewsEvent
+from . import metrics
+
+# 분 단위 시계열 열 (길이 WINDOW_MINUTES 고정 배열, 오래된 순)
+SERIES_COLUMNS = {
+    "pct_m": pa.float64(),
+    "volume_m": pa.float64(),
+    "pct_p": pa.float64(),
+    "volume_p": pa.float64(),
+    "ts_p": pa.float64(),
+    "lag_p": pa.float32()
+}
+
+EVENT_SCHEMA = pa.schema([
+    ("event_id", pa.string()),
+    ("symbol", pa.string()),
+    ("news_ts", pa.float64()),
+    ("market_cap", pa.float64()),
+    ("news_flag", pa.int8()),
+    ("llm_rating", pa.int8()),
+    ("sentiment", pa.string()),
+    ("impact", pa.string()),
+    ("title", pa.string()),
+    ("prescore", pa.float32()),
+    ("route", pa.string()),         # 사전 점수 경로 (drop/cheap/full)
+    ("current_price", pa.float64()),
+    ("predicted_price", pa.float64()),
+    ("predicted_change", pa.float32()),
+    ("news", pa.string()),          # JSON
+    ("llm_analysis", pa.string()),  # JSON
+    ("prediction", pa.string())     # JSON
+] + [(name, pa.list_(value_type, WINDOW_MINUTES)) for name, value_type in SERIES_COLUMNS.items()])
+
+# 날짜 파티션 (date=YYYY-MM-DD 폴더, 뉴스 발생 현지 날짜 기준)
+_PARTITIONING = ds.partitioning(pa.schema([("date", pa.string())]), flavor="hive")
+
+_LEGACY_NAME_PATTERN = re.compile(r"^(?P<symbol>.*)_(?P<ts>\d{4}-\d{2}-\d{2}_\d{2}-\d{2})\.csv$")
+
+def _float(value) -> float:
+    """숫자가 아닌 값은 NaN"""
+    try:
+        return math.nan if value is None or value == "" else float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+def _int(value):
+    try:
+        return None if value is None or value == "" else int(value)
+    except (TypeError, ValueError):
+        return None
+
+def _json(value) -> str:
+    return None if value is None else json.dumps(value, ensure_ascii=False)
+
+def event_row(event: NewsEvent) -> dict:
+    """뉴스 이벤트를 저장소의 한 행으로 변환합니다."""
+    record = event.record
+    analysis = event.llm_result or {}
+    prediction = event.prediction or {}
+    prediction_result = prediction.get("prediction") or {}
+    row = {
+        "event_id": record.event_id,
+        "symbol": record.symbol,
+        "news_ts": event.news_ts,
+        "market_cap": _float(record.market_cap),
+        "news_flag": _int(record.news_flag),
+        "llm_rating": _int(record.llm_rating),
+        "sentiment": analysis.get("sentiment"),
+        "impact": analysis.get("impact"),
+        "title": (event.news or {}).get("title"),
+        "prescore": _float(event.prescore.get("score")),
+        "route": event.prescore.get("route"),
+        "current_price": _float(prediction.get("current_price")),
+        "predicted_price": _float(prediction_result.get("predicted_price")),
+        "predicted_change": _float(prediction_result.get("change_percent")),
+        "news": _json(event.news),
+        "llm_analysis": _json(event.llm_result),
+        "prediction": _json(event.prediction)
+    }
+    for name in SERIES_COLUMNS:
+        row[name] = list(getattr(record, name))
+    return row
+
+def _partition_date(row: dict) -> str:
+    return datetime.fromtimestamp(row["news_ts"]).strftime("%Y-%m-%d")
+
+# 쓰기 실패 후 재시도 간격 (초, 실패할 때마다 2배, 최대 FLUSH_RETRY_MAX)
+FLUSH_RETRY_BASE = 5.0
+FLUSH_RETRY_MAX = 300.0
+
+class EventStore:
+    """
+    완료된 뉴스 이벤트의 추가 전용 Parquet 저장소
+
+    - 이벤트는 버퍼에 모았다가 batch_size건이 차거나 flush_seconds초가 지나면
+      날짜 폴더(date=YYYY-MM-DD)마다 Parquet 파일 하나로 한꺼번에 씁니다.
+    - 버퍼에 있는 동안은 _pending.jsonl에도 한 줄씩 덧붙여, 비정상 종료 후 recover()로 복구합니다.
+    - 쓰기에 실패하면 버퍼를 유지하고 지수 백오프 간격으로 다시 씁니다.
+    - 시계열(pct_m/volume_m/pct_p/volume_p/ts_p/lag_p)은 길이 60 고정 실수 배열 열로 저장합니다.
+    """
+
+    def __init__(self, root: str = EVENT_STORE_DIR, batch_size: int = EVENT_STORE_BATCH_SIZE,
+                 flush_seconds: float = EVENT_STORE_FLUSH_SECONDS, retry_base: float = FLUSH_RETRY_BASE):
+        self.root = root
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.retry_base = retry_base
+        self._failures = 0  # 연속 쓰기 실패 횟수 (0보다 크면 재시도 대기 중)
+        self.pending_path = os.path.join(root, "_pending.jsonl")
+        self._buffer = []
+        self._flush_handle = None
+        self._flush_lock = None
+        self._tasks = set()
+        self._seq = itertools.count()
+
+    def append(self, event: NewsEvent):
+        """이벤트를 버퍼에 추가합니다. (실제 파일 쓰기는 모아서 나중에)"""
+        row = event_row(event)
+        os.makedirs(self.root, exist_ok=True)
+        with open(self.pending_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self._buffer.append(row)
+        metrics.inc_counter("event_store_appended_total")
+        self._schedule_flush()
+
+    def recover(self) -> int:
+        """지난 실행에서 Parquet으로 쓰지 못한 버퍼 이벤트를 다시 불러옵니다."""
+        if not os.path.exists(self.pending_path):
+            return 0
+        rows = []
+        with open(self.pending_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rows.append(json.loads(line))
+                except ValueError:
+                    continue  # 쓰다 만 마지막 줄
+        pending_ids = {row["event_id"] for row in self._buffer}
+        self._buffer.extend(row for row in rows if row["event_id"] not in pending_ids)
+        if rows:
+            logger.info(f"♻️ 이벤트 저장소 미저장 이벤트 {len(rows)}건 복구")
+            self._schedule_flush()
+        return len(rows)
+
+    def _schedule_flush(self):
+        metrics.set_gauge("event_store_buffered", len(self._buffer))
+        if len(self._buffer) >= self.batch_size and not self._failures:
+            # 재시도 대기 중에는 배치가 차도 바로 쓰지 않고 예약된 재시도를 기다림
+            self._start_flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.flush_seconds, self._start_flush)
+
+    def _start_flush(self):
+        task = asyncio.create_task(self.flush())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def flush(self):
+        """버퍼의 이벤트를 날짜별 Parquet 파일로 씁니다."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+
+        async with self._flush_lock:
+            if not self._buffer:
+                return
+            rows, self._buffer = self._buffer, []
+            started_at = time.monotonic()
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, self.write_rows, rows)
+            except Exception as e:
+                self._buffer = rows + self._buffer
+                self._failures += 1
+                delay = min(FLUSH_RETRY_MAX, self.retry_base * (2 ** (self._failures - 1)))
+                metrics.inc_counter("event_store_flush_failures_total")
+                logger.error(f"❌ 이벤트 저장소 쓰기 실패 ({len(self._buffer)}건은 {delay:.0f}초 후 다시 시도): {e}")
+                if self._flush_handle is not None:
+                    self._flush_handle.cancel()
+                self._flush_handle = asyncio.get_running_loop().call_later(delay, self._start_flush)
+                return
+            finally:
+                metrics.set_gauge("event_store_buffered", len(self._buffer))
+
+            self._failures = 0
+
+            # 쓰는 동안 새로 들어온 이벤트만 남김
+            self._rewrite_pending()
+            metrics.inc_counter("event_store_written_total", len(rows))
+            metrics.observe("event_store_flush_seconds", time.monotonic() - started_at)
+            logger.info(f"💾 이벤트 저장소에 {len(rows)}건 저장")
+
+    def write_rows(self, rows: list) -> list:
+        """행들을 날짜 폴더별 Parquet 파일로 원자적으로 씁니다. (임시 파일에 쓴 뒤 rename)"""
+        by_date = {}
+        for row in rows:
+            by_date.setdefault(_partition_date(row), []).append(row)
+
+        paths = []
+        for date, date_rows in sorted(by_date.items()):
+            directory = os.path.join(self.root, f"date={date}")
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"part-{int(time.time() * 1000)}-{next(self._seq)}.parquet")
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_", suffix=".parquet")
+            os.close(fd)
+            try:
+                pq.write_table(pa.Table.from_pylist(date_rows, schema=EVENT_SCHEMA), tmp_path, compression="zstd")
+                os.replace(tmp_path, path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            paths.append(path)
+        return paths
+
+    def _rewrite_pending(self):
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=".tmp_", suffix=".jsonl")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            for row in self._buffer:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.pending_path)
+
+    async def close(self):
+        """남은 버퍼를 모두 씁니다. (종료 전, 실패하면 _pending.jsonl에 남아 다음 실행의 recover()가 복구)"""
+        await self.flush()
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+def _to_numpy(table: pa.Table) -> dict:
+    arrays = {}
+    for name in table.column_names:
+        column = table.column(name).combine_chunks()
+        if pa.types.is_fixed_size_list(column.type):
+            arrays[name] = column.flatten().to_numpy(zero_copy_only=False).reshape(len(column), column.type.list_size)
+        elif pa.types.is_integer(column.type):
+            arrays[name] = column.fill_null(0).to_numpy()
+        else:
+            arrays[name] = column.to_numpy(zero_copy_only=False)
+    return arrays
+
+def read_events(start: str = None, end: str = None, columns: list = None, symbols: list = None,
+                root: str = EVENT_STORE_DIR) -> dict:
+    """
+    날짜 범위(YYYY-MM-DD, 양 끝 포함)의 이벤트를 열 이름 → NumPy 배열로 읽습니다.
+
+    시계열 열은 (이벤트 수, 60) 실수 배열, 정수 열의 빈 값은 0, 문자열/JSON 열은 object 배열입니다.
+    같은 event_id가 여러 번 저장됐으면 마지막 것만 남기고, 뉴스 발생 시각 순으로 정렬합니다.
+    """
+    if not os.path.isdir(root):
+        return {}
+    dataset = ds.dataset(root, schema=EVENT_SCHEMA.append(pa.field("date", pa.string())),
+                         format="parquet", partitioning=_PARTITIONING)
+
+    conditions = []
+    if start:
+        conditions.append(ds.field("date") >= start)
+    if end:
+        conditions.append(ds.field("date") <= end)
+    if symbols:
+        conditions.append(ds.field("symbol").isin(list(symbols)))
+    condition = None
+    for expression in conditions:
+        condition = expression if condition is None else condition & expression
+
+    names = list(columns) if columns else EVENT_SCHEMA.names + ["date"]
+    table = dataset.to_table(columns=list(dict.fromkeys(names + ["event_id", "news_ts"])), filter=condition)
+
+    # 중복 저장된 이벤트는 마지막 행만 (복구 중 같은 이벤트가 두 번 써진 경우)
+    ids = table.column("event_id").to_numpy(zero_copy_only=False)
+    if len(np.unique(ids)) != len(ids):
+        _, last = np.unique(ids[::-1], return_index=True)
+        table = table.take(np.sort(len(ids) - 1 - last))
+    table = table.sort_by("news_ts").select(names)
+    return _to_numpy(table)
+
+def _legacy_event(csv_path: str):
+    """기존 CSV + _analysis.json + _prediction.json 파일 묶음을 뉴스 이벤트로 읽습니다."""
+    match = _LEGACY_NAME_PATTERN.match(os.path.basename(csv_path))
+    if not match:
+        return None
+    with open(csv_path, "r", encoding="utf-8", newline="") as f:
+        rows = list(csv.reader(f))
+    if len(rows) < 2:
+        return None
+    values = dict(zip(rows[0] if rows[0][0] == "symbol" else generate_columns(), rows[1]))
+
+    def _load(suffix: str):
+        path = csv_path.replace(".csv", suffix)
+        if not os.path.exists(path):
+            return {}
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    analysis, prediction = _load("_analysis.json"), _load("_prediction.json")
+    news = analysis.get("news")
+    if news and news.get("timestamp"):
+        news_ts = news["timestamp"] / 1000
+    else:
+        news_ts = datetime.strptime(match.group("ts"), "%Y-%m-%d_%H-%M").timestamp()
+
+    record = EventRecord(match.group(0)[:-4], values.get("symbol") or match.group("symbol"), values.get("market_cap"),
+                         _int(values.get("llm_rating")), _int(values.get("news_flag")) or 1)
+    # CSV의 과거 열은 m60 → m1 (오래된 순), 미래 열은 p1 → p60
+    for name in SERIES_COLUMNS:
+        slots = getattr(record, name)
+        suffix = name.split("_")[-1]
+        keys = [f"{name}{m}" for m in (range(WINDOW_MINUTES, 0, -1) if suffix == "m" else range(1, WINDOW_MINUTES + 1))]
+        for i, key in enumerate(keys):
+            slots[i] = _float(values.get(key))
+
+    event = NewsEvent(record, news, news_ts, analysis.get("prescore"))
+    event.llm_result = analysis.get("llm_analysis")
+    event.prediction = prediction or None
+    return event
+
+def migrate_legacy_files(data_dir: str = SAVE_DIR, root: str = EVENT_STORE_DIR, batch_size: int = 1000) -> int:
+    """기존 이벤트별 CSV/JSON 파일들을 저장소로 옮깁니다. (원본 파일은 그대로 둠)"""
+    store = EventStore(root)
+    rows = []
+    migrated = 0
+    for csv_path in sorted(glob.glob(os.path.join(data_dir, "*.csv"))):
+        try:
+            event = _legacy_event(csv_path)
+        except Exception as e:
+            logger.warning(f"⚠️ 기존 파일 읽기 실패 ({csv_path}): {e}")
+            continue
+        if event is None:
+            continue
+        rows.append(event_row(event))
+        if len(rows) >= batch_size:
+            store.write_rows(rows)
+            migrated += len(rows)
+            rows = []
+    if rows:
+        store.write_rows(rows)
+        migrated += len(rows)
+    return migrated
+
+def main():
+    parser = argparse.ArgumentParser(description="뉴스 이벤트 저장소 (기존 파일 옮기기 / 요약)")
+    parser.add_argument("command", choices=["migrate", "summary"])
+    parser.add_argument("--data-dir", default=SAVE_DIR, help="기존 CSV/JSON 파일 폴더 (migrate)")
+    parser.add_argument("--store-dir", default=EVENT_STORE_DIR, help="이벤트 저장소 폴더")
+    parser.add_argument("--start", help="시작 날짜 (YYYY-MM-DD, summary)")
+    parser.add_argument("--end", help="끝 날짜 (YYYY-MM-DD, summary)")
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        migrated = migrate_legacy_files(args.data_dir, args.store_dir)
+        logger.info(f"💾 기존 이벤트 파일 {migrated}건을 저장소로 옮김: {args.store_dir}")
+        print(json.dumps({"migrated": migrated}, ensure_ascii=False))
+        return
+
+    started_at = time.monotonic()
+    events = read_events(args.start, args.end, columns=["date", "symbol"], root=args.store_dir)
+    dates, counts = np.unique(events.get("date", np.array([], dtype=object)), return_counts=True)
+    print(json.dumps({
+        "events": int(counts.sum()),
+        "symbols": len(np.unique(events["symbol"])) if events else 0,
+        "dates": {str(date): int(count) for date, count in zip(dates, counts)},
+        "read_seconds": round(time.monotonic() - started_at, 3)
+    }, ensure_ascii=False, indent=2))
+
+# 프로세스 전역 이벤트 저장소
+news_event_store = EventStore()
+
+if __name__ == "__main__":
+    main()
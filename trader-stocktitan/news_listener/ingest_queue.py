@@ -0,0 +1,85 @@
+import asyncio
+import time
+from .config import logger, INGEST_QUEUE_SIZE, INGEST_WORKERS
+from .news_handler import handle_news
+from . import metrics
+
+# 웹소켓 수신 루프와 뉴스 처리 사이의 유한 큐 (이벤트 루프 안에서 생성)
+_news_queue = None
+_workers = []
+
+def enqueue_news(data: dict) -> bool:
+    """
+    뉴스를 처리 큐에 넣고 즉시 반환합니다. (웹소켓 수신 루프를 막지 않음)
+    """
+    if _news_queue is None:
+        logger.error("❌ 뉴스 처리 워커가 시작되지 않았습니다.")
+        return False
+
+    try:
+        _news_queue.put_nowait((time.monotonic(), data))
+        metrics.inc_counter("ingest_enqueued_total")
+        metrics.set_gauge("ingest_queue_depth", _news_queue.qsize())
+        return True
+    except asyncio.QueueFull:
+        metrics.inc_counter("ingest_dropped_total")
+        title = data.get("payload", {}).get("news", {}).get("title", "Unknown")
+        logger.error(f"❌ 뉴스 큐 가득 참 ({INGEST_QUEUE_SIZE}) - 뉴스 버려짐: {title}")
+        return False
+
+async def _ingest_worker(worker_id: int):
+    """큐에서 뉴스를 꺼내 처리하는 워커 루프"""
+    logger.info(f"👷 뉴스 처리 워커 시작: #{worker_id}")
+
+    while True:
+        enqueued_at, data = await _news_queue.get()
+        try:
+            # 큐 등록 → 처리 시작까지 대기 시간
+            wait_seconds = time.monotonic() - enqueued_at
+            metrics.observe("ingest_wait_seconds", wait_seconds)
+            metrics.set_gauge("ingest_queue_depth", _news_queue.qsize())
+
+            started_at = time.monotonic()
+            task = asyncio.ensure_future(handle_news(data))
+            try:
+                await asyncio.shield(task)
+            except asyncio.CancelledError:
+                # 워커 자체가 종료되는 경우만 전파, 뉴스 한 건의 처리 취소는 다음 뉴스로 넘어감
+                if not task.cancelled():
+                    task.cancel()
+                    raise
+                metrics.inc_counter("ingest_cancelled_total")
+                logger.warning(f"⚠️ 뉴스 처리 취소됨 (#{worker_id}): {data.get('payload', {}).get('news', {}).get('title', 'Unknown')}")
+                continue
+            metrics.observe("ingest_process_seconds", time.monotonic() - started_at)
+        except Exception as e:
+            logger.error(f"❌ 뉴스 처리 워커 오류 (#{worker_id}): {e}")
+        finally:
+            _news_queue.task_done()
+
+def start_ingest_workers(num_workers: int = INGEST_WORKERS):
+    """
+    뉴스 처리 워커 태스크들을 시작합니다. (재시작 시 중복 실행되지 않음)
+    """
+    global _news_queue
+
+    if _workers:
+        return
+
+    _news_queue = asyncio.Queue(maxsize=INGEST_QUEUE_SIZE)
+    for worker_id in range(1, num_workers + 1):
+        _workers.append(asyncio.create_task(_ingest_worker(worker_id)))
+
+    logger.info(f"✅ 뉴스 처리 워커 {num_workers}개 시작 (큐 크기: {INGEST_QUEUE_SIZE})")
+
+def get_ingest_stats() -> dict:
+    """큐 깊이와 대기 시간 통계를 반환합니다."""
+    wait = metrics.get_histogram("ingest_wait_seconds")
+    return {
+        "depth": _news_queue.qsize() if _news_queue is not None else 0,
+        "capacity": INGEST_QUEUE_SIZE,
+        "workers": len(_workers),
+        "wait_p50": wait["p50"],
+        "wait_p95": wait["p95"],
+        "wait_max": wait["max"]
+    }
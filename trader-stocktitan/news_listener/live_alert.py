@@ -0,0 +1,102 @@
+import asyncio
+from .config import logger, TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, TELEGRAM_EDIT_DEBOUNCE
+from .telegram_dispatcher import telegram_dispatcher
+from . import metrics
+
+# 메시지에 표시하는 섹션 순서
+SECTION_ORDER = ("header", "analysis", "prediction", "live", "move", "final")
+
+# 텔레그램 메시지 최대 길이
+MAX_MESSAGE_LENGTH = 4096
+
+class LiveAlert:
+    """
+    뉴스 이벤트 한 건을 하나의 텔레그램 메시지로 보여주는 진행형 알림
+
+    첫 갱신은 sendMessage로 바로 보내고, 이후 섹션(분석/예측/실시간/최종 결과) 갱신은
+    debounce초 동안 모았다가 editMessageText 한 번으로 반영합니다.
+    마지막 갱신(final=True)은 기다리지 않고 바로 반영합니다.
+    """
+
+    def __init__(self, bot_token: str = TELEGRAM_BOT_TOKEN, chat_id: str = TELEGRAM_CHAT_ID,
+                 debounce: float = TELEGRAM_EDIT_DEBOUNCE, message_id: int = None, sections: dict = None):
+        self.bot_token = bot_token
+        self.chat_id = chat_id
+        self.debounce = debounce
+        self.message_id = message_id
+        self.sections = dict(sections or {})
+        self._sent_text = None
+        self._dirty = False
+        self._handle = None
+        self._task = None
+
+    def to_dict(self) -> dict:
+        """체크포인트 저장용 (재시작 후에도 같은 메시지를 계속 수정)"""
+        return {"message_id": self.message_id, "sections": self.sections}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LiveAlert":
+        return cls(message_id=data.get("message_id"), sections=data.get("sections"))
+
+    def render(self) -> str:
+        text = "\n\n".join(self.sections[name] for name in SECTION_ORDER if self.sections.get(name))
+        return text[:MAX_MESSAGE_LENGTH]
+
+    def update(self, section: str, text: str, final: bool = False):
+        """섹션 내용을 바꾸고 메시지 반영을 예약합니다."""
+        if self.sections.get(section) == text:
+            return
+        self.sections[section] = text
+        if self._dirty:
+            metrics.inc_counter("telegram_live_coalesced_total")
+        self._dirty = True
+
+        if final or (self.message_id is None and self._task is None):
+            # 첫 메시지와 마지막 갱신은 바로 보냄
+            self._flush_now()
+        elif self._handle is None:
+            self._handle = asyncio.get_running_loop().call_later(self.debounce, self._flush_now)
+
+    def _flush_now(self):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._drain())
+
+    async def _drain(self):
+        """보내는 동안 들어온 갱신까지 순서대로 반영합니다. (첫 메시지를 보낸 뒤에만 수정)"""
+        while self._dirty:
+            self._dirty = False
+            text = self.render()
+            if text == self._sent_text:
+                continue
+            try:
+                await self._send(text)
+                self._sent_text = text
+            except Exception as e:
+                logger.error(f"❌ 실시간 알림 갱신 실패: {e}")
+
+    async def _send(self, text: str):
+        payload = {"text": text, "parse_mode": "Markdown", "disable_web_page_preview": True}
+        if self.message_id is None:
+            method = "sendMessage"
+        else:
+            method = "editMessageText"
+            payload["message_id"] = self.message_id
+
+        future = telegram_dispatcher.submit(self.bot_token, self.chat_id, method, payload)
+        if future is None:
+            return
+        result = await future
+        if method == "sendMessage":
+            self.message_id = result["message_id"]
+        else:
+            metrics.inc_counter("telegram_live_edits_total")
+
+    async def flush(self):
+        """예약된 갱신을 지금 반영하고 끝날 때까지 기다립니다."""
+        if self._dirty:
+            self._flush_now()
+        if self._task is not None:
+            await self._task
@@ -1,25 +1,132 @@
+import asyncio
 import json
+import re
+import time
 import openai
-from .config import logger, OPENAI_API_KEY, GPT_MODEL
+from .config import (
+    logger, OPENAI_API_KEY, GPT_MODEL, LLM_STREAMING, LLM_STRUCTURED_OUTPUT,
+    LLM_ANALYSIS_DEADLINE, LLM_PREDICTION_DEADLINE
+)
+from .llm_client import chat_completion, chat_completion_with_usage, PRIORITY_CRITICAL
+from .llm_scheduler import deferred_completion
+from .llm_cache import analysis_cache, news_cache_key
+from .token_budget import fit_to_budget
+from .llm_metrics import record_outcome, OUTCOME_PARSED, OUTCOME_FALLBACK, OUTCOME_DEFAULT
+from . import metrics
 
-# OpenAI API 키 설정
-if OPENAI_API_KEY:
-    openai.api_key = OPENAI_API_KEY
-else:
-    logger.warning("⚠️ OpenAI API 키가 설정되지 않았습니다.")
+def _json_schema(name: str, properties: dict) -> dict:
+    """모든 필드가 필수인 strict JSON 스키마 응답 형식 (필드 순서대로 생성됨)"""
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": name,
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": properties,
+                "required": list(properties),
+                "additionalProperties": False
+            }
+        }
+    }
+
+# 용도별 응답 스키마 (rating/sentiment/impact를 analysis보다 먼저 생성해 스트리밍 중 먼저 완성)
+NEWS_ANALYSIS_FORMAT = _json_schema("news_analysis", {
+    "rating": {"type": "integer", "enum": [1, 2, 3, 4, 5]},
+    "sentiment": {"type": "string", "enum": ["positive", "negative", "neutral"]},
+    "impact": {"type": "string", "enum": ["high", "medium", "low"]},
+    "analysis": {"type": "string"}
+})
+PRICE_PREDICTION_FORMAT = _json_schema("price_prediction", {
+    "predicted_price": {"type": "number"},
+    "change_percent": {"type": "number"},
+    "confidence": {"type": "string", "enum": ["높음", "보통", "낮음"]},
+    "reasoning": {"type": "string"}
+})
+ACCURACY_ANALYSIS_FORMAT = _json_schema("accuracy_analysis", {
+    "analysis": {"type": "string"},
+    "performance": {"type": "string"},
+    "improvement": {"type": "string"}
+})
+MOVEMENT_ANALYSIS_FORMAT = _json_schema("movement_analysis", {
+    "analysis": {"type": "string"},
+    "accuracy": {"type": "string"},
+    "outlook": {"type": "string"}
+})
+
+def _response_format(schema_format: dict) -> dict:
+    """LLM_STRUCTURED_OUTPUT가 꺼져 있으면 JSON 모드만 요청합니다. (스키마 미지원 모델/서버용)"""
+    return schema_format if LLM_STRUCTURED_OUTPUT else {"type": "json_object"}
+
+def _parse_failed(name: str, content: str):
+    record_outcome(name, OUTCOME_FALLBACK)
+    logger.warning(f"⚠️ LLM {name} JSON 파싱 실패: {(content or '')[:100]}")
+
+# 스트리밍 중 먼저 완성되는 짧은 필드들 (값 뒤에 구분자가 와야 완성으로 판단)
+_EARLY_FIELD_PATTERNS = {
+    "rating": re.compile(r'"rating"\s*:\s*"?([1-5])"?\s*[,}\n]'),
+    "sentiment": re.compile(r'"sentiment"\s*:\s*"(positive|negative|neutral)"'),
+    "impact": re.compile(r'"impact"\s*:\s*"(high|medium|low)"')
+}
+
+class EarlyFieldParser:
+    """
+    스트리밍되는 JSON 응답에서 rating/sentiment/impact가 모두 완성되는 순간을 찾습니다.
 
-def analyze_news_with_gpt(news_data: dict) -> dict:
+    조각을 feed()로 넣으면 세 필드가 처음 모두 갖춰졌을 때 한 번만 on_fields(fields)를 호출합니다.
+    """
+
+    def __init__(self, on_fields):
+        self.on_fields = on_fields
+        self.fields = {}
+        self._buffer = ""
+        self._fired = False
+
+    def feed(self, delta: str):
+        if self._fired:
+            return
+        self._buffer += delta
+        for name, pattern in _EARLY_FIELD_PATTERNS.items():
+            if name not in self.fields:
+                match = pattern.search(self._buffer)
+                if match:
+                    value = match.group(1)
+                    self.fields[name] = int(value) if name == "rating" else value
+        if len(self.fields) == len(_EARLY_FIELD_PATTERNS):
+            self._fired = True
+            self._buffer = ""
+            try:
+                self.on_fields(dict(self.fields))
+            except Exception as e:
+                logger.error(f"❌ 예비 분석 콜백 오류: {e}")
+
+async def analyze_news_with_gpt(news_data: dict, on_fields=None, model: str = None) -> dict:
     """
     OpenAI GPT를 사용해 뉴스를 분석하고 평점(1-5)을 받아옵니다.
+    (같은 보도자료 재수신은 제목+본문+종목 해시 캐시에서 응답)
+
+    LLM_STREAMING이 켜져 있고 on_fields를 주면 응답을 스트리밍으로 받으며, 한국어 분석 본문이
+    끝나기 전에 rating/sentiment/impact가 완성되는 즉시 on_fields(fields)를 호출합니다.
+    (캐시 적중 시에는 전체 결과가 바로 나오므로 호출하지 않음)
+    model을 주면 GPT_MODEL 대신 사용합니다. (사전 점수 라우팅의 저가 모델)
     """
+    if not OPENAI_API_KEY:
+        logger.error("❌ OpenAI API 키가 설정되지 않았습니다.")
+        return get_default_analysis("API 키 없음")
+
+    model = model or GPT_MODEL
+    return await analysis_cache.get_or_compute(
+        "analyze_news", news_cache_key(news_data, f"analysis:{model}"),
+        lambda: _analyze_news_uncached(news_data, on_fields if LLM_STREAMING else None, model)
+    )
+
+async def _analyze_news_uncached(news_data: dict, on_fields=None, model: str = None) -> tuple:
+    """GPT 뉴스 분석 (결과, 사용 토큰 수, 캐시 여부)"""
     try:
-        if not OPENAI_API_KEY:
-            logger.error("❌ OpenAI API 키가 설정되지 않았습니다.")
-            return get_default_analysis("API 키 없음")
-        
         # 뉴스 데이터 준비
         title = news_data.get("title", "")
-        content = news_data.get("content", "")
+        # 긴 보도자료는 상투적인 구간을 걷어내고 입력 토큰 예산에 맞춤
+        content = fit_to_budget(news_data.get("content", ""), model=model or GPT_MODEL)
         symbol = news_data.get("symbol", "")
         
         # GPT에 보낼 프롬프트 구성
@@ -30,40 +137,56 @@ def analyze_news_with_gpt(news_data: dict) -> dict:
 제목: {title}
 내용: {content}
 
-다음 형식으로 JSON 응답해주세요:
+다음 형식으로 JSON 응답해주세요 (필드 순서를 지켜주세요):
 {{
-    "analysis": "뉴스 분석 결과 (한국어)",
     "rating": 3,
     "sentiment": "positive/negative/neutral",
-    "impact": "high/medium/low"
+    "impact": "high/medium/low",
+    "analysis": "뉴스 분석 결과 (한국어)"
 }}
 
 평점은 1(매우 부정적) ~ 5(매우 긍정적) 사이의 숫자로 주세요.
 """
+        on_delta = None
+        parser = None
+        if on_fields is not None:
+            started_at = time.monotonic()
+
+            def report(fields: dict):
+                metrics.observe("llm_analyze_news_early_fields_seconds", time.monotonic() - started_at)
+                logger.info(f"⚡ 예비 분석: {symbol} - 평점 {fields['rating']}, 감성 {fields['sentiment']}")
+                on_fields(fields)
+
+            parser = EarlyFieldParser(report)
+            on_delta = parser.feed
 
-        # GPT API 호출
-        response = openai.ChatCompletion.create(
-            model=GPT_MODEL,
+        # GPT API 호출 (뉴스 알림 경로이므로 가장 짧은 마감 시간)
+        content, tokens = await chat_completion_with_usage(
+            "analyze_news",
             messages=[
                 {"role": "user", "content": prompt}
             ],
+            deadline=LLM_ANALYSIS_DEADLINE,
+            on_delta=on_delta,
+            priority=PRIORITY_CRITICAL,
+            model=model or GPT_MODEL,
+            response_format=_response_format(NEWS_ANALYSIS_FORMAT),
             temperature=0.7,
             max_tokens=500
         )
         
-        content = response.choices[0].message.content
-        
         # JSON 파싱 시도
         try:
             analysis_result = json.loads(content)
+            record_outcome("analyze_news", OUTCOME_PARSED)
             logger.info(f"✅ GPT 분석 완료: {symbol} - 평점 {analysis_result.get('rating', 3)}")
-            return analysis_result
+            return analysis_result, tokens, True
         except json.JSONDecodeError:
-            # JSON 파싱 실패시 텍스트에서 평점 추출 시도
-            logger.warning("⚠️ JSON 파싱 실패, 텍스트에서 평점 추출 시도")
+            # 스키마 강제 시에는 응답이 max_tokens에서 잘린 경우에만 발생 (텍스트에서 평점 추출 시도)
+            # 대체 결과는 캐시하지 않음 (다음 같은 뉴스는 다시 분석)
+            _parse_failed("analyze_news", content)
             rating = 3  # 기본값
             if "rating" in content.lower():
-                import re
                 rating_match = re.search(r'"rating":\s*(\d)', content)
                 if rating_match:
                     rating = int(rating_match.group(1))
@@ -73,19 +196,35 @@ def analyze_news_with_gpt(news_data: dict) -> dict:
                 "rating": rating,
                 "sentiment": "neutral",
                 "impact": "medium"
-            }
+            }, tokens, False
             
-    except openai.error.OpenAIError as e:
+    except asyncio.TimeoutError:
+        logger.error(f"❌ GPT 분석 시간 초과: {news_data.get('symbol', '')}")
+        return _stream_fallback(parser, "시간 초과"), 0, False
+
+    except openai.OpenAIError as e:
         error_msg = f"OpenAI API 오류: {e}"
         logger.error(f"❌ {error_msg}")
-        return get_default_analysis("API 오류")
+        return _stream_fallback(parser, "API 오류"), 0, False
         
     except Exception as e:
         error_msg = f"GPT 분석 오류: {e}"
         logger.error(f"❌ {error_msg}")
-        return get_default_analysis("분석 오류")
+        return _stream_fallback(parser, "분석 오류"), 0, False
 
-def predict_price_with_gpt(symbol: str, news_data: dict, price_history: list, volume_history: list) -> dict:
+def _stream_fallback(parser, reason: str) -> dict:
+    """
+    분석이 끝나지 못했을 때의 결과 (스트리밍 중 평점이 이미 나왔으면 그 필드를 살린 부분 결과, 아니면 기본 분석)
+    """
+    if parser is not None and "rating" in parser.fields:
+        record_outcome("analyze_news", OUTCOME_FALLBACK)
+        logger.warning(f"⚠️ 스트리밍 중 완성된 필드로 부분 분석 결과 사용 ({reason}): 평점 {parser.fields['rating']}")
+        return get_partial_analysis(parser.fields, reason)
+    record_outcome("analyze_news", OUTCOME_DEFAULT)
+    return get_default_analysis(reason)
+
+async def predict_price_with_gpt(symbol: str, news_data: dict, price_history: list, volume_history: list,
+                                 current_price: float = None) -> dict:
     """
     뉴스 내용과 과거 60분 데이터를 바탕으로 GPT를 사용해 1시간 후 가격을 예측합니다.
     """
@@ -98,7 +237,8 @@ def predict_price_with_gpt(symbol: str, news_data: dict, price_history: list, vo
             return get_default_prediction(price_history)
         
         title = news_data.get("title", "")
-        current_price = price_history[-1] if price_history else 0
+        if current_price is None:
+            current_price = price_history[-1] if price_history else 0
         avg_volume = sum(volume_history) / len(volume_history) if volume_history else 0
         
         prompt = f"""
@@ -118,18 +258,22 @@ def predict_price_with_gpt(symbol: str, news_data: dict, price_history: list, vo
 }}
 """
 
-        response = openai.ChatCompletion.create(
-            model=GPT_MODEL,
+        content = await chat_completion(
+            "predict_price",
             messages=[{"role": "user", "content": prompt}],
+            deadline=LLM_PREDICTION_DEADLINE,
+            priority=PRIORITY_CRITICAL,
+            response_format=_response_format(PRICE_PREDICTION_FORMAT),
             temperature=0.7,
             max_tokens=400
         )
         
-        content = response.choices[0].message.content
-        
         try:
-            return json.loads(content)
+            result = json.loads(content)
+            record_outcome("predict_price", OUTCOME_PARSED)
+            return result
         except json.JSONDecodeError:
+            _parse_failed("predict_price", content)
             # JSON 파싱 실패시 기본값
             return {
                 "predicted_price": current_price,
@@ -138,14 +282,17 @@ def predict_price_with_gpt(symbol: str, news_data: dict, price_history: list, vo
                 "reasoning": content[:200] + "..."
             }
         
-    except openai.error.OpenAIError as e:
+    except asyncio.TimeoutError:
+        logger.error(f"❌ GPT 가격 예측 시간 초과: {symbol}")
+    except openai.OpenAIError as e:
         logger.error(f"❌ OpenAI API 가격 예측 오류: {e}")
     except Exception as e:
         logger.error(f"❌ GPT 가격 예측 오류: {e}")
     
+    record_outcome("predict_price", OUTCOME_DEFAULT)
     return get_default_prediction(price_history)
 
-def analyze_prediction_accuracy_with_gpt(symbol: str, predicted_price: float, actual_price: float, 
+async def analyze_prediction_accuracy_with_gpt(symbol: str, predicted_price: float, actual_price: float, 
                                        predicted_change: float, actual_change: float, accuracy: float) -> dict:
     """
     예측 정확도를 GPT로 분석합니다.
@@ -170,30 +317,36 @@ def analyze_prediction_accuracy_with_gpt(symbol: str, predicted_price: float, ac
 }}
 """
 
-        response = openai.ChatCompletion.create(
-            model=GPT_MODEL,
+        # 시간에 쫓기지 않는 사후 분석이므로 다른 사후 분석과 모아서 낮은 우선순위로 실행
+        content = await deferred_completion(
+            "analyze_accuracy",
             messages=[{"role": "user", "content": prompt}],
+            response_format=_response_format(ACCURACY_ANALYSIS_FORMAT),
             temperature=0.7,
             max_tokens=300
         )
         
-        content = response.choices[0].message.content
-        
         try:
-            return json.loads(content)
+            result = json.loads(content)
+            record_outcome("analyze_accuracy", OUTCOME_PARSED)
+            return result
         except json.JSONDecodeError:
+            _parse_failed("analyze_accuracy", content)
             return {
                 "analysis": content,
                 "performance": "분석 완료",
                 "improvement": "지속적 모니터링"
             }
         
+    except asyncio.TimeoutError:
+        logger.error(f"❌ GPT 정확도 분석 시간 초과: {symbol}")
     except Exception as e:
         logger.error(f"❌ GPT 정확도 분석 오류: {e}")
     
+    record_outcome("analyze_accuracy", OUTCOME_DEFAULT)
     return get_default_accuracy_analysis(accuracy)
 
-def analyze_price_movement_with_gpt(symbol: str, original_news: dict, price_change_pct: float, total_volume: int) -> dict:
+async def analyze_price_movement_with_gpt(symbol: str, original_news: dict, price_change_pct: float, total_volume: int) -> dict:
     """
     뉴스 발표 후 실제 주가 움직임을 GPT로 분석합니다.
     """
@@ -219,36 +372,53 @@ def analyze_price_movement_with_gpt(symbol: str, original_news: dict, price_chan
 }}
 """
 
-        response = openai.ChatCompletion.create(
-            model=GPT_MODEL,
+        # 시간에 쫓기지 않는 사후 분석이므로 다른 사후 분석과 모아서 낮은 우선순위로 실행
+        content = await deferred_completion(
+            "analyze_movement",
             messages=[{"role": "user", "content": prompt}],
+            response_format=_response_format(MOVEMENT_ANALYSIS_FORMAT),
             temperature=0.7,
             max_tokens=300
         )
         
-        content = response.choices[0].message.content
-        
         try:
-            return json.loads(content)
+            result = json.loads(content)
+            record_outcome("analyze_movement", OUTCOME_PARSED)
+            return result
         except json.JSONDecodeError:
+            _parse_failed("analyze_movement", content)
             return {
                 "analysis": content,
                 "accuracy": "분석 완료",
                 "outlook": "추가 모니터링 필요"
             }
         
+    except asyncio.TimeoutError:
+        logger.error(f"❌ GPT 주가 분석 시간 초과: {symbol}")
     except Exception as e:
         logger.error(f"❌ GPT 주가 분석 오류: {e}")
     
+    record_outcome("analyze_movement", OUTCOME_DEFAULT)
     return get_default_movement_analysis()
 
 def get_default_analysis(reason: str) -> dict:
-    """기본 분석 결과를 반환합니다."""
+    """기본 분석 결과를 반환합니다. (fallback=True: 평점을 알 수 없어 채운 기본값)"""
     return {
         "analysis": f"분석 실패: {reason}",
         "rating": 3,
         "sentiment": "neutral",
-        "impact": "medium"
+        "impact": "medium",
+        "fallback": True
+    }
+
+def get_partial_analysis(fields: dict, reason: str) -> dict:
+    """스트리밍 중 먼저 완성된 rating/sentiment/impact로 만든 부분 분석 결과 (partial=True, 분석 본문 없음)"""
+    return {
+        "analysis": f"예비 분석 결과만 사용 (분석 본문 {reason})",
+        "rating": fields["rating"],
+        "sentiment": fields.get("sentiment", "neutral"),
+        "impact": fields.get("impact", "medium"),
+        "partial": True
     }
 
 def get_default_prediction(price_history: list) -> dict:
@@ -0,0 +1,156 @@
+import asyncio
+import hashlib
+import json
+import re
+import sqlite3
+import time
+from collections import OrderedDict
+from .config import logger, LLM_CACHE_PATH, LLM_CACHE_TTL, LLM_CACHE_MEMORY_SIZE
+from . import metrics
+
+# 만료 항목 디스크 정리 주기 (저장 횟수 기준)
+PURGE_EVERY = 100
+
+_TAG_PATTERN = re.compile(r"<[^>]+>")
+_SPACE_PATTERN = re.compile(r"\s+")
+
+def _normalize(text: str) -> str:
+    """재전송/정정본이 같은 키가 되도록 HTML 태그, 공백, 대소문자 차이를 없앱니다."""
+    text = _TAG_PATTERN.sub(" ", text or "")
+    return _SPACE_PATTERN.sub(" ", text).strip().lower()
+
+def news_cache_key(news: dict, namespace: str = "analysis") -> str:
+    """뉴스 제목+본문+종목의 정규화 해시"""
+    parts = [namespace, _normalize(news.get("symbol", "")), _normalize(news.get("title", "")), _normalize(news.get("content", ""))]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+class LLMResultCache:
+    """
+    LLM 결과 캐시 (메모리 LRU → SQLite 디스크 저장소, TTL 만료)
+
+    같은 키의 동시 요청은 진행 중인 하나의 계산 결과를 함께 받습니다.
+    """
+
+    def __init__(self, path: str = LLM_CACHE_PATH, ttl: float = LLM_CACHE_TTL, memory_size: int = LLM_CACHE_MEMORY_SIZE):
+        self.path = path
+        self.ttl = ttl
+        self.memory_size = memory_size
+        self._memory = OrderedDict()  # key -> (created_at, value, tokens)
+        self._inflight = {}
+        self._db = None
+        self._puts = 0
+
+    def _connect(self):
+        if self._db is None:
+            self._db = sqlite3.connect(self.path)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, tokens INTEGER NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._db.commit()
+        return self._db
+
+    def _remember(self, key: str, entry: tuple):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str):
+        """(값, 토큰 수)를 반환합니다. 없거나 만료됐으면 None"""
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry is not None:
+            if now - entry[0] < self.ttl:
+                self._memory.move_to_end(key)
+                return entry[1], entry[2]
+            del self._memory[key]
+
+        try:
+            row = self._connect().execute(
+                "SELECT value, tokens, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"❌ LLM 캐시 읽기 오류: {e}")
+            return None
+        if row is None or now - row[2] >= self.ttl:
+            return None
+
+        value = json.loads(row[0])
+        self._remember(key, (row[2], value, row[1]))
+        return value, row[1]
+
+    def put(self, key: str, value, tokens: int = 0):
+        created_at = time.time()
+        self._remember(key, (created_at, value, tokens))
+        try:
+            db = self._connect()
+            db.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, tokens, created_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), tokens, created_at)
+            )
+            self._puts += 1
+            if self._puts % PURGE_EVERY == 0:
+                db.execute("DELETE FROM llm_cache WHERE created_at < ?", (created_at - self.ttl,))
+            db.commit()
+        except sqlite3.Error as e:
+            logger.error(f"❌ LLM 캐시 저장 오류: {e}")
+
+    async def get_or_compute(self, name: str, key: str, compute):
+        """
+        캐시된 값을 반환하거나, 없으면 compute()로 (값, 토큰 수, 캐시 여부)를 계산해 저장합니다.
+        """
+        while True:
+            cached = self.get(key)
+            if cached is not None:
+                metrics.inc_counter(f"llm_cache_{name}_hits_total")
+                metrics.inc_counter("llm_cache_saved_tokens_total", cached[1])
+                return cached[0]
+
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                break
+            metrics.inc_counter(f"llm_cache_{name}_hits_total")
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                # 대기자 자신이 취소된 경우만 전파, 계산하던 쪽이 취소됐으면 대기자가 다시 계산
+                if not inflight.cancelled():
+                    raise
+                metrics.inc_counter(f"llm_cache_{name}_owner_cancelled_total")
+
+        metrics.inc_counter(f"llm_cache_{name}_misses_total")
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value, tokens, cacheable = await compute()
+            if cacheable:
+                self.put(key, value, tokens)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # 대기자가 없으면 예외를 확인한 것으로 처리 (경고 로그 방지)
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+def get_cache_stats(name: str = "analyze_news") -> dict:
+    """캐시 적중률과 절약한 토큰 수를 반환합니다."""
+    counters = metrics.get_snapshot()["counters"]
+    hits = counters.get(f"llm_cache_{name}_hits_total", 0)
+    misses = counters.get(f"llm_cache_{name}_misses_total", 0)
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / total if total else 0.0,
+        "saved_tokens": counters.get("llm_cache_saved_tokens_total", 0)
+    }
+
+# 프로세스 전역 LLM 결과 캐시
+analysis_cache = LLMResultCache()
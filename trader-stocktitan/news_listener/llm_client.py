@@ -0,0 +1,222 @@
+import asyncio
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+import openai
+from .config import (
+    logger, OPENAI_API_KEY, OPENAI_BASE_URL, GPT_MODEL, LLM_MAX_CONCURRENCY, LLM_BACKGROUND_MAX_CONCURRENCY,
+    LLM_REQUEST_TIMEOUT, LLM_MAX_RETRIES, LLM_BACKOFF_BASE
+)
+from .llm_metrics import record_completion
+from . import metrics
+
+# OpenAI 비동기 클라이언트 (재시도/타임아웃은 chat_completion에서 직접 관리)
+# OPENAI_BASE_URL로 로컬 스탠드인 서버(llm_standin)를 가리킬 수 있음
+if OPENAI_API_KEY:
+    client = openai.AsyncOpenAI(
+        api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL or None, max_retries=0, timeout=LLM_REQUEST_TIMEOUT
+    )
+else:
+    client = None
+    logger.warning("⚠️ OpenAI API 키가 설정되지 않았습니다.")
+
+# 재시도할 오류 (429, 5xx, 연결 오류/시간 초과)
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.InternalServerError,
+    openai.APIConnectionError
+)
+
+# 호출 우선순위 (숫자가 작을수록 먼저 실행)
+PRIORITY_CRITICAL = 0    # 알림 경로 (뉴스 분석, 가격 예측)
+PRIORITY_NORMAL = 1
+PRIORITY_BACKGROUND = 2  # 사후 분석 (1시간 뒤 결과 리뷰)
+
+_PRIORITY_NAMES = {PRIORITY_CRITICAL: "critical", PRIORITY_NORMAL: "normal", PRIORITY_BACKGROUND: "background"}
+
+class PriorityGate:
+    """
+    모든 LLM 호출이 공유하는 우선순위 동시 호출 제한
+
+    빈 자리는 항상 우선순위가 높은 대기자부터 받으며, 사후 분석 호출은 background_limit개까지만
+    동시에 실행해 알림 경로 호출이 들어올 자리를 남겨 둡니다.
+    """
+
+    def __init__(self, limit: int = LLM_MAX_CONCURRENCY, background_limit: int = LLM_BACKGROUND_MAX_CONCURRENCY):
+        self.limit = limit
+        self.background_limit = max(1, min(background_limit, limit))
+        self.active = 0
+        self.active_background = 0
+        self._waiters = {priority: deque() for priority in _PRIORITY_NAMES}
+
+    def _can_run(self, priority: int) -> bool:
+        if self.active >= self.limit:
+            return False
+        return priority != PRIORITY_BACKGROUND or self.active_background < self.background_limit
+
+    def _grant(self):
+        for priority in sorted(self._waiters):
+            waiters = self._waiters[priority]
+            while waiters and self._can_run(priority):
+                future = waiters.popleft()
+                if not future.done():
+                    self._take(priority)
+                    future.set_result(None)
+
+    def _take(self, priority: int):
+        self.active += 1
+        if priority == PRIORITY_BACKGROUND:
+            self.active_background += 1
+
+    def _release(self, priority: int):
+        self.active -= 1
+        if priority == PRIORITY_BACKGROUND:
+            self.active_background -= 1
+        self._grant()
+
+    def waiting(self, priority: int = None) -> int:
+        if priority is None:
+            return sum(len(waiters) for waiters in self._waiters.values())
+        return len(self._waiters[priority])
+
+    @asynccontextmanager
+    async def slot(self, priority: int = PRIORITY_NORMAL):
+        started_at = time.monotonic()
+        # 같은/더 높은 우선순위 대기자가 있으면 새치기하지 않음
+        if self._can_run(priority) and not any(self._waiters[p] for p in self._waiters if p <= priority):
+            self._take(priority)
+        else:
+            future = asyncio.get_running_loop().create_future()
+            self._waiters[priority].append(future)
+            try:
+                await future
+            except asyncio.CancelledError:
+                # 자리를 받은 직후 취소되면 반납
+                if future.done() and not future.cancelled():
+                    self._release(priority)
+                raise
+        metrics.observe(f"llm_queue_wait_{_PRIORITY_NAMES[priority]}_seconds", time.monotonic() - started_at)
+        try:
+            yield
+        finally:
+            self._release(priority)
+
+# 프로세스 전역 LLM 호출 게이트
+llm_gate = PriorityGate()
+
+def _retry_after(error: Exception):
+    """응답의 Retry-After 헤더(초)를 읽습니다."""
+    response = getattr(error, "response", None)
+    try:
+        return float(response.headers.get("retry-after"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+def _retry_delay(name: str, attempt: int, error: Exception, deadline_at: float):
+    """재시도 대기 시간을 반환합니다. 재시도하지 않을 오류면 None"""
+    if not isinstance(error, RETRYABLE_ERRORS) or attempt >= LLM_MAX_RETRIES:
+        return None
+    # Retry-After가 있으면 따르고, 없으면 full jitter 지수 백오프
+    delay = _retry_after(error) or random.uniform(0, LLM_BACKOFF_BASE * (2 ** attempt))
+    if time.monotonic() + delay >= deadline_at:
+        return None
+    metrics.inc_counter("llm_retries_total")
+    logger.warning(f"⚠️ LLM {name} 호출 실패 ({attempt + 1}/{LLM_MAX_RETRIES + 1}), {delay:.2f}초 후 재시도: {error}")
+    return delay
+
+def _request_timeout(deadline_at: float) -> float:
+    return max(0.1, min(LLM_REQUEST_TIMEOUT, deadline_at - time.monotonic()))
+
+def _usage_tokens(usage) -> tuple:
+    """응답 usage의 (입력 토큰, 출력 토큰)"""
+    return (getattr(usage, "prompt_tokens", None) or 0, getattr(usage, "completion_tokens", None) or 0)
+
+async def _complete_with_retries(name: str, started_at: float, deadline_at: float, priority: int, kwargs: dict,
+                                 stats: dict) -> str:
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        try:
+            async with llm_gate.slot(priority):
+                response = await client.chat.completions.create(timeout=_request_timeout(deadline_at), **kwargs)
+            # 스트리밍이 아니면 응답 전체가 도착한 시점이 첫 토큰 시점
+            stats["ttft"] = time.monotonic() - started_at
+            stats["tokens"] = _usage_tokens(getattr(response, "usage", None))
+            return response.choices[0].message.content
+        except Exception as e:
+            delay = _retry_delay(name, attempt, e, deadline_at)
+            if delay is None:
+                raise
+            stats["retries"] += 1
+            await asyncio.sleep(delay)
+
+async def _stream_with_retries(name: str, started_at: float, deadline_at: float, priority: int, kwargs: dict,
+                               stats: dict, on_delta) -> str:
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        parts = []
+        try:
+            async with llm_gate.slot(priority):
+                stream = await client.chat.completions.create(
+                    timeout=_request_timeout(deadline_at), stream=True, stream_options={"include_usage": True}, **kwargs
+                )
+                async for chunk in stream:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        if not parts:
+                            stats["ttft"] = time.monotonic() - started_at
+                        parts.append(delta)
+                        on_delta(delta)
+                    usage = getattr(chunk, "usage", None)
+                    if usage is not None:
+                        stats["tokens"] = _usage_tokens(usage)
+            return "".join(parts)
+        except Exception as e:
+            # 이미 일부를 받은 스트림은 다시 시작하지 않음 (증분 파서가 앞부분을 이미 소비함)
+            delay = None if parts else _retry_delay(name, attempt, e, deadline_at)
+            if delay is None:
+                raise
+            stats["retries"] += 1
+            await asyncio.sleep(delay)
+
+async def chat_completion_with_usage(name: str, messages: list, deadline: float, on_delta=None,
+                                     priority: int = PRIORITY_NORMAL, **kwargs) -> tuple:
+    """
+    채팅 완성 (응답 본문, 사용 토큰 수)를 반환합니다.
+
+    동시 호출 수를 제한하고, 429/5xx는 백오프로 재시도하며, 대기 시간을 포함해 deadline(초) 안에
+    끝나지 않으면 asyncio.TimeoutError를 발생시킵니다. (호출한 쪽에서 기본값으로 대체)
+    on_delta(text)를 주면 스트리밍으로 받으면서 조각마다 호출합니다.
+    priority가 높은(작은) 호출이 동시 호출 자리를 먼저 받습니다.
+    호출마다 모델, 토큰, 지연, 첫 토큰 시간, 재시도, 결과 상태를 name별로 기록합니다. (llm_metrics)
+    """
+    if client is None:
+        raise openai.OpenAIError("OpenAI API 키가 설정되지 않았습니다.")
+
+    started_at = time.monotonic()
+    kwargs.setdefault("model", GPT_MODEL)
+    stats = {"ttft": None, "retries": 0, "tokens": (0, 0)}
+    status = "error"
+    try:
+        request = dict(kwargs, messages=messages)
+        if on_delta is None:
+            call = _complete_with_retries(name, started_at, started_at + deadline, priority, request, stats)
+        else:
+            call = _stream_with_retries(name, started_at, started_at + deadline, priority, request, stats, on_delta)
+        content = await asyncio.wait_for(call, timeout=deadline)
+        status = "ok"
+        return content, sum(stats["tokens"])
+    except asyncio.TimeoutError:
+        status = "timeout"
+        logger.warning(f"⏱️ LLM {name} 호출 시간 초과 ({deadline:.0f}초)")
+        raise
+    except asyncio.CancelledError:
+        status = "cancelled"
+        raise
+    finally:
+        record_completion(
+            name, kwargs["model"], status, time.monotonic() - started_at, stats["ttft"], stats["retries"], *stats["tokens"]
+        )
+
+async def chat_completion(name: str, messages: list, deadline: float, **kwargs) -> str:
+    """채팅 완성 응답 본문을 반환합니다. (chat_completion_with_usage 참고)"""
+    content, _ = await chat_completion_with_usage(name, messages, deadline, **kwargs)
+    return content
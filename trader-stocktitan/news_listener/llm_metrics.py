@@ -0,0 +1,145 @@
+import asyncio
+import re
+from .config import logger, LLM_PRICING, LLM_SUMMARY_INTERVAL
+from . import metrics
+
+# 모델별 100만 토큰당 가격 (USD, 입력/출력) - LLM_PRICING 환경변수(JSON)로 덮어쓰기/추가
+DEFAULT_PRICING = {
+    "gpt-4o": (2.5, 10.0),
+    "gpt-4o-mini": (0.15, 0.6),
+    "gpt-4.1": (2.0, 8.0),
+    "gpt-4.1-mini": (0.4, 1.6),
+    "gpt-4.1-nano": (0.1, 0.4),
+    "gpt-5": (1.25, 10.0),
+    "gpt-5-mini": (0.25, 2.0),
+    "gpt-5-nano": (0.05, 0.4)
+}
+
+# Batch API 할인율
+BATCH_DISCOUNT = 0.5
+
+# 분석 결과 처리 방식 (정상 파싱 / 파싱 실패 대체값 / 호출 실패 기본값)
+OUTCOME_PARSED = "parsed"
+OUTCOME_FALLBACK = "fallback"
+OUTCOME_DEFAULT = "default"
+
+_pricing = dict(DEFAULT_PRICING, **{model: tuple(price) for model, price in LLM_PRICING.items()})
+_CALLS_PATTERN = re.compile(r"^llm_(\w+)_calls_total$")
+_SLUG_PATTERN = re.compile(r"[^a-z0-9]+")
+
+_summary_task = None
+
+def _slug(model: str) -> str:
+    return _SLUG_PATTERN.sub("_", (model or "unknown").lower()).strip("_")
+
+def _price(model: str):
+    """모델 가격 (정확히 없으면 가장 긴 접두어 일치, 예: gpt-4o-2024-08-06 → gpt-4o)"""
+    if model in _pricing:
+        return _pricing[model]
+    matches = [name for name in _pricing if model and model.startswith(name)]
+    return _pricing[max(matches, key=len)] if matches else None
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int, batch: bool = False):
+    """호출 비용(USD) 추정치. 가격을 모르는 모델이면 None"""
+    price = _price(model)
+    if price is None:
+        return None
+    cost = (prompt_tokens * price[0] + completion_tokens * price[1]) / 1_000_000
+    return cost * BATCH_DISCOUNT if batch else cost
+
+def record_completion(name: str, model: str, status: str, seconds: float, ttft: float = None, retries: int = 0,
+                      prompt_tokens: int = 0, completion_tokens: int = 0, batch: bool = False):
+    """
+    LLM 호출 한 건의 모델, 토큰, 지연, 첫 토큰 시간, 재시도, 결과 상태를 용도별로 기록합니다.
+    """
+    metrics.inc_counter(f"llm_{name}_calls_total")
+    metrics.inc_counter(f"llm_{name}_status_{status}_total")
+    metrics.inc_counter(f"llm_model_{_slug(model)}_requests_total")
+    metrics.observe(f"llm_{name}_seconds", seconds)
+    metrics.observe(f"llm_{name}_retries", retries)
+    if retries:
+        metrics.inc_counter(f"llm_{name}_retries_total", retries)
+    if ttft is not None:
+        metrics.observe(f"llm_{name}_ttft_seconds", ttft)
+    if status != "ok":
+        return
+
+    metrics.inc_counter("llm_tokens_total", prompt_tokens + completion_tokens)
+    metrics.inc_counter(f"llm_{name}_prompt_tokens_total", prompt_tokens)
+    metrics.inc_counter(f"llm_{name}_completion_tokens_total", completion_tokens)
+    metrics.observe(f"llm_{name}_prompt_tokens", prompt_tokens)
+    metrics.observe(f"llm_{name}_completion_tokens", completion_tokens)
+
+    cost = estimate_cost(model, prompt_tokens, completion_tokens, batch)
+    if cost is None:
+        metrics.inc_counter("llm_unpriced_requests_total")
+        return
+    metrics.inc_counter("llm_cost_usd_total", cost)
+    metrics.inc_counter(f"llm_{name}_cost_usd_total", cost)
+    metrics.observe(f"llm_{name}_cost_usd", cost)
+
+def record_outcome(name: str, outcome: str):
+    """응답 처리 방식(parsed/fallback/default)을 기록합니다."""
+    metrics.inc_counter(f"llm_{name}_outcome_{outcome}_total")
+
+def get_llm_summary() -> dict:
+    """용도별 호출 수, 지연/첫 토큰 시간 분위수, 토큰, 비용, 재시도, 처리 방식 요약"""
+    snapshot = metrics.get_snapshot()
+    counters = snapshot["counters"]
+    histograms = snapshot["histograms"]
+    empty = metrics.get_histogram("")
+
+    summary = {}
+    for counter in sorted(counters):
+        match = _CALLS_PATTERN.match(counter)
+        if not match:
+            continue
+        name = match.group(1)
+        latency = histograms.get(f"llm_{name}_seconds", empty)
+        ttft = histograms.get(f"llm_{name}_ttft_seconds", empty)
+        summary[name] = {
+            "calls": counters[counter],
+            "errors": counters.get(f"llm_{name}_status_error_total", 0),
+            "timeouts": counters.get(f"llm_{name}_status_timeout_total", 0),
+            "retries": counters.get(f"llm_{name}_retries_total", 0),
+            "latency_p50": latency["p50"],
+            "latency_p95": latency["p95"],
+            "ttft_p50": ttft["p50"],
+            "ttft_p95": ttft["p95"],
+            "prompt_tokens": counters.get(f"llm_{name}_prompt_tokens_total", 0),
+            "completion_tokens": counters.get(f"llm_{name}_completion_tokens_total", 0),
+            "cost_usd": counters.get(f"llm_{name}_cost_usd_total", 0.0),
+            "outcomes": {
+                outcome: counters.get(f"llm_{name}_outcome_{outcome}_total", 0)
+                for outcome in (OUTCOME_PARSED, OUTCOME_FALLBACK, OUTCOME_DEFAULT)
+            }
+        }
+    return summary
+
+def format_llm_summary(summary: dict) -> str:
+    lines = []
+    for name, stats in summary.items():
+        outcomes = "/".join(str(count) for count in stats["outcomes"].values())
+        lines.append(
+            f"• {name}: {stats['calls']:.0f}회 (오류 {stats['errors']:.0f}, 시간 초과 {stats['timeouts']:.0f}, 재시도 {stats['retries']:.0f}), "
+            f"지연 p50/p95 {stats['latency_p50']:.2f}/{stats['latency_p95']:.2f}s, "
+            f"첫 토큰 p50/p95 {stats['ttft_p50']:.2f}/{stats['ttft_p95']:.2f}s, "
+            f"토큰 {stats['prompt_tokens']:,.0f}+{stats['completion_tokens']:,.0f}, ${stats['cost_usd']:.4f}, "
+            f"파싱/대체/기본 {outcomes}"
+        )
+    return "\n".join(lines)
+
+async def _summary_loop(interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        summary = get_llm_summary()
+        if summary:
+            total = metrics.get_snapshot()["counters"].get("llm_cost_usd_total", 0.0)
+            logger.info(f"🧾 LLM 호출 요약 (누적 ${total:.4f})\n{format_llm_summary(summary)}")
+
+def start_llm_summary(interval: float = LLM_SUMMARY_INTERVAL):
+    """interval초마다 LLM 호출 요약을 로그로 남깁니다. (0이면 끔)"""
+    global _summary_task
+    if interval <= 0 or _summary_task is not None:
+        return
+    _summary_task = asyncio.create_task(_summary_loop(interval))
@@ -0,0 +1,157 @@
+import asyncio
+import hashlib
+import json
+import time
+from .config import (
+    logger, GPT_MODEL, LLM_REVIEW_DEADLINE, LLM_DEFER_SECONDS, LLM_DEFER_BATCH_SIZE,
+    LLM_BATCH_API, LLM_BATCH_POLL_SECONDS, LLM_BATCH_MAX_WAIT
+)
+from . import llm_client
+from .llm_client import chat_completion_with_usage, PRIORITY_BACKGROUND
+from .llm_metrics import record_completion
+from . import metrics
+
+# 배치 작업이 끝났다고 볼 상태
+_BATCH_FINAL_STATES = ("completed", "failed", "expired", "cancelled")
+
+class BatchError(Exception):
+    """배치 작업이 완료되지 못했거나 결과에 항목이 없음"""
+
+def _request_key(name: str, kwargs: dict) -> str:
+    """같은 요청(용도+메시지+파라미터)을 하나로 합치기 위한 키"""
+    payload = json.dumps([name, kwargs], ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class RetrospectiveScheduler:
+    """
+    시간에 쫓기지 않는 사후 분석 LLM 호출 모음 실행기
+
+    - 요청을 defer_seconds 동안 모았다가 한꺼번에 실행합니다. (batch_size가 차면 즉시)
+    - 같은 요청은 하나만 실행하고 결과를 함께 받습니다.
+    - 실행은 가장 낮은 우선순위(PRIORITY_BACKGROUND)로 하며, use_batch_api면 OpenAI Batch API로 제출합니다.
+      (배치가 실패/만료되면 개별 호출로 대체)
+    """
+
+    def __init__(self, defer_seconds: float = LLM_DEFER_SECONDS, batch_size: int = LLM_DEFER_BATCH_SIZE,
+                 use_batch_api: bool = LLM_BATCH_API):
+        self.defer_seconds = defer_seconds
+        self.batch_size = batch_size
+        self.use_batch_api = use_batch_api
+        self._pending = {}  # key -> (name, kwargs, future)
+        self._flush_handle = None
+        self._tasks = set()
+
+    def submit(self, name: str, messages: list, **kwargs) -> asyncio.Future:
+        """
+        사후 분석 호출을 예약하고 응답 본문을 받을 future를 반환합니다.
+        """
+        kwargs = dict(kwargs, messages=messages)
+        kwargs.setdefault("model", GPT_MODEL)
+        key = _request_key(name, kwargs)
+
+        if key in self._pending:
+            metrics.inc_counter("llm_deferred_coalesced_total")
+            return self._pending[key][2]
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = (name, kwargs, future)
+        metrics.inc_counter("llm_deferred_total")
+        metrics.set_gauge("llm_deferred_pending", len(self._pending))
+
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.defer_seconds, self.flush)
+        return future
+
+    def flush(self):
+        """모인 요청들을 지금 실행합니다."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+        items, self._pending = self._pending, {}
+        metrics.set_gauge("llm_deferred_pending", 0)
+        task = asyncio.create_task(self._run(items))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, items: dict):
+        logger.info(f"🗂️ 사후 분석 LLM 호출 {len(items)}건 실행 ({'배치 API' if self.use_batch_api else '개별 호출'})")
+        if self.use_batch_api:
+            try:
+                await self._run_batch(items)
+                return
+            except Exception as e:
+                metrics.inc_counter("llm_batch_failures_total")
+                logger.error(f"❌ LLM 배치 실패, 개별 호출로 대체: {e}")
+                items = {key: item for key, item in items.items() if not item[2].done()}
+        await asyncio.gather(*(self._run_one(*item) for item in items.values()))
+
+    async def _run_one(self, name: str, kwargs: dict, future: asyncio.Future):
+        try:
+            content, _ = await chat_completion_with_usage(
+                name, deadline=LLM_REVIEW_DEADLINE, priority=PRIORITY_BACKGROUND, **kwargs
+            )
+            if not future.done():
+                future.set_result(content)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+
+    async def _run_batch(self, items: dict):
+        """OpenAI Batch API로 한꺼번에 제출하고 완료될 때까지 상태를 확인합니다."""
+        client = llm_client.client
+        lines = [
+            json.dumps({"custom_id": key, "method": "POST", "url": "/v1/chat/completions", "body": kwargs}, ensure_ascii=False)
+            for key, (name, kwargs, future) in items.items()
+        ]
+        input_file = await client.files.create(
+            file=("llm_batch.jsonl", "\n".join(lines).encode("utf-8")), purpose="batch"
+        )
+        batch = await client.batches.create(
+            input_file_id=input_file.id, endpoint="/v1/chat/completions", completion_window="24h"
+        )
+        metrics.inc_counter("llm_batches_total")
+
+        started_at = time.monotonic()
+        while batch.status not in _BATCH_FINAL_STATES:
+            if time.monotonic() - started_at > LLM_BATCH_MAX_WAIT:
+                await client.batches.cancel(batch.id)
+                raise BatchError(f"배치 대기 시간 초과 ({LLM_BATCH_MAX_WAIT:.0f}초): {batch.id}")
+            await asyncio.sleep(LLM_BATCH_POLL_SECONDS)
+            batch = await client.batches.retrieve(batch.id)
+
+        if batch.status != "completed" or not batch.output_file_id:
+            raise BatchError(f"배치 {batch.id} 상태: {batch.status}")
+        batch_seconds = time.monotonic() - started_at
+        metrics.observe("llm_batch_seconds", batch_seconds)
+
+        output = await client.files.content(batch.output_file_id)
+        for line in output.text.splitlines():
+            if not line.strip():
+                continue
+            result = json.loads(line)
+            item = items.get(result.get("custom_id"))
+            body = (result.get("response") or {}).get("body") or {}
+            if item is None or item[2].done() or not body.get("choices"):
+                continue
+            usage = body.get("usage") or {}
+            record_completion(
+                item[0], item[1]["model"], "ok", batch_seconds, None, 0,
+                usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0), batch=True
+            )
+            item[2].set_result(body["choices"][0]["message"]["content"])
+
+        missing = [key for key, item in items.items() if not item[2].done()]
+        if missing:
+            raise BatchError(f"배치 결과에 없는 요청 {len(missing)}건")
+
+async def deferred_completion(name: str, messages: list, **kwargs) -> str:
+    """사후 분석 호출을 모아서 실행하고 응답 본문을 반환합니다. (RetrospectiveScheduler 참고)"""
+    # 합쳐진 요청의 다른 대기자에게 취소가 번지지 않도록 보호
+    return await asyncio.shield(retrospective_scheduler.submit(name, messages, **kwargs))
+
+# 프로세스 전역 사후 분석 실행기
+retrospective_scheduler = RetrospectiveScheduler()
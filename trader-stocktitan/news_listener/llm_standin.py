@@ -0,0 +1,213 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+import zlib
+from aiohttp import web
+from .config import logger
+
+class StandinState:
+    """스탠드인 서버 상태 (업로드 파일, 배치 작업, 오류/지연 주입 설정)"""
+
+    def __init__(self, latency_ms: float = 300, error_rate: float = 0.0, batch_delay: float = 2.0,
+                 chunk_ms: float = 20, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.batch_delay = batch_delay
+        self.chunk_ms = chunk_ms
+        self.rng = random.Random(seed)
+        self.files = {}    # file_id -> bytes
+        self.batches = {}  # batch_id -> dict
+        self.requests = 0
+
+def _sample_value(spec: dict, rng: random.Random):
+    """JSON 스키마 속성 하나에 맞는 값"""
+    if "enum" in spec:
+        return rng.choice(spec["enum"])
+    kind = spec.get("type")
+    if kind == "integer":
+        return rng.randint(1, 5)
+    if kind == "number":
+        return round(rng.uniform(-5, 5), 2)
+    return "스탠드인 응답입니다. " * 3
+
+def fake_completion_content(body: dict) -> str:
+    """
+    요청의 response_format 스키마에 맞는 JSON 응답 본문 (같은 요청이면 같은 응답)
+    """
+    rng = random.Random(zlib.crc32(json.dumps(body.get("messages"), ensure_ascii=False).encode("utf-8")))
+    response_format = body.get("response_format") or {}
+    schema = (response_format.get("json_schema") or {}).get("schema") or {}
+    properties = schema.get("properties") or {"analysis": {"type": "string"}}
+    return json.dumps({name: _sample_value(spec, rng) for name, spec in properties.items()}, ensure_ascii=False)
+
+def _usage(content: str) -> dict:
+    completion_tokens = max(1, len(content) // 4)
+    return {"prompt_tokens": 100, "completion_tokens": completion_tokens, "total_tokens": 100 + completion_tokens}
+
+def _completion_object(body: dict, content: str) -> dict:
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "standin"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": _usage(content)
+    }
+
+def _chunk_object(completion_id: str, model: str, delta: dict = None, usage: dict = None) -> dict:
+    return {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [] if delta is None else [{"index": 0, "delta": delta, "finish_reason": None}],
+        "usage": usage
+    }
+
+async def chat_completions(request: web.Request) -> web.StreamResponse:
+    state = request.app["state"]
+    body = await request.json()
+    state.requests += 1
+
+    await asyncio.sleep(state.latency_ms / 1000 * state.rng.uniform(0.5, 1.5))
+    if state.error_rate and state.rng.random() < state.error_rate:
+        return web.json_response(
+            {"error": {"message": "stand-in rate limit", "type": "rate_limit_error"}},
+            status=429, headers={"Retry-After": "0.2"}
+        )
+
+    content = fake_completion_content(body)
+    if not body.get("stream"):
+        return web.json_response(_completion_object(body, content))
+
+    # SSE 스트리밍 (작은 조각으로 나눠 전송)
+    response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+    await response.prepare(request)
+    completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+    model = body.get("model", "standin")
+    for start in range(0, len(content), 8):
+        chunk = _chunk_object(completion_id, model, {"content": content[start:start + 8]})
+        await response.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+        await asyncio.sleep(state.chunk_ms / 1000)
+    if (body.get("stream_options") or {}).get("include_usage"):
+        chunk = _chunk_object(completion_id, model, usage=_usage(content))
+        await response.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+    await response.write(b"data: [DONE]\n\n")
+    await response.write_eof()
+    return response
+
+def _file_object(file_id: str, data: bytes, purpose: str, filename: str) -> dict:
+    return {
+        "id": file_id, "object": "file", "bytes": len(data), "created_at": int(time.time()),
+        "filename": filename, "purpose": purpose, "status": "processed"
+    }
+
+async def upload_file(request: web.Request) -> web.Response:
+    state = request.app["state"]
+    form = await request.post()
+    upload = form["file"]
+    data = upload.file.read()
+    file_id = f"file-{uuid.uuid4().hex[:12]}"
+    state.files[file_id] = data
+    return web.json_response(_file_object(file_id, data, form.get("purpose", "batch"), upload.filename))
+
+async def file_content(request: web.Request) -> web.Response:
+    data = request.app["state"].files.get(request.match_info["file_id"])
+    if data is None:
+        return web.json_response({"error": {"message": "file not found"}}, status=404)
+    return web.Response(body=data, content_type="application/octet-stream")
+
+async def _complete_batch(state: StandinState, batch: dict):
+    """batch_delay초 뒤 입력 파일의 모든 요청에 응답한 결과 파일을 만듭니다."""
+    await asyncio.sleep(state.batch_delay)
+    if batch["status"] != "in_progress":
+        return
+    lines = []
+    for line in state.files[batch["input_file_id"]].decode("utf-8").splitlines():
+        if not line.strip():
+            continue
+        item = json.loads(line)
+        lines.append(json.dumps({
+            "id": f"batch_req_{uuid.uuid4().hex[:12]}",
+            "custom_id": item["custom_id"],
+            "response": {"status_code": 200, "body": _completion_object(item["body"], fake_completion_content(item["body"]))},
+            "error": None
+        }, ensure_ascii=False))
+    output_id = f"file-{uuid.uuid4().hex[:12]}"
+    state.files[output_id] = "\n".join(lines).encode("utf-8")
+    batch.update(status="completed", output_file_id=output_id, completed_at=int(time.time()),
+                 request_counts={"total": len(lines), "completed": len(lines), "failed": 0})
+
+async def create_batch(request: web.Request) -> web.Response:
+    state = request.app["state"]
+    body = await request.json()
+    if body.get("input_file_id") not in state.files:
+        return web.json_response({"error": {"message": "input file not found"}}, status=400)
+    batch = {
+        "id": f"batch_{uuid.uuid4().hex[:12]}",
+        "object": "batch",
+        "endpoint": body.get("endpoint"),
+        "input_file_id": body["input_file_id"],
+        "completion_window": body.get("completion_window", "24h"),
+        "status": "in_progress",
+        "output_file_id": None,
+        "error_file_id": None,
+        "created_at": int(time.time()),
+        "request_counts": {"total": 0, "completed": 0, "failed": 0}
+    }
+    state.batches[batch["id"]] = batch
+    task = asyncio.create_task(_complete_batch(state, batch))
+    request.app["tasks"].add(task)
+    task.add_done_callback(request.app["tasks"].discard)
+    return web.json_response(batch)
+
+async def get_batch(request: web.Request) -> web.Response:
+    batch = request.app["state"].batches.get(request.match_info["batch_id"])
+    if batch is None:
+        return web.json_response({"error": {"message": "batch not found"}}, status=404)
+    return web.json_response(batch)
+
+async def cancel_batch(request: web.Request) -> web.Response:
+    batch = request.app["state"].batches.get(request.match_info["batch_id"])
+    if batch is None:
+        return web.json_response({"error": {"message": "batch not found"}}, status=404)
+    if batch["status"] == "in_progress":
+        batch["status"] = "cancelled"
+    return web.json_response(batch)
+
+def create_app(state: StandinState = None) -> web.Application:
+    """
+    OpenAI 호환 로컬 스탠드인 서버 (채팅 완성/스트리밍, 파일 업로드, Batch API)
+
+    OPENAI_BASE_URL=http://127.0.0.1:<port>/v1 로 지정하면 실제 API 대신 이 서버를 사용합니다.
+    """
+    app = web.Application()
+    app["state"] = state or StandinState()
+    app["tasks"] = set()
+    app.router.add_post("/v1/chat/completions", chat_completions)
+    app.router.add_post("/v1/files", upload_file)
+    app.router.add_get("/v1/files/{file_id}/content", file_content)
+    app.router.add_post("/v1/batches", create_batch)
+    app.router.add_get("/v1/batches/{batch_id}", get_batch)
+    app.router.add_post("/v1/batches/{batch_id}/cancel", cancel_batch)
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI 호환 로컬 스탠드인 서버를 실행합니다.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency-ms", type=float, default=300, help="응답 지연 (ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="429 응답 주입 확률")
+    parser.add_argument("--batch-delay", type=float, default=2.0, help="배치 작업 완료까지 걸리는 시간 (초)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    state = StandinState(args.latency_ms, args.error_rate, args.batch_delay, seed=args.seed)
+    logger.info(f"🧪 LLM 스탠드인 서버 시작: http://{args.host}:{args.port}/v1")
+    web.run_app(create_app(state), host=args.host, port=args.port, print=None)
+
+if __name__ == "__main__":
+    main()
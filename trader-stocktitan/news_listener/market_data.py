@@ -0,0 +1,90 @@
+import asyncio
+import time
+from .config import logger, MARKET_DATA_PROVIDER, SIM_SEED, SIM_CLOCK_SPEED, SIM_LATENCY_MS, SIM_ERROR_RATE
+from . import webull_client
+
+class MarketDataProvider:
+    """
+    시세 데이터 제공자 인터페이스
+
+    get_historical_data는 {'prices', 'volumes', 'times'(봉 시작 epoch 초) 배열, 'timestamp'},
+    get_realtime_data는 {'price', 'volume', 'timestamp'} 형식을 반환합니다. (실패 시 가격은 None)
+    """
+    name = "base"
+    speed = 1.0  # 시계 배속 (시뮬레이터만 1보다 큼)
+
+    def now(self) -> float:
+        """제공자 기준 현재 시각 (epoch 초)"""
+        return time.time()
+
+    async def initialize(self) -> bool:
+        return True
+
+    async def get_historical_data(self, symbol: str, minutes: int = 60, end_ts: float = None) -> dict:
+        raise NotImplementedError
+
+    async def get_realtime_data(self, symbol: str) -> dict:
+        raise NotImplementedError
+
+    async def get_realtime_data_batch(self, symbols: list) -> dict:
+        symbols = list(dict.fromkeys(symbols))
+        quotes = await asyncio.gather(*(self.get_realtime_data(symbol) for symbol in symbols))
+        return dict(zip(symbols, quotes))
+
+class WebullProvider(MarketDataProvider):
+    """webull 라이브러리 기반 실제 시세"""
+    name = "webull"
+
+    async def initialize(self) -> bool:
+        return await webull_client.initialize_webull()
+
+    async def get_historical_data(self, symbol: str, minutes: int = 60, end_ts: float = None) -> dict:
+        return await webull_client.get_historical_data(symbol, minutes, end_ts)
+
+    async def get_realtime_data(self, symbol: str) -> dict:
+        return await webull_client.get_realtime_data(symbol)
+
+    async def get_realtime_data_batch(self, symbols: list) -> dict:
+        return await webull_client.get_realtime_data_batch(symbols)
+
+def _create_provider() -> MarketDataProvider:
+    if MARKET_DATA_PROVIDER == "simulator":
+        from .simulator import SimulatorProvider
+        return SimulatorProvider(seed=SIM_SEED, speed=SIM_CLOCK_SPEED, latency_ms=SIM_LATENCY_MS, error_rate=SIM_ERROR_RATE)
+    return WebullProvider()
+
+# 프로세스 전역 시세 제공자 (MARKET_DATA_PROVIDER로 선택, set_provider로 교체 가능)
+_provider = _create_provider()
+
+def get_provider() -> MarketDataProvider:
+    return _provider
+
+def set_provider(provider: MarketDataProvider):
+    """시세 제공자를 교체합니다. (오프라인 부하 테스트용)"""
+    global _provider
+    _provider = provider
+    logger.info(f"🔀 시세 제공자 변경: {provider.name} (배속 x{provider.speed:g})")
+
+def now() -> float:
+    """현재 시세 제공자 기준 시각 (epoch 초)"""
+    return _provider.now()
+
+def real_delay(seconds: float) -> float:
+    """제공자 시계 기준 대기 시간을 실제 대기 시간으로 변환합니다."""
+    return seconds / _provider.speed
+
+async def initialize_market_data() -> bool:
+    """시세 제공자를 초기화합니다."""
+    return await _provider.initialize()
+
+async def get_historical_data(symbol: str, minutes: int = 60, end_ts: float = None) -> dict:
+    """end_ts(기본: 현재) 이전에 시작한 1분봉 minutes개를 열 단위 배열로 반환합니다."""
+    return await _provider.get_historical_data(symbol, minutes, end_ts)
+
+async def get_realtime_data(symbol: str) -> dict:
+    """종목의 실시간 시세를 반환합니다."""
+    return await _provider.get_realtime_data(symbol)
+
+async def get_realtime_data_batch(symbols: list) -> dict:
+    """여러 종목의 실시간 시세를 반환합니다."""
+    return await _provider.get_realtime_data_batch(symbols)
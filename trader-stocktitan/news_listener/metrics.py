@@ -0,0 +1,108 @@
+import re
+import threading
+from collections import deque
+from aiohttp import web
+from .config import logger, METRICS_PORT
+
+# 히스토그램별로 보관할 최근 관측값 개수
+_MAX_SAMPLES = 1024
+
+_lock = threading.Lock()
+_gauges = {}
+_counters = {}
+_samples = {}
+
+def set_gauge(name: str, value: float):
+    """게이지 값을 설정합니다."""
+    with _lock:
+        _gauges[name] = value
+
+def inc_counter(name: str, amount: float = 1):
+    """카운터 값을 증가시킵니다."""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+def observe(name: str, value: float):
+    """히스토그램에 관측값을 추가합니다."""
+    with _lock:
+        if name not in _samples:
+            _samples[name] = deque(maxlen=_MAX_SAMPLES)
+        _samples[name].append(value)
+
+def _percentile(sorted_values: list, pct: float) -> float:
+    """정렬된 값 목록에서 백분위수를 계산합니다."""
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+def get_histogram(name: str) -> dict:
+    """히스토그램 요약(count, avg, p50, p95, p99, max)을 반환합니다."""
+    with _lock:
+        values = sorted(_samples.get(name, ()))
+    if not values:
+        return {"count": 0, "avg": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    return {
+        "count": len(values),
+        "avg": sum(values) / len(values),
+        "p50": _percentile(values, 50),
+        "p95": _percentile(values, 95),
+        "p99": _percentile(values, 99),
+        "max": values[-1]
+    }
+
+def get_snapshot() -> dict:
+    """전체 메트릭 스냅샷을 반환합니다."""
+    with _lock:
+        gauges = dict(_gauges)
+        counters = dict(_counters)
+        names = list(_samples)
+    return {
+        "gauges": gauges,
+        "counters": counters,
+        "histograms": {name: get_histogram(name) for name in names}
+    }
+
+_NAME_PATTERN = re.compile(r"[^a-zA-Z0-9_]")
+
+def render_prometheus() -> str:
+    """스냅샷을 Prometheus 텍스트 형식으로 변환합니다. (히스토그램은 분위수 summary)"""
+    snapshot = get_snapshot()
+    lines = []
+    for kind, values in (("gauge", snapshot["gauges"]), ("counter", snapshot["counters"])):
+        for name, value in sorted(values.items()):
+            name = _NAME_PATTERN.sub("_", name)
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name} {value}")
+    for name, histogram in sorted(snapshot["histograms"].items()):
+        name = _NAME_PATTERN.sub("_", name)
+        lines.append(f"# TYPE {name} summary")
+        for quantile in ("50", "95", "99"):
+            lines.append(f'{name}{{quantile="0.{quantile}"}} {histogram["p" + quantile]}')
+        lines.append(f"{name}_sum {histogram['avg'] * histogram['count']}")
+        lines.append(f"{name}_count {histogram['count']}")
+    return "\n".join(lines) + "\n"
+
+_metrics_runner = None
+
+async def start_metrics_server(port: int = METRICS_PORT):
+    """
+    메트릭 HTTP 서버를 시작합니다. (/metrics: Prometheus 텍스트, /metrics.json: 스냅샷 JSON, 0이면 끔)
+    """
+    global _metrics_runner
+    if not port or _metrics_runner is not None:
+        return
+
+    async def prometheus(request):
+        return web.Response(text=render_prometheus(), content_type="text/plain")
+
+    async def snapshot(request):
+        return web.json_response(get_snapshot())
+
+    app = web.Application()
+    app.router.add_get("/metrics", prometheus)
+    app.router.add_get("/metrics.json", snapshot)
+    _metrics_runner = web.AppRunner(app)
+    await _metrics_runner.setup()
+    await web.TCPSite(_metrics_runner, "0.0.0.0", port).start()
+    logger.info(f"📏 메트릭 서버 시작: :{port}/metrics")
@@ -0,0 +1,44 @@
+from datetime import datetime
+from .event_record import EventRecord
+
+class NewsEvent:
+    """
+    뉴스 이벤트 한 건의 처리 문맥
+
+    뉴스 원문, LLM 분석 결과, 사전 점수, 뉴스 발생 전 1분봉, 가격 예측, 분 샘플(EventRecord)을 함께 들고
+    handle_news → 모니터링 → 알림 단계로 그대로 전달됩니다.
+    디스크는 저장용으로만 쓰고(진행 중에는 체크포인트, 완료 후에는 이벤트 저장소), 단계 사이에서 다시 읽지 않습니다.
+    """
+    __slots__ = ("news", "news_ts", "prescore", "llm_result", "history", "prediction", "record", "alert")
+
+    def __init__(self, record: EventRecord, news: dict, news_ts: float, prescore: dict = None):
+        self.record = record
+        self.news = news
+        self.news_ts = news_ts      # 뉴스 발생 시각 (epoch 초)
+        self.prescore = prescore or {}
+        self.llm_result = None      # GPT 뉴스 분석 결과
+        self.history = None         # 뉴스 발생 전 1분봉 (get_historical_data 결과)
+        self.prediction = None      # 60분 후 검증 대기 중인 가격 예측
+        self.alert = None           # live 알림 모드의 단일 텔레그램 메시지 (LiveAlert)
+
+    @classmethod
+    def from_payload(cls, data: dict) -> "NewsEvent":
+        """수신한 뉴스 메시지로 이벤트를 만듭니다. (평점은 GPT 분석이 끝나면 채움)"""
+        news = data["payload"]["news"]
+        stock = data["payload"].get("stock", {})
+        symbol = news.get("symbol", "")
+        file_ts = datetime.fromtimestamp(news["timestamp"] / 1000).strftime("%Y-%m-%d_%H-%M")
+        record = EventRecord(f"{symbol}_{file_ts}", symbol, stock.get("marketCap", ""), None)
+        return cls(record, news, news["timestamp"] / 1000, data.get("prescore"))
+
+    @property
+    def symbol(self) -> str:
+        return self.record.symbol
+
+    @property
+    def market_cap(self):
+        return self.record.market_cap
+
+    @property
+    def event_id(self) -> str:
+        return self.record.event_id
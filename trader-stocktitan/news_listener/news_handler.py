@@ -1,73 +1,135 @@
-import csv
-import json
-from datetime import datetime
-from .config import logger, generate_columns
-from .llm_analyzer import analyze_news_with_gpt
-from .price_monitor import start_monitoring_threads
-from .telegram_notifier import send_error_notification
-
-def handle_news(data: dict, save_dir: str) -> str:
+import asyncio
+import time
+from .config import logger
+from .llm_analyzer import analyze_news_with_gpt, get_partial_analysis
+from .news_event import NewsEvent
+from .quote_cache import quote_snapshot
+from .scheduler import MonitorWindow, monitor_scheduler
+from .price_monitor import (
+    load_history,
+    predict_and_save,
+    start_monitoring_window,
+    finish_post_news_window,
+    on_window_sample
+)
+from .telegram_notifier import (
+    send_error_notification,
+    send_historical_analysis_notification,
+    send_preliminary_analysis_notification
+)
+from . import metrics
+
+class _Pipeline:
+    """
+    뉴스 한 건의 처리 단계들을 태스크로 실행하며 단계별 소요 시간을 기록합니다.
+    (각 단계는 입력이 준비되는 즉시 시작)
+    """
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.started_at = time.monotonic()
+        self.timings = {}
+        self.tasks = []
+
+    def stage(self, name: str, coro) -> asyncio.Task:
+        task = asyncio.create_task(self._timed(name, coro))
+        self.tasks.append(task)
+        return task
+
+    async def _timed(self, name: str, coro):
+        started_at = time.monotonic()
+        try:
+            return await coro
+        finally:
+            elapsed = time.monotonic() - started_at
+            self.timings[name] = elapsed
+            metrics.observe(f"pipeline_{name}_seconds", elapsed)
+
+    def finish(self):
+        elapsed = time.monotonic() - self.started_at
+        metrics.observe("pipeline_headline_to_alert_seconds", elapsed)
+        stages = ", ".join(f"{name}={seconds:.2f}s" for name, seconds in self.timings.items())
+        logger.info(f"⏱️ {self.symbol} 뉴스 처리 {elapsed:.2f}s ({stages})")
+
+async def _first_quote_price(quote_task: asyncio.Task):
+    """첫 실시간 시세 가격 (실패하면 None)"""
+    try:
+        return (await quote_task)['price']
+    except Exception as e:
+        logger.warning(f"⚠️ 첫 실시간 시세 조회 실패: {e}")
+        return None
+
+async def _predict_when_ready(window: MonitorWindow, history_task: asyncio.Task, quote_task: asyncio.Task):
+    """과거 데이터와 첫 시세가 준비되는 즉시 가격을 예측합니다. (뉴스 분석과 병렬)"""
+    try:
+        await history_task
+    except Exception as e:
+        error_msg = f"모니터링 오류 ({window.symbol}): {e}"
+        logger.error(f"❌ {error_msg}")
+        await send_error_notification("모니터링 오류", error_msg, window.symbol)
+    current_price = await _first_quote_price(quote_task)
+    return await predict_and_save(window, current_price)
+
+async def handle_news(data: dict) -> str:
     """
-    뉴스 데이터 수신 → CSV 저장 및 스레드 시작
+    뉴스 데이터 수신 → 분석 및 모니터링 시작 (수집이 끝나면 이벤트 저장소에 저장)
+
+    GPT 뉴스 분석, 과거 60분 데이터 수집, 첫 실시간 시세 조회를 동시에 시작하고,
+    가격 예측은 과거 데이터와 첫 시세가 준비되는 즉시 (뉴스 분석을 기다리지 않고) 시작합니다.
+    분석 스트리밍 중 평점/감성/영향도가 먼저 완성되면 예비 알림을 바로 보냅니다.
+    뉴스 한 건의 문맥은 NewsEvent 하나에 담아 모니터링/알림 단계로 넘깁니다.
     """
     try:
-        news = data["payload"]["news"]
-        stock = data["payload"].get("stock", {})
-
-        symbol = news.get("symbol", "")
-        timestamp = datetime.fromtimestamp(news["timestamp"] / 1000)
-        file_ts = timestamp.strftime("%Y-%m-%d_%H-%M")
-        filename = f"{symbol}_{file_ts}.csv"
-        filepath = f"{save_dir}/{filename}"
-
-        market_cap = stock.get("marketCap", "")
-        
-        # GPT로 뉴스 분석
+        event = NewsEvent.from_payload(data)
+        news = event.news
+        record = event.record
+        symbol = event.symbol
+
+        window = MonitorWindow(event, on_complete=finish_post_news_window, on_sample=on_window_sample)
+        pipeline = _Pipeline(symbol)
+        preliminary = {}
+
+        def on_preliminary(fields: dict):
+            # 분석 본문이 스트리밍되는 동안 평점을 먼저 반영하고 예비 알림 전송
+            preliminary.update(fields)
+            record.llm_rating = fields['rating']
+            pipeline.stage("preliminary_alert", send_preliminary_analysis_notification(event, fields))
+
+        # 독립 단계들을 동시에 시작
         logger.info(f"🤖 GPT 분석 시작: {symbol}")
-        llm_result = analyze_news_with_gpt(news)
-        
+        analysis_task = pipeline.stage("analysis", analyze_news_with_gpt(
+            news, on_fields=on_preliminary, model=event.prescore.get("model")
+        ))
+        history_task = pipeline.stage("history", load_history(window))
+        quote_task = pipeline.stage("first_quote", quote_snapshot.get(symbol))
+        prediction_task = pipeline.stage("prediction", _predict_when_ready(window, history_task, quote_task))
+
+        # 뉴스 발생 후 60분 수집 창은 바로 등록
+        await start_monitoring_window(window)
+
+        llm_result = await analysis_task
+        if llm_result.get("fallback") and preliminary:
+            # 예비 알림으로 이미 보낸 평점을 기본 분석(평점 3)으로 덮어쓰지 않음
+            llm_result = get_partial_analysis(preliminary, "없음")
+
         # 분석 결과 로깅
         logger.info(f"📊 분석 결과 - {symbol}: 평점={llm_result['rating']}, 감성={llm_result['sentiment']}")
         logger.info(f"💬 분석 내용: {llm_result['analysis'][:100]}...")
-        
-        # CSV에 저장할 데이터 (기존 sentiment_score 대신 GPT rating 사용)
-        sentiment_score = llm_result['rating']
-
-        row = [symbol, market_cap, 1, sentiment_score]
-        row += [""] * (60 * 2 + 60 * 2)
-
-        # CSV 파일 생성
-        with open(filepath, mode="w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(generate_columns())
-            writer.writerow(row)
-        
-        # 분석 결과를 별도 JSON 파일로도 저장
-        analysis_filename = f"{symbol}_{file_ts}_analysis.json"
-        analysis_filepath = f"{save_dir}/{analysis_filename}"
-        
-        analysis_data = {
-            "symbol": symbol,
-            "timestamp": timestamp.isoformat(),
-            "news": news,
-            "llm_analysis": llm_result,
-            "market_cap": market_cap
-        }
-        
-        with open(analysis_filepath, 'w', encoding='utf-8') as f:
-            json.dump(analysis_data, f, ensure_ascii=False, indent=2)
-        
-        logger.info(f"💾 분석 결과 저장: {analysis_filename}")
-        logger.info(f"[📰 저장 완료] {filename}")
-        logger.info(f"⏳ 과거 60분 데이터 분석 후 알림 예정: {symbol}")
-
-        # 가격 모니터링 스레드 시작
-        start_monitoring_threads(symbol, filepath)
-
-        return filepath
+
+        # 저장할 평점 (기존 sentiment_score 대신 GPT rating 사용) - 완료 전까지는 체크포인트에 보관
+        event.llm_result = llm_result
+        record.llm_rating = llm_result['rating']
+        monitor_scheduler.checkpoint(window)
+
+        # 과거 데이터 분석 및 가격 예측 알림
+        await prediction_task
+        await pipeline.stage("notify", send_historical_analysis_notification(event))
+        pipeline.finish()
+
+        return event.event_id
 
     except Exception as e:
         error_msg = f"뉴스 처리 오류: {e}"
         logger.error(f"❌ {error_msg}")
-        send_error_notification("뉴스 처리 오류", error_msg)
+        await send_error_notification("뉴스 처리 오류", error_msg)
         return None
@@ -0,0 +1,232 @@
+import argparse
+import json
+import math
+import os
+import random
+import re
+import zlib
+import numpy as np
+from .config import (
+    logger, EVENT_STORE_DIR, GPT_MODEL, LLM_CHEAP_MODEL,
+    PRESCORER_MODEL_PATH, PRESCORER_DROP_BELOW, PRESCORER_FULL_ABOVE, PRESCORER_EXPLORE_RATE
+)
+from .event_store import read_events
+from . import metrics
+
+# 해시 특징 공간 크기 (2^bits)
+HASH_BITS = 18
+
+# 라우팅 결과
+ROUTE_DROP = "drop"
+ROUTE_CHEAP = "cheap"
+ROUTE_FULL = "full"
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[.'&-][a-z0-9]+)*")
+_DIGIT_PATTERN = re.compile(r"\d")
+
+def headline_features(title: str, hash_bits: int = HASH_BITS) -> np.ndarray:
+    """
+    헤드라인의 해시 n-gram 특징 인덱스 (단어 unigram + bigram, 숫자는 0으로 정규화)
+    """
+    tokens = [_DIGIT_PATTERN.sub("0", token) for token in _TOKEN_PATTERN.findall((title or "").lower())]
+    grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    mask = (1 << hash_bits) - 1
+    return np.unique(np.fromiter((zlib.crc32(gram.encode("utf-8")) & mask for gram in grams), dtype=np.int64, count=len(grams)))
+
+def label_analysis(llm_analysis: dict):
+    """
+    GPT 분석 결과를 학습 라벨로 바꿉니다. (방향성 평점 또는 높은 영향도 = 1, 기본 분석은 None)
+    """
+    if not llm_analysis or str(llm_analysis.get("analysis", "")).startswith("분석 실패"):
+        return None
+    try:
+        rating = int(llm_analysis.get("rating", 3))
+    except (TypeError, ValueError):
+        return None
+    return 1 if rating != 3 or llm_analysis.get("impact") == "high" else 0
+
+def load_examples(store_dir: str = EVENT_STORE_DIR, start: str = None, end: str = None) -> list:
+    """
+    이벤트 저장소에서 (이벤트 ID, 헤드라인, 라벨) 목록을 읽습니다.
+
+    저가 모델로 분석된 행은 라벨이 전체 모델과 달라 제외합니다. 버림 경로는 저장되지 않으므로
+    그 구간의 라벨은 탐색 비율(PRESCORER_EXPLORE_RATE)로 전체 모델에 보낸 뉴스에서만 얻습니다.
+    """
+    events = read_events(start, end, columns=["event_id", "title", "llm_analysis", "route"], root=store_dir)
+    examples = []
+    rows = zip(events.get("event_id", []), events.get("title", []), events.get("llm_analysis", []), events.get("route", []))
+    for event_id, title, llm_analysis, route in rows:
+        if route == ROUTE_CHEAP:
+            continue
+        label = label_analysis(json.loads(llm_analysis) if llm_analysis else None)
+        if label is not None and title:
+            examples.append((event_id, title, label))
+    return examples
+
+class HeadlinePrescorer:
+    """
+    해시 n-gram 로지스틱 회귀로 헤드라인의 중요도를 점수화하고 GPT 호출 경로를 정합니다.
+
+    - 점수 < drop_below: 버림 (GPT 호출 없음)
+    - 점수 < full_above: 저가 모델 (LLM_CHEAP_MODEL)
+    - 그 외: 전체 모델 (GPT_MODEL)
+    버림/저가 경로 중 explore_rate 비율은 전체 모델로 보내(explore 표시) 재학습용 라벨을 남깁니다.
+    모델 파일이 없으면 모든 뉴스를 전체 모델로 보냅니다. (기존 동작)
+    """
+
+    def __init__(self, path: str = PRESCORER_MODEL_PATH, drop_below: float = PRESCORER_DROP_BELOW,
+                 full_above: float = PRESCORER_FULL_ABOVE, explore_rate: float = PRESCORER_EXPLORE_RATE,
+                 seed: int = None):
+        self.path = path
+        self.drop_below = drop_below
+        self.full_above = full_above
+        self.explore_rate = explore_rate
+        self._rng = random.Random(seed)
+        self.hash_bits = HASH_BITS
+        self.weights = None
+        self.bias = 0.0
+
+    @property
+    def loaded(self) -> bool:
+        return self.weights is not None
+
+    def load(self) -> bool:
+        """모델 파일을 읽습니다. 없거나 손상됐으면 라우팅 없이 동작합니다."""
+        if not os.path.exists(self.path):
+            return False
+        try:
+            with np.load(self.path) as model:
+                self.weights = model["weights"].astype(np.float32)
+                self.bias = float(model["bias"])
+                self.hash_bits = int(model["hash_bits"])
+            logger.info(f"🧮 헤드라인 사전 점수 모델 로드: {self.path}")
+            return True
+        except Exception as e:
+            self.weights = None
+            logger.error(f"❌ 헤드라인 사전 점수 모델 읽기 실패: {e}")
+            return False
+
+    def save(self, path: str = None):
+        path = path or self.path
+        with open(path, "wb") as f:
+            np.savez(f, weights=self.weights, bias=np.float64(self.bias), hash_bits=np.int64(self.hash_bits))
+
+    def score(self, title: str) -> float:
+        """헤드라인이 GPT 분석에서 의미 있는 결과를 낼 확률 (0~1)"""
+        z = self.bias + float(self.weights[headline_features(title, self.hash_bits)].sum())
+        return 1.0 / (1.0 + math.exp(-max(-30.0, min(30.0, z))))
+
+    def route_for(self, score: float) -> str:
+        if score < self.drop_below:
+            return ROUTE_DROP
+        if score < self.full_above:
+            return ROUTE_CHEAP
+        return ROUTE_FULL
+
+    def route(self, title: str) -> dict:
+        """
+        헤드라인의 점수, 경로, 분석에 쓸 모델을 반환합니다.
+        """
+        if not self.loaded:
+            return {"score": None, "route": ROUTE_FULL, "model": GPT_MODEL}
+        score = self.score(title)
+        route = self.route_for(score)
+        metrics.inc_counter(f"prescorer_{route}_total")
+        if route != ROUTE_FULL and self._rng.random() < self.explore_rate:
+            metrics.inc_counter("prescorer_explore_total")
+            return {"score": score, "route": ROUTE_FULL, "model": GPT_MODEL, "explore": route}
+        return {"score": score, "route": route, "model": (LLM_CHEAP_MODEL or GPT_MODEL) if route == ROUTE_CHEAP else GPT_MODEL}
+
+    def fit(self, titles: list, labels: list, epochs: int = 10, learning_rate: float = 0.1, l2: float = 1e-5,
+            seed: int = 0):
+        """희소 특징 위에서 SGD로 로지스틱 회귀를 학습합니다. (클래스 불균형은 가중치로 보정)"""
+        features = [headline_features(title, self.hash_bits) for title in titles]
+        y = np.asarray(labels, dtype=np.float64)
+        positive_rate = min(max(y.mean(), 1e-3), 1 - 1e-3) if len(y) else 0.5
+        class_weight = {1.0: 0.5 / positive_rate, 0.0: 0.5 / (1 - positive_rate)}
+
+        weights = np.zeros(1 << self.hash_bits, dtype=np.float64)
+        bias = math.log(positive_rate / (1 - positive_rate))
+        rng = np.random.default_rng(seed)
+        for epoch in range(epochs):
+            rate = learning_rate / (1 + epoch)
+            for i in rng.permutation(len(features)):
+                index = features[i]
+                z = bias + weights[index].sum()
+                p = 1.0 / (1.0 + math.exp(-max(-30.0, min(30.0, z))))
+                gradient = (p - y[i]) * class_weight[y[i]]
+                weights[index] -= rate * (gradient + l2 * weights[index])
+                bias -= rate * gradient
+
+        self.weights = weights.astype(np.float32)
+        self.bias = bias
+        return self
+
+    def evaluate(self, titles: list, labels: list) -> dict:
+        """홀드아웃 데이터의 AUC, 경로별 비율, 버린 뉴스 중 놓친 중요 뉴스 비율"""
+        scores = np.array([self.score(title) for title in titles])
+        y = np.asarray(labels)
+        routes = [self.route_for(score) for score in scores]
+        dropped = np.array([route == ROUTE_DROP for route in routes])
+        positives = max(int(y.sum()), 1)
+        return {
+            "examples": len(y),
+            "positive_rate": float(y.mean()) if len(y) else 0.0,
+            "auc": _auc(scores, y),
+            "routes": {route: routes.count(route) for route in (ROUTE_DROP, ROUTE_CHEAP, ROUTE_FULL)},
+            "dropped_positive_rate": float((dropped & (y == 1)).sum() / positives),
+            "full_precision": float(y[[route == ROUTE_FULL for route in routes]].mean()) if ROUTE_FULL in routes else 0.0
+        }
+
+def _auc(scores: np.ndarray, labels: np.ndarray) -> float:
+    """순위 기반 ROC AUC (한 클래스만 있으면 0.5)"""
+    positives = int(labels.sum())
+    negatives = len(labels) - positives
+    if not positives or not negatives:
+        return 0.5
+    ranks = np.empty(len(scores))
+    ranks[np.argsort(scores, kind="mergesort")] = np.arange(1, len(scores) + 1)
+    return float((ranks[labels == 1].sum() - positives * (positives + 1) / 2) / (positives * negatives))
+
+def _is_holdout(name: str, holdout: float) -> bool:
+    """이벤트 ID 해시로 고정된 학습/검증 분할"""
+    return (zlib.crc32(name.encode("utf-8")) % 1000) < holdout * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="수집된 분석 결과로 헤드라인 사전 점수 모델을 학습/평가합니다.")
+    parser.add_argument("command", choices=["train", "evaluate"])
+    parser.add_argument("--store-dir", default=EVENT_STORE_DIR, help="이벤트 저장소 폴더")
+    parser.add_argument("--start", help="학습 데이터 시작 날짜 (YYYY-MM-DD)")
+    parser.add_argument("--end", help="학습 데이터 끝 날짜 (YYYY-MM-DD)")
+    parser.add_argument("--model", default=PRESCORER_MODEL_PATH, help="모델 파일 경로")
+    parser.add_argument("--holdout", type=float, default=0.2, help="검증용 비율 (이벤트 ID 해시 기준)")
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--learning-rate", type=float, default=0.1)
+    parser.add_argument("--drop-below", type=float, default=PRESCORER_DROP_BELOW)
+    parser.add_argument("--full-above", type=float, default=PRESCORER_FULL_ABOVE)
+    args = parser.parse_args()
+
+    examples = load_examples(args.store_dir, args.start, args.end)
+    train = [(title, label) for name, title, label in examples if not _is_holdout(name, args.holdout)]
+    holdout = [(title, label) for name, title, label in examples if _is_holdout(name, args.holdout)]
+    prescorer = HeadlinePrescorer(args.model, args.drop_below, args.full_above)
+
+    if args.command == "train":
+        if not train:
+            parser.error(f"학습 데이터가 없습니다: {args.store_dir}")
+        prescorer.fit(*zip(*train), epochs=args.epochs, learning_rate=args.learning_rate)
+        prescorer.save()
+        logger.info(f"💾 헤드라인 사전 점수 모델 저장: {args.model} (학습 {len(train)}건)")
+    elif not prescorer.load():
+        parser.error(f"모델 파일이 없습니다: {args.model}")
+
+    summary = {"train_examples": len(train)}
+    if holdout:
+        summary["holdout"] = prescorer.evaluate(*zip(*holdout))
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+
+# 프로세스 전역 헤드라인 사전 점수기
+headline_prescorer = HeadlinePrescorer()
+
+if __name__ == "__main__":
+    main()
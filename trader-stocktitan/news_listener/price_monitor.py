@@ -1,124 +1,248 @@
-import csv
-import time
-import threading
-from .config import logger
-from .webull_client import get_historical_data, get_realtime_data
-from .telegram_notifier import send_error_notification, send_historical_analysis_notification, send_final_result_notification
+import asyncio
+import math
+from datetime import datetime
+import numpy as np
+from .config import logger, STREAM_ALERT_PCT
+from .event_record import EventRecord
+from .event_store import news_event_store
+from .news_event import NewsEvent
+from .market_data import get_historical_data, now as market_now
+from .scheduler import MonitorWindow, monitor_scheduler
+from .checkpoint import load_checkpoint, restore_event
+from .quote_stream import streaming_quotes
+from .llm_analyzer import predict_price_with_gpt
+from .telegram_notifier import (
+    send_error_notification,
+    send_historical_analysis_notification,
+    send_final_result_notification,
+    send_price_move_alert,
+    update_live_price
+)
 
-def monitor_price_thread(symbol: str, filepath: str, before: bool = True):
+# 실행 중인 모니터링 태스크 (가비지 컬렉션 방지용 참조 보관)
+_monitor_tasks = set()
+
+# 체크포인트 복원 여부 (재연결로 main()이 다시 돌아도 프로세스당 한 번만 복원)
+_resumed = False
+
+def _start_task(coro):
+    task = asyncio.create_task(coro)
+    _monitor_tasks.add(task)
+    task.add_done_callback(_monitor_tasks.discard)
+
+async def load_history(window: MonitorWindow) -> dict:
+    """
+    뉴스 발생 전 60분 가격 데이터를 수집해 뉴스 이벤트와 레코드에 기록합니다.
+    """
+    record = window.record
+    symbol = record.symbol
+
+    # 과거 60분 히스토리 데이터 한번에 가져오기
+    logger.info(f"🔍 뉴스 발생 전 60분 데이터 수집 시작: {symbol}")
+    historical_data = await get_historical_data(symbol, 60, end_ts=window.news_ts)
+
+    logger.info(f"✅ 과거 60분 데이터 수집 완료: {symbol} ({len(historical_data['prices'])}개)")
+
+    window.event.history = historical_data
+    record.set_before(historical_data['prices'], historical_data['volumes'])
+    window.history_done = True
+    monitor_scheduler.checkpoint()
+
+    completion_msg = f"뉴스 발생 전 60분 데이터 업데이트 완료: {symbol}"
+    logger.info(f"✅ {completion_msg}")
+    return historical_data
+
+async def predict_and_save(window: MonitorWindow, current_price: float = None) -> dict:
+    """
+    과거 60분 데이터로 1시간 후 가격을 예측해 뉴스 이벤트에 담고 저장합니다. (60분 후 검증까지 체크포인트에 보관)
+    """
+    event = window.event
+    record = event.record
+    prices = [p for p in EventRecord.values(record.pct_m) if p is not None]
+    volumes = [v for v in EventRecord.values(record.volume_m) if v is not None]
+    if not prices:
+        return None
+
+    # 뉴스 발표 시점 가격 (첫 실시간 시세가 있으면 우선 사용)
+    current_price = current_price or prices[-1]
+    prediction_result = await predict_price_with_gpt(record.symbol, event.news, prices, volumes, current_price)
+
+    event.prediction = {
+        "symbol": record.symbol,
+        "current_price": current_price,
+        "prediction": prediction_result,
+        "timestamp": datetime.now().isoformat()
+    }
+    monitor_scheduler.checkpoint(window)
+    return event.prediction
+
+async def monitor_price_task(window: MonitorWindow):
     """
-    가격 모니터링 스레드 함수
+    뉴스 발생 전 60분 가격 데이터 수집 → 가격 예측 → 알림 (재시작 후 복원된 창용 순차 경로)
     """
+    symbol = window.symbol
     try:
-        logger.info(f"🔍 가격 모니터링 스레드 시작: {symbol}")
-        
-        if before:
-            # 과거 60분 히스토리 데이터 한번에 가져오기
-            logger.info(f"🔍 뉴스 발생 전 60분 데이터 수집 시작: {symbol}")
-            historical_data = get_historical_data(symbol, 60)
-            
-            price_data = {
-                'pct': historical_data['prices'],
-                'volume': historical_data['volumes']
-            }
-            
-            logger.info(f"✅ 과거 60분 데이터 수집 완료: {symbol} ({len(price_data['pct'])}개)")
-            
-        else:
-            # 뉴스 발생 후 60분 동안 1분마다 실시간 데이터 수집
-            logger.info(f"🔍 뉴스 발생 후 60분 데이터 수집 시작: {symbol}")
-            price_data = {'pct': [], 'volume': []}
-            
-            for i in range(1, 61):  # 1분부터 60분까지
-                data = get_realtime_data(symbol)
-                price_data['pct'].append(data['price'])
-                price_data['volume'].append(data['volume'])
-                logger.info(f"📊 {i}분차 {symbol} 실시간 데이터: 가격={data['price']}, 볼륨={data['volume']}")
-                
-                time.sleep(60)  # 실제 1분 대기
-        
-        update_csv_with_price_data(filepath, price_data, before=before)
-        
-        if before:
-            completion_msg = f"뉴스 발생 전 60분 데이터 업데이트 완료: {symbol}"
-            logger.info(f"✅ {completion_msg}")
-            
-            # 과거 데이터 분석 및 가격 예측 알림
-            send_historical_analysis_notification(symbol, price_data['pct'], price_data['volume'], filepath)
-        else:
-            completion_msg = f"뉴스 발생 후 60분 데이터 수집 완료: {symbol}"
-            logger.info(f"✅ {completion_msg}")
-            
-            # 60분 후 결과 비교 분석 알림
-            send_final_result_notification(symbol, price_data['pct'], price_data['volume'], filepath)
-        
+        # 뉴스와 분석 결과는 체크포인트에서 복원된 뉴스 이벤트에 들어 있음
+        await load_history(window)
+        await predict_and_save(window)
+        await send_historical_analysis_notification(window.event)
+
     except Exception as e:
         error_msg = f"모니터링 오류 ({symbol}): {e}"
         logger.error(f"❌ {error_msg}")
-        send_error_notification("모니터링 오류", error_msg, symbol)
+        await send_error_notification("모니터링 오류", error_msg, symbol)
 
-def update_csv_with_price_data(filepath: str, price_data: dict, before: bool = True):
+async def finish_post_news_window(window: MonitorWindow):
     """
-    CSV 파일에 가격 데이터를 업데이트합니다.
+    스케줄러가 뉴스 발생 후 60분 수집을 마친 창을 마무리합니다.
     """
+    record = window.record
+    symbol = record.symbol
     try:
-        logger.info("🔍 가격 데이터 업데이트 시작")
-        # 기존 파일 읽기
-        with open(filepath, 'r', encoding='utf-8') as f:
-            reader = csv.reader(f)
-            rows = list(reader)
-        
-        if len(rows) >= 2:
-            # 가격 데이터 업데이트
-            data_row = rows[1]
-            # pct_m60~m1, volume_m60~m1, pct_p1~p60, volume_p1~p60 순서로 업데이트
-            start_idx = 4  # symbol, market_cap, news_flag, llm_rating 다음부터
-
-            if before:
-                # 이전 60분 데이터
-                for i in range(60):
-                    data_row[start_idx + i] = price_data['pct'][i]
-                    data_row[start_idx + 60 + i] = price_data['volume'][i]
-            else:
-                # 이후 60분 데이터  
-                for i in range(60):
-                    data_row[start_idx + 120 + i] = price_data['pct'][i]
-                    data_row[start_idx + 180 + i] = price_data['volume'][i]
-            
-            # 파일 다시 쓰기
-            with open(filepath, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerows(rows)
-                
+        if streaming_quotes is not None:
+            await streaming_quotes.release(symbol)
+
+        await store_event(window.event)
+
+        completion_msg = f"뉴스 발생 후 60분 데이터 수집 완료: {symbol}"
+        logger.info(f"✅ {completion_msg}")
+
+        # 60분 후 결과 비교 분석 알림
+        await send_final_result_notification(window.event)
+
     except Exception as e:
-        error_msg = f"CSV 업데이트 오류: {e}"
+        error_msg = f"모니터링 오류 ({symbol}): {e}"
         logger.error(f"❌ {error_msg}")
-        send_error_notification("CSV 업데이트 오류", error_msg)
+        await send_error_notification("모니터링 오류", error_msg, symbol)
 
-def start_monitoring_threads(symbol: str, filepath: str):
+def on_window_sample(window: MonitorWindow):
     """
-    가격 모니터링 스레드들을 시작합니다.
+    스케줄러가 분 샘플을 추가할 때마다 호출됩니다. (live 알림 모드의 현재가 갱신)
     """
     try:
-        # 과거 60분 데이터 수집 스레드 (즉시 실행)
-        monitor_thread_before = threading.Thread(
-            target=monitor_price_thread,
-            args=(symbol, filepath, True),  # before=True
-            daemon=False
-        )
-        monitor_thread_before.start()
-
-        # 미래 60분 데이터 수집 스레드 (백그라운드에서 계속 실행)
-        monitor_thread_after = threading.Thread(
-            target=monitor_price_thread,
-            args=(symbol, filepath, False),  # before=False
-            daemon=False
-        )
-        monitor_thread_after.start()
-        
-        logger.info(f"✅ 모니터링 스레드 시작 완료: {symbol}")
-        
+        update_live_price(window.event, window.samples, window.minutes)
     except Exception as e:
-        error_msg = f"모니터링 스레드 시작 오류 ({symbol}): {e}"
+        logger.error(f"❌ 실시간 알림 갱신 오류 ({window.symbol}): {e}")
+
+async def store_event(event: NewsEvent):
+    """
+    수집을 마친 뉴스 이벤트를 이벤트 저장소에 추가합니다. (버퍼에 모았다가 Parquet으로 일괄 저장)
+    """
+    try:
+        news_event_store.append(event)
+    except Exception as e:
+        error_msg = f"이벤트 저장 오류: {e}"
         logger.error(f"❌ {error_msg}")
-        send_error_notification("모니터링 스레드 오류", error_msg, symbol)
+        await send_error_notification("이벤트 저장 오류", error_msg, event.symbol)
+
+async def start_monitoring_window(window: MonitorWindow):
+    """
+    뉴스 발생 후 60분 데이터 수집 창을 중앙 스케줄러에 등록합니다. (뉴스 발생 시각 기준 매 분 일괄 수집)
+    """
+    symbol = window.symbol
+    try:
+        if streaming_quotes is not None:
+            await streaming_quotes.acquire(symbol)
+        monitor_scheduler.add_window(window)
+
+        logger.info(f"✅ 모니터링 창 등록 완료: {symbol}")
+
+    except Exception as e:
+        error_msg = f"모니터링 태스크 시작 오류 ({symbol}): {e}"
+        logger.error(f"❌ {error_msg}")
+        await send_error_notification("모니터링 태스크 오류", error_msg, symbol)
+
+def _backfill_from_bars(window: MonitorWindow, historical_data: dict, now: float) -> int:
+    """
+    재시작으로 놓친 분 샘플을 1분봉으로 채웁니다. (목표 시각 직전에 끝난 봉의 종가 사용)
+    """
+    bar_ends = historical_data['times'] + 60
+    filled = 0
+
+    while not window.done and window.next_due <= now:
+        due_at = window.next_due
+        index = int(np.searchsorted(bar_ends, due_at, side='right')) - 1
+        if index >= 0:
+            price, volume = historical_data['prices'][index], historical_data['volumes'][index]
+        else:
+            price, volume = None, None
+        window.add_sample(price, volume, now, now - due_at)
+        filled += 1
+
+    return filled
+
+async def resume_monitoring():
+    """
+    체크포인트에서 진행 중이던 모니터링 창들을 복원하고 놓친 분을 채운 뒤 스케줄러에 다시 등록합니다.
+    (프로세스당 한 번만 실행되며, 이미 등록된 event_id는 건너뜀)
+    """
+    global _resumed
+    if _resumed:
+        return 0
+    _resumed = True
+
+    entries = load_checkpoint()
+    if not entries:
+        return 0
+
+    logger.info(f"♻️ 체크포인트에서 모니터링 창 {len(entries)}개 복원 시작")
+    resumed = 0
+
+    for entry in entries:
+        symbol = entry.get("symbol", "")
+        if any(window.event.event_id == entry.get("event_id") for window in monitor_scheduler.windows_for(symbol)):
+            continue
+        try:
+            event = restore_event(entry)
+            window = MonitorWindow(event, on_complete=finish_post_news_window, minutes=entry["minutes"], on_sample=on_window_sample)
+            window.samples = entry["samples"]
+            window.history_done = entry["history_done"]
+
+            # 놓친 분 샘플은 1분봉으로 보충
+            now = market_now()
+            missed = min(window.minutes, math.floor((now - window.news_ts) / 60)) - window.samples
+            if missed > 0:
+                count = math.ceil((now - window.news_ts) / 60) + 1
+                historical_data = await get_historical_data(symbol, count)
+                filled = _backfill_from_bars(window, historical_data, now)
+                logger.info(f"♻️ {symbol} 놓친 {filled}분 샘플을 1분봉으로 보충")
+
+            if not window.history_done:
+                _start_task(monitor_price_task(window))
+
+            if streaming_quotes is not None and not window.done:
+                await streaming_quotes.acquire(symbol)
+            monitor_scheduler.add_window(window)
+            resumed += 1
+
+        except Exception as e:
+            error_msg = f"모니터링 창 복원 오류 ({symbol}): {e}"
+            logger.error(f"❌ {error_msg}")
+            await send_error_notification("모니터링 창 복원 오류", error_msg, symbol)
+
+    logger.info(f"✅ 모니터링 창 {resumed}개 복원 완료")
+    return resumed
+
+def check_price_move_alert(symbol: str, price: float, ts: float):
+    """
+    스트리밍 틱마다 활성 창의 기준가 대비 급등락을 확인하고 창당 한 번 알림을 보냅니다.
+    """
+    if STREAM_ALERT_PCT <= 0:
+        return
+
+    for window in monitor_scheduler.windows_for(symbol):
+        if window.reference_price is None:
+            window.reference_price = price
+            continue
+        if window.alerted or not window.reference_price:
+            continue
+
+        move_pct = (price - window.reference_price) / window.reference_price * 100
+        if abs(move_pct) >= STREAM_ALERT_PCT:
+            window.alerted = True
+            bars = streaming_quotes.aggregator.get_bars(symbol)
+            bar = bars[-1].to_dict() if bars else None
+            _start_task(send_price_move_alert(window.event, window.reference_price, price, move_pct, bar))
+
+if streaming_quotes is not None:
+    streaming_quotes.add_listener(check_price_move_alert)
@@ -0,0 +1,103 @@
+import asyncio
+from datetime import datetime
+from .config import logger, QUOTE_SNAPSHOT_TTL, QUOTE_BATCH_WINDOW_MS
+from .market_data import get_realtime_data_batch, now as market_now
+from .quote_stream import streaming_quotes
+from . import metrics
+
+class QuoteSnapshot:
+    """
+    종목별 시세 스냅샷 계층
+
+    - 스트리밍 시세 모드에서는 스트림의 최신 시세로 바로 응답합니다.
+    - TTL 안의 반복 요청은 마지막 스냅샷으로 응답합니다.
+    - 같은 종목에 대한 동시 요청은 하나의 진행 중 조회를 공유합니다.
+    - 짧은 배치 창 안에 들어온 여러 종목 요청은 한 번의 배치 조회로 묶습니다.
+    """
+
+    def __init__(self, ttl: float = QUOTE_SNAPSHOT_TTL, batch_window: float = QUOTE_BATCH_WINDOW_MS / 1000):
+        self.ttl = ttl
+        self.batch_window = batch_window
+        self._snapshots = {}  # symbol -> (fetched_at, data)
+        self._inflight = {}   # symbol -> Future
+        self._pending = set()
+        self._flush_scheduled = False
+        self._flush_tasks = set()
+
+    async def get(self, symbol: str) -> dict:
+        """단일 종목 시세를 반환합니다."""
+        return (await self.get_many([symbol]))[symbol]
+
+    async def get_many(self, symbols: list) -> dict:
+        """여러 종목 시세를 반환합니다. 필요한 종목만 배치로 업스트림 조회합니다."""
+        loop = asyncio.get_running_loop()
+        now = market_now()
+        results = {}
+        waiting = {}
+
+        for symbol in set(symbols):
+            metrics.inc_counter("quote_requests_total")
+            streamed = streaming_quotes.get_quote(symbol) if streaming_quotes is not None else None
+            if streamed is not None:
+                metrics.inc_counter("quote_stream_hits_total")
+                results[symbol] = streamed
+                continue
+
+            snapshot = self._snapshots.get(symbol)
+            if snapshot and now - snapshot[0] < self.ttl:
+                metrics.inc_counter("quote_snapshot_hits_total")
+                results[symbol] = snapshot[1]
+            elif symbol in self._inflight:
+                metrics.inc_counter("quote_coalesced_total")
+                waiting[symbol] = self._inflight[symbol]
+            else:
+                future = loop.create_future()
+                self._inflight[symbol] = future
+                self._pending.add(symbol)
+                waiting[symbol] = future
+
+        if self._pending and not self._flush_scheduled:
+            self._flush_scheduled = True
+            loop.call_later(self.batch_window, self._start_flush)
+
+        for symbol, future in waiting.items():
+            results[symbol] = await asyncio.shield(future)
+
+        return results
+
+    def _start_flush(self):
+        task = asyncio.ensure_future(self._flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _flush(self):
+        """배치 창 동안 모인 종목들을 한 번에 조회하고 대기 중인 요청들에 결과를 전달합니다."""
+        symbols = list(self._pending)
+        self._pending.clear()
+        self._flush_scheduled = False
+
+        try:
+            quotes = await get_realtime_data_batch(symbols)
+        except Exception as e:
+            logger.error(f"❌ 시세 스냅샷 조회 오류: {e}")
+            quotes = {}
+
+        fetched_at = market_now()
+        for symbol in symbols:
+            data = quotes.get(symbol) or {'price': None, 'volume': None, 'timestamp': datetime.fromtimestamp(fetched_at)}
+            if data['price'] is not None:
+                self._snapshots[symbol] = (fetched_at, data)
+            future = self._inflight.pop(symbol)
+            if not future.done():
+                future.set_result(data)
+
+        self._evict_expired(fetched_at)
+
+    def _evict_expired(self, now: float):
+        """만료된 스냅샷을 정리합니다."""
+        expired = [symbol for symbol, (fetched_at, _) in self._snapshots.items() if now - fetched_at >= self.ttl]
+        for symbol in expired:
+            del self._snapshots[symbol]
+
+# 프로세스 전역 시세 스냅샷
+quote_snapshot = QuoteSnapshot()
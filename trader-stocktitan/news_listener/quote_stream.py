@@ -0,0 +1,350 @@
+import asyncio
+import json
+import random
+import threading
+import time
+import zlib
+from collections import deque
+from datetime import datetime
+from .config import logger, QUOTE_MODE, QUOTE_STREAM_SOURCE, STREAM_STALE_SECONDS, STREAM_BAR_HISTORY, FAKE_STREAM_TICK_MS
+from .webull_client import wb, _run_webull, _get_ticker_id, _to_float
+from . import metrics
+
+# 스트림 재연결 간격 (초, 실패할 때마다 2배, 최대 RECONNECT_MAX)
+RECONNECT_BASE = 1.0
+RECONNECT_MAX = 60.0
+
+class MinuteBar:
+    """1분 OHLCV 봉"""
+    __slots__ = ("minute", "open", "high", "low", "close", "volume")
+
+    def __init__(self, minute: int, price: float):
+        self.minute = minute  # 봉 시작 시각 (epoch 초)
+        self.open = price
+        self.high = price
+        self.low = price
+        self.close = price
+        self.volume = 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "minute": self.minute,
+            "open": self.open,
+            "high": self.high,
+            "low": self.low,
+            "close": self.close,
+            "volume": self.volume
+        }
+
+class BarAggregator:
+    """
+    체결 틱을 종목별 1분 OHLCV 봉으로 메모리에서 집계합니다.
+    """
+
+    def __init__(self, history: int = STREAM_BAR_HISTORY):
+        self.history = history
+        self._current = {}     # symbol -> 진행 중인 MinuteBar
+        self._bars = {}        # symbol -> 완성된 MinuteBar deque
+        self._last = {}        # symbol -> (수신 시각, 마지막 가격, 당일 누적 거래량)
+
+    def on_tick(self, symbol: str, price: float, deal_volume: float, day_volume: float, ts: float):
+        """틱 하나를 반영합니다."""
+        minute = int(ts) // 60 * 60
+        bar = self._current.get(symbol)
+        if bar is None or bar.minute != minute:
+            if bar is not None:
+                self._bars.setdefault(symbol, deque(maxlen=self.history)).append(bar)
+            bar = MinuteBar(minute, price)
+            self._current[symbol] = bar
+
+        bar.high = max(bar.high, price)
+        bar.low = min(bar.low, price)
+        bar.close = price
+        bar.volume += deal_volume
+
+        previous = self._last.get(symbol)
+        if day_volume is None:
+            # 당일 누적 거래량이 없는 메시지는 체결량을 누적
+            day_volume = (previous[2] if previous else 0.0) + deal_volume
+        self._last[symbol] = (ts, price, day_volume)
+
+    def latest(self, symbol: str):
+        """(마지막 수신 시각, 가격, 당일 누적 거래량)을 반환합니다."""
+        return self._last.get(symbol)
+
+    def get_bars(self, symbol: str, include_current: bool = True) -> list:
+        """종목의 1분 봉 목록을 오래된 순으로 반환합니다."""
+        bars = list(self._bars.get(symbol, ()))
+        if include_current and symbol in self._current:
+            bars.append(self._current[symbol])
+        return bars
+
+    def drop(self, symbol: str):
+        """구독 해제된 종목의 데이터를 정리합니다."""
+        self._current.pop(symbol, None)
+        self._bars.pop(symbol, None)
+        self._last.pop(symbol, None)
+
+def _parse_push_message(data: dict):
+    """webull 푸시 메시지에서 (가격, 체결량, 당일 누적 거래량)을 추출합니다."""
+    deal = data.get("deal") or {}
+    price = _to_float(deal.get("price"))
+    if price is None:
+        price = _to_float(data.get("close"))
+    if price is None:
+        price = _to_float(data.get("pPrice"))
+    deal_volume = _to_float(deal.get("volume")) or 0.0
+    day_volume = _to_float(data.get("volume"))
+    return price, deal_volume, day_volume
+
+class WebullQuoteStream:
+    """webull MQTT 푸시 피드 (webull.streamconn 사용, 전용 스레드에서 수신)"""
+
+    def __init__(self):
+        self._conn = None
+        self._thread = None
+        self._symbols = {}  # tickerId -> symbol
+
+    async def start(self, on_message, on_disconnect):
+        from webull.streamconn import StreamConn
+
+        loop = asyncio.get_running_loop()
+        self._symbols = {}
+
+        def price_func(topic, data):
+            # StreamConn은 콜백 예외 시 프로세스를 종료하므로 절대 예외를 올리지 않음
+            try:
+                symbol = self._symbols.get(str(topic.get("tickerId")))
+                if symbol:
+                    loop.call_soon_threadsafe(on_message, symbol, data)
+            except Exception as e:
+                logger.error(f"❌ 스트리밍 시세 콜백 오류: {e}")
+
+        self._conn = StreamConn(debug_flg=False)
+        self._conn.price_func = price_func
+        access_token = wb._access_token or None
+        await _run_webull(self._conn.connect, wb._did, access_token=access_token)
+
+        def run():
+            try:
+                self._conn.run_blocking_loop()
+            except Exception as e:
+                logger.error(f"❌ 스트리밍 시세 수신 루프 종료: {e}")
+            finally:
+                # 수신 루프가 끝나면 연결이 끊긴 것 (서비스가 재연결)
+                try:
+                    loop.call_soon_threadsafe(on_disconnect)
+                except RuntimeError:
+                    pass  # 이벤트 루프가 이미 닫힘 (종료 중)
+
+        self._thread = threading.Thread(target=run, name="webull-stream", daemon=True)
+        self._thread.start()
+
+    async def subscribe(self, symbol: str):
+        ticker_id = await _get_ticker_id(symbol)
+        self._symbols[ticker_id] = symbol
+        # StreamConn.subscribe는 내부에서 loop()를 호출하므로 수신 스레드와 겹치지 않게 직접 구독
+        self._conn.client_streaming_quotes.subscribe(json.dumps({"tickerIds": [int(ticker_id)], "type": "105"}))
+
+    async def unsubscribe(self, symbol: str):
+        for ticker_id, subscribed in list(self._symbols.items()):
+            if subscribed == symbol:
+                self._conn.unsubscribe(tId=ticker_id, level=105)
+                del self._symbols[ticker_id]
+
+class FakeQuoteStream:
+    """
+    로컬 가짜 푸시 피드 (테스트/오프라인용)
+
+    구독된 종목마다 시드 고정 랜덤워크 틱을 webull 푸시 메시지와 같은 형식으로 발생시킵니다.
+    """
+
+    def __init__(self, tick_interval: float = FAKE_STREAM_TICK_MS / 1000, seed: int = 0):
+        self.tick_interval = tick_interval
+        self.seed = seed
+        self._on_message = None
+        self._on_disconnect = None
+        self._tasks = {}
+        self.fail_starts = 0  # 다음 start() 호출 중 실패시킬 횟수 (재연결 테스트용)
+
+    async def start(self, on_message, on_disconnect):
+        if self.fail_starts > 0:
+            self.fail_starts -= 1
+            raise ConnectionError("가짜 피드 연결 실패 (주입)")
+        self._on_message = on_message
+        self._on_disconnect = on_disconnect
+
+    def disconnect(self):
+        """연결 끊김을 흉내 냅니다. (모든 구독이 사라지고 서비스에 알림)"""
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+        if self._on_disconnect is not None:
+            self._on_disconnect()
+
+    async def subscribe(self, symbol: str):
+        if symbol not in self._tasks:
+            self._tasks[symbol] = asyncio.create_task(self._emit(symbol))
+
+    async def unsubscribe(self, symbol: str):
+        task = self._tasks.pop(symbol, None)
+        if task:
+            task.cancel()
+
+    async def _emit(self, symbol: str):
+        rng = random.Random(zlib.crc32(symbol.encode()) ^ self.seed)
+        price = rng.uniform(2, 50)
+        day_volume = 0.0
+        while True:
+            price = max(0.01, price * (1 + rng.gauss(0, 0.002)))
+            volume = float(rng.randint(1, 500))
+            day_volume += volume
+            self._on_message(symbol, {
+                "deal": {"price": f"{price:.4f}", "volume": str(volume)},
+                "volume": str(day_volume)
+            })
+            await asyncio.sleep(self.tick_interval)
+
+class StreamingQuoteService:
+    """
+    활성 모니터링 창이 있는 종목만 구독하고, 틱을 1분 봉으로 집계해 시세를 제공합니다.
+
+    연결에 실패하거나 연결이 끊기면 지수 백오프로 재연결하고, 구독 중이던 종목을 다시 구독합니다.
+    끊긴 동안에는 틱이 오래되어 시세 스냅샷이 폴링으로 대체합니다.
+    """
+
+    def __init__(self, source, reconnect_base: float = RECONNECT_BASE, reconnect_max: float = RECONNECT_MAX):
+        self.source = source
+        self.reconnect_base = reconnect_base
+        self.reconnect_max = reconnect_max
+        self.aggregator = BarAggregator()
+        self._refcounts = {}
+        self._listeners = []
+        self._started = False
+        self._reconnect_task = None
+
+    @property
+    def connected(self) -> bool:
+        return self._started
+
+    async def start(self):
+        """스트림에 연결합니다. 실패하면 백그라운드에서 재연결을 계속 시도합니다."""
+        if self._started or self._reconnect_task is not None:
+            return
+        if not await self._connect():
+            self._reconnect_task = asyncio.create_task(self._reconnect())
+
+    async def _connect(self) -> bool:
+        try:
+            await self.source.start(self._on_message, self._on_disconnect)
+        except Exception as e:
+            # 스트림이 없어도 시세 스냅샷이 폴링으로 대체하므로 로그만 남김
+            logger.error(f"❌ 스트리밍 시세 연결 실패 - 폴링으로 대체: {e}")
+            return False
+        self._started = True
+        logger.info(f"✅ 스트리밍 시세 시작 ({type(self.source).__name__})")
+
+        # 끊기기 전에 구독 중이던 종목 다시 구독
+        for symbol in list(self._refcounts):
+            await self._subscribe(symbol)
+        return True
+
+    async def _reconnect(self):
+        attempt = 0
+        try:
+            while not self._started:
+                delay = min(self.reconnect_max, self.reconnect_base * (2 ** attempt))
+                attempt += 1
+                logger.warning(f"🔄 스트리밍 시세 {delay:.0f}초 후 재연결 시도 ({attempt}번째)")
+                await asyncio.sleep(delay)
+                metrics.inc_counter("stream_reconnects_total")
+                await self._connect()
+        finally:
+            self._reconnect_task = None
+
+    def _on_disconnect(self):
+        """소스가 연결 끊김을 알리면 재연결을 시작합니다."""
+        if not self._started:
+            return
+        self._started = False
+        metrics.inc_counter("stream_disconnects_total")
+        logger.error("❌ 스트리밍 시세 연결 끊김 - 재연결 시작")
+        if self._reconnect_task is None:
+            self._reconnect_task = asyncio.create_task(self._reconnect())
+
+    async def _subscribe(self, symbol: str):
+        try:
+            await self.source.subscribe(symbol)
+            logger.info(f"📡 스트리밍 구독: {symbol}")
+        except Exception as e:
+            logger.error(f"❌ 스트리밍 구독 실패 ({symbol}): {e}")
+
+    def add_listener(self, listener):
+        """틱 리스너(listener(symbol, price, ts))를 등록합니다."""
+        self._listeners.append(listener)
+
+    async def acquire(self, symbol: str):
+        """종목 구독 참조를 늘립니다. 첫 참조일 때 구독합니다."""
+        self._refcounts[symbol] = self._refcounts.get(symbol, 0) + 1
+        # 연결되지 않은 동안의 구독은 재연결 후 한꺼번에 처리
+        if self._refcounts[symbol] == 1 and self._started:
+            await self._subscribe(symbol)
+        metrics.set_gauge("stream_subscribed_symbols", len(self._refcounts))
+
+    async def release(self, symbol: str):
+        """종목 구독 참조를 줄입니다. 마지막 참조면 구독을 해제합니다."""
+        count = self._refcounts.get(symbol, 0) - 1
+        if count > 0:
+            self._refcounts[symbol] = count
+            return
+        self._refcounts.pop(symbol, None)
+        self.aggregator.drop(symbol)
+        if not self._started:
+            metrics.set_gauge("stream_subscribed_symbols", len(self._refcounts))
+            return
+        try:
+            await self.source.unsubscribe(symbol)
+            logger.info(f"📴 스트리밍 구독 해제: {symbol}")
+        except Exception as e:
+            logger.error(f"❌ 스트리밍 구독 해제 실패 ({symbol}): {e}")
+        metrics.set_gauge("stream_subscribed_symbols", len(self._refcounts))
+
+    def get_quote(self, symbol: str, max_age: float = STREAM_STALE_SECONDS):
+        """
+        스트림에서 받은 최신 시세를 틱 수신 시각과 함께 반환합니다.
+        없거나 max_age초보다 오래됐으면 None (호출한 쪽이 폴링 조회로 대체)
+        """
+        latest = self.aggregator.latest(symbol)
+        if latest is None:
+            return None
+        if time.time() - latest[0] > max_age:
+            metrics.inc_counter("stream_stale_total")
+            return None
+        return {'price': latest[1], 'volume': latest[2], 'timestamp': datetime.fromtimestamp(latest[0])}
+
+    def _on_message(self, symbol: str, data: dict):
+        price, deal_volume, day_volume = _parse_push_message(data)
+        if price is None:
+            return
+        ts = time.time()
+        self.aggregator.on_tick(symbol, price, deal_volume, day_volume, ts)
+        metrics.inc_counter("stream_ticks_total")
+        for listener in self._listeners:
+            try:
+                listener(symbol, price, ts)
+            except Exception as e:
+                logger.error(f"❌ 스트리밍 틱 리스너 오류 ({symbol}): {e}")
+
+def _create_stream_service():
+    if QUOTE_MODE != "stream":
+        return None
+    source = FakeQuoteStream() if QUOTE_STREAM_SOURCE == "fake" else WebullQuoteStream()
+    return StreamingQuoteService(source)
+
+# 프로세스 전역 스트리밍 시세 서비스 (QUOTE_MODE=stream 일 때만 생성)
+streaming_quotes = _create_stream_service()
+
+async def start_quote_stream():
+    """스트리밍 시세 모드면 스트림을 시작합니다."""
+    if streaming_quotes is not None:
+        await streaming_quotes.start()
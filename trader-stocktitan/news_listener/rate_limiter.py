@@ -0,0 +1,159 @@
+import asyncio
+import random
+import time
+from .config import logger
+from . import metrics
+
+class CircuitOpenError(Exception):
+    """서킷 브레이커가 열려 있어 호출을 바로 거부할 때 발생합니다."""
+
+class TokenBucket:
+    """
+    초당 rate개씩 채워지고 최대 burst개까지 모이는 토큰 버킷
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self) -> float:
+        """토큰 하나를 얻을 때까지 기다리고, 기다린 시간(초)을 반환합니다."""
+        waited = 0.0
+        while True:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return waited
+            delay = (1 - self._tokens) / self.rate
+            waited += delay
+            await asyncio.sleep(delay)
+
+class CircuitBreaker:
+    """
+    연속 실패가 threshold번 쌓이면 열려서 cooldown 동안 호출을 바로 거부합니다.
+    cooldown 후에는 시험 호출 하나만 통과시키고(half-open), 성공하면 닫힙니다.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, threshold: int, cooldown: float, on_state_change=None):
+        self.name = name
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.on_state_change = on_state_change  # on_state_change(breaker, old_state, new_state)
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_inflight = False
+
+    def _set_state(self, state: str):
+        if state == self.state:
+            return
+        old_state, self.state = self.state, state
+        metrics.set_gauge(f"{self.name}_breaker_open", 1 if state == self.OPEN else 0)
+        logger.warning(f"⚡ {self.name} 서킷 브레이커: {old_state} → {state}")
+        if self.on_state_change:
+            try:
+                self.on_state_change(self, old_state, state)
+            except Exception as e:
+                logger.error(f"❌ 서킷 브레이커 상태 변경 처리 오류: {e}")
+
+    def allow(self) -> bool:
+        """호출을 통과시킬지 결정합니다."""
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.cooldown:
+                return False
+            self._set_state(self.HALF_OPEN)
+        if self.state == self.HALF_OPEN:
+            if self._trial_inflight:
+                return False
+            self._trial_inflight = True
+        return True
+
+    def release_trial(self):
+        """결과를 기록하지 못하고 끝난 시험 호출(취소 등)의 자리를 반환합니다."""
+        self._trial_inflight = False
+
+    def record_success(self):
+        self.failures = 0
+        self._trial_inflight = False
+        self._set_state(self.CLOSED)
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_inflight = False
+        if self.state == self.HALF_OPEN or self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
+            self._set_state(self.OPEN)
+
+    def retry_in(self) -> float:
+        """열린 상태면 시험 호출까지 남은 시간(초)"""
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+
+class RateLimiter:
+    """
+    엔드포인트별 토큰 버킷 + 전체 동시 호출 제한 + 지터 백오프 재시도 + 서킷 브레이커
+    """
+
+    def __init__(self, name: str, budgets: dict, max_concurrency: int, max_retries: int,
+                 backoff_base: float, breaker: CircuitBreaker):
+        self.name = name
+        self.buckets = {endpoint: TokenBucket(rate, burst) for endpoint, (rate, burst) in budgets.items()}
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.breaker = breaker
+        self._semaphore = None
+
+    async def call(self, endpoint: str, func, *args, **kwargs):
+        """
+        async func(*args, **kwargs)를 예산 안에서 호출합니다. 실패하면 지터 백오프로 재시도하고,
+        브레이커가 열려 있으면 CircuitOpenError를 바로 발생시킵니다.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        bucket = self.buckets.get(endpoint)
+
+        # 브레이커는 재시도 시도마다가 아니라 논리적 호출 한 번에 한 번만 판단/기록
+        if not self.breaker.allow():
+            metrics.inc_counter(f"{self.name}_breaker_rejected_total")
+            raise CircuitOpenError(f"{self.name} 서킷 브레이커 {self.breaker.state} ({self.breaker.retry_in():.0f}초 후 재시도)")
+        trial = self.breaker.state == CircuitBreaker.HALF_OPEN
+
+        try:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    if bucket is not None:
+                        waited = await bucket.acquire()
+                        metrics.observe(f"{self.name}_{endpoint}_throttle_seconds", waited)
+                    async with self._semaphore:
+                        metrics.inc_counter(f"{self.name}_{endpoint}_calls_total")
+                        result = await func(*args, **kwargs)
+                except Exception as e:
+                    metrics.inc_counter(f"{self.name}_{endpoint}_errors_total")
+                    # 다른 호출들 때문에 브레이커가 열렸으면 남은 재시도는 하지 않음
+                    if attempt >= self.max_retries or self.breaker.state == CircuitBreaker.OPEN:
+                        self.breaker.record_failure()
+                        raise
+                    # full jitter 지수 백오프
+                    delay = random.uniform(0, self.backoff_base * (2 ** attempt))
+                    logger.warning(f"⚠️ {self.name} {endpoint} 호출 실패 ({attempt + 1}/{self.max_retries + 1}), {delay:.2f}초 후 재시도: {e}")
+                    await asyncio.sleep(delay)
+                    continue
+
+                self.breaker.record_success()
+                return result
+        finally:
+            # 시험 호출이 취소되면(CancelledError) 다음 호출이 다시 시험할 수 있게 자리를 반환
+            if trial:
+                self.breaker.release_trial()
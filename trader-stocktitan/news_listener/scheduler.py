@@ -0,0 +1,255 @@
+import asyncio
+import heapq
+import itertools
+import time
+from .config import logger, MONITOR_MINUTES
+from .event_record import WINDOW_MINUTES
+from .news_event import NewsEvent
+from .checkpoint import serialize_window, serialize_context, save_checkpoint, append_contexts, rewrite_contexts
+from .quote_cache import quote_snapshot
+from .market_data import now as market_now, real_delay
+from . import metrics
+
+# 문맥 기록이 이 줄 수(또는 진행 중인 창 수의 2배)를 넘으면 진행 중인 창들의 문맥만 남기고 다시 씀
+CONTEXT_COMPACT_LINES = 200
+
+class MonitorWindow:
+    """
+    뉴스 발생 후 1분 간격 가격 수집 창 (샘플은 뉴스 이벤트의 레코드 슬롯에 바로 기록)
+    """
+
+    def __init__(self, event: NewsEvent, on_complete, minutes: int = MONITOR_MINUTES, on_sample=None):
+        self.event = event
+        self.record = event.record
+        self.symbol = event.symbol
+        self.news_ts = event.news_ts  # 뉴스 발생 시각 (epoch 초)
+        self.minutes = min(minutes, WINDOW_MINUTES)
+        self.on_complete = on_complete  # async def on_complete(window)
+        self.on_sample = on_sample      # def on_sample(window) - 스케줄러가 분 샘플을 추가할 때마다 호출
+        self.samples = 0
+        self.history_done = False    # 뉴스 발생 전 60분 데이터 수집 완료 여부
+        self.reference_price = None  # 스트리밍 급등락 알림 기준가
+        self.alerted = False
+
+    @property
+    def done(self) -> bool:
+        return self.samples >= self.minutes
+
+    @property
+    def next_due(self) -> float:
+        """다음 샘플의 목표 시각 (뉴스 발생 시각 + k분, 절대 시각 기준이라 누적 드리프트 없음)"""
+        return self.news_ts + (self.samples + 1) * 60
+
+    def add_sample(self, price, volume, captured_at: float, lateness: float):
+        """수집한 샘플을 레코드에 기록합니다."""
+        self.record.set_after_sample(self.samples, price, volume, captured_at, lateness)
+        self.samples += 1
+
+class MinuteScheduler:
+    """
+    모든 뉴스 발생 후 모니터링 창을 하나의 힙으로 관리하는 중앙 스케줄러
+
+    가장 이른 목표 시각(뉴스 발생 시각 + k분)에 깨어나, 만기된 창들의 종목을 묶어 한 번의 배치로 시세를 조회합니다.
+    """
+
+    def __init__(self):
+        self._heap = []  # (due_at, seq, window)
+        self._windows_by_symbol = {}
+        self._seq = itertools.count()
+        self._wakeup = None
+        self._task = None
+        self._completion_tasks = set()
+        self._pending_contexts = {}   # 문맥이 바뀌어 문맥 기록에 덧붙일 창 (event_id → window)
+        self._checkpoint_dirty = False
+        self._checkpoint_task = None
+        self._context_lines = 0
+
+    def start(self):
+        """스케줄러 루프를 시작합니다. (재시작 시 중복 실행되지 않음)"""
+        if self._task is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        logger.info("✅ 분 단위 모니터링 스케줄러 시작")
+
+    def add_window(self, window: MonitorWindow):
+        """모니터링 창을 등록합니다. 첫 샘플은 뉴스 발생 1분 후에 수집됩니다."""
+        self._windows_by_symbol.setdefault(window.symbol, set()).add(window)
+        if window.done:
+            # 재시작 후 복원 시 이미 채워진 창은 바로 마무리
+            self._complete(window)
+        else:
+            heapq.heappush(self._heap, (window.next_due, next(self._seq), window))
+            self._wakeup.set()
+        self._update_gauges()
+        self.checkpoint(window)
+        logger.info(f"🗓️ 모니터링 창 등록: {window.symbol} (활성 창: {self.active_windows}개)")
+
+    def checkpoint(self, window: MonitorWindow = None):
+        """
+        등록된 모든 창의 상태 저장을 예약합니다. window를 주면 그 창의 이벤트 문맥(뉴스/분석/예측)도 문맥 기록에 덧붙입니다.
+
+        상태는 이벤트 루프에서 바로 직렬화하고 파일 쓰기는 실행기 스레드에서 합니다.
+        쓰는 동안 들어온 요청은 모아서 다음 한 번의 쓰기로 반영합니다.
+        """
+        if window is not None:
+            self._pending_contexts[window.event.event_id] = window
+        self._checkpoint_dirty = True
+        if self._checkpoint_task is None or self._checkpoint_task.done():
+            self._checkpoint_task = asyncio.create_task(self._write_checkpoint())
+
+    async def _write_checkpoint(self):
+        loop = asyncio.get_running_loop()
+        while self._checkpoint_dirty:
+            self._checkpoint_dirty = False
+            windows = [window for windows in self._windows_by_symbol.values() for window in windows]
+            entries = [serialize_window(window) for window in windows]
+            contexts = [serialize_context(window.event) for window in self._pending_contexts.values()]
+            self._pending_contexts = {}
+
+            compact = self._context_lines + len(contexts) > max(CONTEXT_COMPACT_LINES, 2 * len(windows))
+            if compact:
+                contexts = [serialize_context(window.event) for window in windows]
+            try:
+                await loop.run_in_executor(None, self._save, entries, contexts, compact)
+                self._context_lines = len(contexts) if compact else self._context_lines + len(contexts)
+            except Exception as e:
+                logger.error(f"❌ 모니터링 체크포인트 저장 오류: {e}")
+                # 문맥이 빠지지 않도록 다음 쓰기에서 진행 중인 창들의 문맥을 다시 덧붙임
+                for window in windows:
+                    self._pending_contexts.setdefault(window.event.event_id, window)
+
+    @staticmethod
+    def _save(entries: list, contexts: list, compact: bool):
+        # 문맥을 먼저 써야 체크포인트의 모든 창이 문맥을 찾을 수 있음
+        if compact:
+            rewrite_contexts(contexts)
+        elif contexts:
+            append_contexts(contexts)
+        save_checkpoint(entries)
+
+    async def flush_checkpoint(self):
+        """예약된 체크포인트 쓰기가 끝날 때까지 기다립니다. (종료 시 사용)"""
+        if self._checkpoint_task is not None:
+            await self._checkpoint_task
+
+    def _complete(self, window: MonitorWindow):
+        task = asyncio.create_task(self._run_completion(window))
+        self._completion_tasks.add(task)
+        task.add_done_callback(self._completion_tasks.discard)
+
+    async def _run_completion(self, window: MonitorWindow):
+        """창 마무리 콜백이 끝난 뒤에야 창을 해제하고 체크포인트에서 뺍니다."""
+        try:
+            await window.on_complete(window)
+        finally:
+            windows = self._windows_by_symbol.get(window.symbol)
+            if windows is not None:
+                windows.discard(window)
+                if not windows:
+                    del self._windows_by_symbol[window.symbol]
+            self._update_gauges()
+            self.checkpoint()
+
+    @property
+    def active_windows(self) -> int:
+        return len(self._heap)
+
+    def windows_for(self, symbol: str) -> set:
+        """종목의 등록된 모니터링 창들을 반환합니다."""
+        return self._windows_by_symbol.get(symbol, set())
+
+    def get_stats(self) -> dict:
+        """활성 창 수와 샘플링 패스 통계를 반환합니다."""
+        tick = metrics.get_histogram("monitor_tick_seconds")
+        lateness = metrics.get_histogram("monitor_sample_lateness_seconds")
+        return {
+            "active_windows": self.active_windows,
+            "active_symbols": len(self._windows_by_symbol),
+            "tick_p95": tick["p95"],
+            "lateness_p50": lateness["p50"],
+            "lateness_p95": lateness["p95"],
+            "lateness_max": lateness["max"]
+        }
+
+    def _update_gauges(self):
+        stats = self.get_stats()
+        metrics.set_gauge("monitor_active_windows", stats["active_windows"])
+        metrics.set_gauge("monitor_sample_lateness_p95", stats["lateness_p95"])
+        metrics.set_gauge("monitor_active_symbols", stats["active_symbols"])
+
+    async def _run(self):
+        while True:
+            try:
+                if not self._heap:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+
+                delay = self._heap[0][0] - market_now()
+                if delay > 0:
+                    # 더 이른 창이 등록되면 다시 계산하도록 대기 중에도 깨어날 수 있게 함
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=real_delay(delay))
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                await self._tick()
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ 모니터링 스케줄러 오류: {e}")
+                await asyncio.sleep(1)
+
+    async def _tick(self):
+        """만기된 모든 창의 종목 시세를 한 번에 조회하고 샘플을 추가합니다."""
+        started_at = time.monotonic()
+        now = market_now()
+
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            due.append(heapq.heappop(self._heap))
+
+        try:
+            quotes = await quote_snapshot.get_many([window.symbol for _, _, window in due])
+        except Exception as e:
+            # 조회가 실패해도 창은 앞으로 진행 (이번 분은 빈 샘플로 기록)
+            logger.error(f"❌ 모니터링 시세 일괄 조회 오류 ({len(due)}개 창): {e}")
+            quotes = {}
+
+        for due_at, seq, window in due:
+            data = quotes.get(window.symbol)
+            if data is None:
+                captured_at = market_now()
+                window.add_sample(None, None, captured_at, captured_at - due_at)
+                metrics.inc_counter("monitor_samples_missed_total")
+                logger.warning(f"⚠️ {window.samples}분차 {window.symbol} 시세 없음 - 빈 샘플로 기록")
+            else:
+                captured_at = data['timestamp'].timestamp()
+                lateness = captured_at - due_at
+
+                window.add_sample(data['price'], data['volume'], captured_at, lateness)
+                metrics.observe("monitor_sample_lateness_seconds", lateness)
+                logger.info(f"📊 {window.samples}분차 {window.symbol} 실시간 데이터: 가격={data['price']}, 볼륨={data['volume']}, 지연={lateness:.2f}s")
+            if window.on_sample is not None:
+                window.on_sample(window)
+
+            if window.done:
+                self._complete(window)
+            else:
+                heapq.heappush(self._heap, (window.next_due, seq, window))
+
+        metrics.inc_counter("monitor_samples_total", len(due))
+        metrics.observe("monitor_tick_seconds", time.monotonic() - started_at)
+        self._update_gauges()
+        self.checkpoint()
+
+# 프로세스 전역 스케줄러
+monitor_scheduler = MinuteScheduler()
+
+def start_scheduler():
+    """전역 모니터링 스케줄러를 시작합니다."""
+    monitor_scheduler.start()
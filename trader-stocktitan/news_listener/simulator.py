@@ -0,0 +1,223 @@
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import zlib
+from datetime import datetime
+import numpy as np
+from .config import logger
+from .bar_cache import minute_floor
+from .market_data import MarketDataProvider
+from . import metrics
+
+# 시뮬레이터 시작 전에 미리 만들어 두는 1분봉 수 (뉴스 발생 전 60분 조회용)
+HISTORY_MINUTES = 240
+
+class SimulatedError(Exception):
+    """시뮬레이터가 주입한 조회 실패"""
+
+class _SymbolPath:
+    """종목 하나의 시드 고정 기하 브라운 운동 1분봉 경로"""
+    __slots__ = ("rng", "closes", "volumes", "cum_volumes")
+
+    def __init__(self, seed: int):
+        self.rng = random.Random(seed)
+        self.closes = [self.rng.uniform(2, 50)]
+        self.volumes = [self._next_volume()]
+        self.cum_volumes = [self.volumes[0]]
+
+    def _next_volume(self) -> float:
+        return float(int(self.rng.lognormvariate(8, 1)))
+
+    def extend(self, index: int):
+        """index번째 봉까지 경로를 만듭니다."""
+        while len(self.closes) <= index:
+            ret = self.rng.gauss(0, 0.004)
+            if self.rng.random() < 0.01:
+                ret += self.rng.gauss(0, 0.05)  # 드문 급등락
+            self.closes.append(max(0.01, self.closes[-1] * math.exp(ret)))
+            volume = self._next_volume()
+            self.volumes.append(volume)
+            self.cum_volumes.append(self.cum_volumes[-1] + volume)
+
+class SimulatorProvider(MarketDataProvider):
+    """
+    오프라인 벤치마크용 결정적 시세 제공자
+
+    - 종목별 경로는 (seed, 종목, 시작 시각)만으로 정해지므로 조회 순서와 무관하게 재현됩니다.
+    - 시계는 speed배로 흐르며, 스케줄러 대기도 같은 배속으로 줄어듭니다.
+    - latency_ms(실제 시간)만큼 응답을 지연하고, error_rate 확률로 조회 실패를 주입합니다.
+    """
+    name = "simulator"
+
+    def __init__(self, seed: int = 0, speed: float = 1.0, latency_ms: float = 0.0, error_rate: float = 0.0,
+                 start_ts: float = None):
+        self.seed = seed
+        self.speed = speed
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.start_ts = time.time() if start_ts is None else start_ts
+        self._start_monotonic = time.monotonic()
+        self._anchor = minute_floor(self.start_ts) - HISTORY_MINUTES * 60  # 0번째 봉 시작 시각
+        self._paths = {}
+        self._rng = random.Random(seed)  # 지연/오류 주입용
+
+    def now(self) -> float:
+        return self.start_ts + (time.monotonic() - self._start_monotonic) * self.speed
+
+    def _path(self, symbol: str) -> _SymbolPath:
+        if symbol not in self._paths:
+            self._paths[symbol] = _SymbolPath(zlib.crc32(symbol.encode()) ^ self.seed)
+        return self._paths[symbol]
+
+    async def _call(self, kind: str):
+        """지연과 오류를 주입합니다."""
+        metrics.inc_counter(f"simulator_{kind}_requests_total")
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000 * self._rng.uniform(0.5, 1.5))
+        if self.error_rate and self._rng.random() < self.error_rate:
+            metrics.inc_counter(f"simulator_{kind}_errors_total")
+            raise SimulatedError(f"시뮬레이터 {kind} 조회 실패 (주입)")
+
+    async def get_historical_data(self, symbol: str, minutes: int = 60, end_ts: float = None) -> dict:
+        now = self.now()
+        end_minute = minute_floor(now if end_ts is None else min(end_ts, now))
+        try:
+            await self._call("bars")
+        except SimulatedError as e:
+            logger.warning(f"⚠️ {e} ({symbol})")
+            return {
+                'prices': np.full(minutes, np.nan),
+                'volumes': np.full(minutes, np.nan),
+                'times': np.empty(0),
+                'timestamp': datetime.fromtimestamp(now)
+            }
+
+        last = int((end_minute - self._anchor) // 60) - 1
+        first = max(0, last - minutes + 1)
+        path = self._path(symbol)
+        path.extend(last)
+        return {
+            'prices': np.array(path.closes[first:last + 1]),
+            'volumes': np.array(path.volumes[first:last + 1]),
+            'times': self._anchor + 60.0 * np.arange(first, last + 1),
+            'timestamp': datetime.fromtimestamp(now)
+        }
+
+    def _quote(self, symbol: str, now: float) -> dict:
+        """현재 분 봉을 향해 보간한 가격과 당일 누적 거래량"""
+        position = (now - self._anchor) / 60
+        index = int(position)
+        fraction = position - index
+        path = self._path(symbol)
+        path.extend(index)
+        previous = path.closes[index - 1] if index > 0 else path.closes[0]
+        price = previous * (path.closes[index] / previous) ** fraction
+        volume = (path.cum_volumes[index - 1] if index > 0 else 0.0) + path.volumes[index] * fraction
+        return {'price': round(price, 4), 'volume': float(int(volume)), 'timestamp': datetime.fromtimestamp(now)}
+
+    async def get_realtime_data(self, symbol: str) -> dict:
+        try:
+            await self._call("quote")
+        except SimulatedError as e:
+            logger.warning(f"⚠️ {e} ({symbol})")
+            return {'price': None, 'volume': None, 'timestamp': datetime.fromtimestamp(self.now())}
+        return self._quote(symbol, self.now())
+
+    async def get_realtime_data_batch(self, symbols: list) -> dict:
+        symbols = list(dict.fromkeys(symbols))
+        try:
+            await self._call("quote")
+        except SimulatedError as e:
+            logger.warning(f"⚠️ {e} ({len(symbols)}개)")
+            failed = datetime.fromtimestamp(self.now())
+            return {symbol: {'price': None, 'volume': None, 'timestamp': failed} for symbol in symbols}
+        now = self.now()
+        return {symbol: self._quote(symbol, now) for symbol in symbols}
+
+def _make_news_event(rng: random.Random, symbols: list, news_id: int, ts: float) -> dict:
+    """웹소켓 뉴스 메시지와 같은 형식의 합성 뉴스"""
+    symbol = rng.choice(symbols)
+    return {
+        "header": {"type": "news"},
+        "payload": {
+            "news": {
+                "id": news_id,
+                "symbol": symbol,
+                "title": f"{symbol} announces simulated event #{news_id}",
+                "content": f"Synthetic press release #{news_id} for {symbol} generated by the simulator.",
+                "timestamp": int(ts * 1000)
+            },
+            "stock": {"marketCap": rng.randint(10, 5000) * 1_000_000},
+            "impact_score": rng.randint(1, 5),
+            "sentiment_score": rng.randint(1, 5),
+            "exchanges": ["NASDAQ"]
+        }
+    }
+
+async def run_load_test(events: int, symbols: int, rate: float, speed: float, seed: int,
+                        latency_ms: float, error_rate: float, timeout: float) -> dict:
+    """
+    시뮬레이터 시세로 전체 파이프라인(큐 → 뉴스 처리 → 모니터링 스케줄러)에 합성 뉴스를 흘려 보냅니다.
+    """
+    from .market_data import set_provider
+    from .ingest_queue import enqueue_news, start_ingest_workers, get_ingest_stats
+    from .scheduler import monitor_scheduler, start_scheduler
+    from .event_store import news_event_store
+
+    provider = SimulatorProvider(seed=seed, speed=speed, latency_ms=latency_ms, error_rate=error_rate)
+    set_provider(provider)
+    start_ingest_workers()
+    start_scheduler()
+
+    rng = random.Random(seed)
+    universe = [f"SIM{i:03d}" for i in range(symbols)]
+    started_at = time.monotonic()
+
+    for news_id in range(1, events + 1):
+        enqueue_news(_make_news_event(rng, universe, news_id, provider.now()))
+        # 분당 rate건 (제공자 시계 기준 지수 분포 간격)
+        await asyncio.sleep(rng.expovariate(rate / 60) / speed)
+
+    # 모든 모니터링 창이 끝날 때까지 대기
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        stats = monitor_scheduler.get_stats()
+        if get_ingest_stats()["depth"] == 0 and stats["active_symbols"] == 0:
+            break
+        await asyncio.sleep(0.5)
+
+    # 버퍼에 남은 이벤트와 체크포인트를 다 쓴 뒤에 집계 (저장 지표까지 반영)
+    await monitor_scheduler.flush_checkpoint()
+    await news_event_store.close()
+
+    return {
+        "elapsed_seconds": round(time.monotonic() - started_at, 3),
+        "simulated_minutes": round((time.monotonic() - started_at) * speed / 60, 1),
+        "ingest": get_ingest_stats(),
+        "scheduler": monitor_scheduler.get_stats(),
+        "metrics": metrics.get_snapshot()
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="시뮬레이터 시세로 오프라인 부하 테스트를 실행합니다.")
+    parser.add_argument("--events", type=int, default=50, help="합성 뉴스 수")
+    parser.add_argument("--symbols", type=int, default=20, help="종목 수")
+    parser.add_argument("--rate", type=float, default=5, help="분당 뉴스 수 (시뮬레이터 시계 기준)")
+    parser.add_argument("--speed", type=float, default=60, help="시계 배속")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency-ms", type=float, default=50, help="조회 지연 (실제 시간 ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="조회 실패 주입 확률")
+    parser.add_argument("--timeout", type=float, default=600, help="모니터링 종료 대기 최대 시간 (실제 초)")
+    args = parser.parse_args()
+
+    summary = asyncio.run(run_load_test(
+        args.events, args.symbols, args.rate, args.speed, args.seed,
+        args.latency_ms, args.error_rate, args.timeout
+    ))
+    print(json.dumps(summary, ensure_ascii=False, indent=2, default=str))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import asyncio
+import random
+import time
+import aiohttp
+from .config import (
+    logger, TELEGRAM_QUEUE_SIZE, TELEGRAM_CHAT_RATE, TELEGRAM_CHAT_BURST, TELEGRAM_GLOBAL_RATE,
+    TELEGRAM_MAX_RETRIES, TELEGRAM_REQUEST_TIMEOUT
+)
+from .rate_limiter import TokenBucket
+from . import metrics
+
+TELEGRAM_API_URL = "https://api.telegram.org"
+
+class TelegramDispatcher:
+    """
+    텔레그램 봇 API 발송기
+
+    - keep-alive 연결 풀을 쓰는 세션 하나를 모든 발송이 공유합니다.
+    - 채팅별 큐와 워커가 순서대로 보내므로, 호출한 쪽은 큐에 넣고 바로 반환합니다.
+    - 채팅별 토큰 버킷과 봇별 전역 토큰 버킷으로 텔레그램 발송 한도를 지킵니다.
+    - 429는 응답의 retry_after만큼 기다렸다가, 5xx/연결 오류는 백오프 후 다시 보냅니다.
+    """
+
+    def __init__(self, queue_size: int = TELEGRAM_QUEUE_SIZE, chat_rate: float = TELEGRAM_CHAT_RATE,
+                 chat_burst: int = TELEGRAM_CHAT_BURST, global_rate: float = TELEGRAM_GLOBAL_RATE,
+                 max_retries: int = TELEGRAM_MAX_RETRIES, api_url: str = TELEGRAM_API_URL):
+        self.queue_size = queue_size
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.global_rate = global_rate
+        self.max_retries = max_retries
+        self.api_url = api_url
+        self._session = None
+        self._queues = {}   # (bot_token, chat_id) -> asyncio.Queue
+        self._workers = {}  # (bot_token, chat_id) -> Task
+        self._chat_buckets = {}
+        self._bot_buckets = {}
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=TELEGRAM_REQUEST_TIMEOUT),
+                connector=aiohttp.TCPConnector(limit=10, keepalive_timeout=60)
+            )
+        return self._session
+
+    def _queue_for(self, bot_token: str, chat_id: str) -> asyncio.Queue:
+        key = (bot_token, str(chat_id))
+        if key not in self._queues:
+            self._queues[key] = asyncio.Queue(maxsize=self.queue_size)
+            self._chat_buckets[key] = TokenBucket(self.chat_rate, self.chat_burst)
+            if bot_token not in self._bot_buckets:
+                self._bot_buckets[bot_token] = TokenBucket(self.global_rate, int(self.global_rate))
+            self._workers[key] = asyncio.create_task(self._worker(key))
+        return self._queues[key]
+
+    def submit(self, bot_token: str, chat_id: str, method: str, payload: dict) -> asyncio.Future:
+        """
+        봇 API 호출을 채팅별 큐에 넣고, 결과(result)를 받을 future를 바로 반환합니다.
+        큐가 가득 차면 버리고 None을 반환합니다.
+        """
+        future = asyncio.get_running_loop().create_future()
+        queue = self._queue_for(bot_token, chat_id)
+        try:
+            queue.put_nowait((method, dict(payload, chat_id=chat_id), future, time.monotonic()))
+        except asyncio.QueueFull:
+            metrics.inc_counter("telegram_dropped_total")
+            logger.error(f"❌ 텔레그램 발송 큐 가득 참 ({self.queue_size}) - 메시지 버려짐")
+            return None
+        metrics.set_gauge("telegram_queue_depth", sum(q.qsize() for q in self._queues.values()))
+        return future
+
+    async def _worker(self, key: tuple):
+        bot_token = key[0]
+        queue = self._queues[key]
+        while True:
+            method, payload, future, enqueued_at = await queue.get()
+            try:
+                await self._chat_buckets[key].acquire()
+                await self._bot_buckets[bot_token].acquire()
+                metrics.observe("telegram_queue_wait_seconds", time.monotonic() - enqueued_at)
+                result = await self._call(bot_token, method, payload)
+                if not future.done():
+                    future.set_result(result)
+            except Exception as e:
+                # 발송 실패는 로그로만 남김 (에러 알림으로 다시 보내면 실패가 반복될 수 있음)
+                metrics.inc_counter("telegram_failed_total")
+                logger.error(f"❌ 텔레그램 {method} 실패: {e}")
+                if not future.done():
+                    future.set_exception(e)
+                    future.exception()
+            finally:
+                queue.task_done()
+                metrics.set_gauge("telegram_queue_depth", sum(q.qsize() for q in self._queues.values()))
+
+    async def _call(self, bot_token: str, method: str, payload: dict) -> dict:
+        """봇 API를 호출하고 result를 반환합니다. (429/5xx/연결 오류 재시도)"""
+        url = f"{self.api_url}/bot{bot_token}/{method}"
+        for attempt in range(self.max_retries + 1):
+            started_at = time.monotonic()
+            try:
+                async with self._get_session().post(url, json=payload) as response:
+                    body = await response.json(content_type=None)
+                metrics.observe("telegram_send_seconds", time.monotonic() - started_at)
+                if body.get("ok"):
+                    metrics.inc_counter("telegram_sent_total")
+                    return body.get("result")
+
+                if response.status == 429:
+                    # 한도 초과: 텔레그램이 알려준 시간만큼 이 채팅 발송을 멈춤
+                    metrics.inc_counter("telegram_429_total")
+                    delay = float((body.get("parameters") or {}).get("retry_after", 1))
+                elif response.status >= 500:
+                    delay = random.uniform(0, 2 ** attempt)
+                else:
+                    raise RuntimeError(f"{response.status} {body.get('description', '')}")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                delay = random.uniform(0, 2 ** attempt)
+                body = {"description": str(e) or type(e).__name__}
+
+            if attempt >= self.max_retries:
+                break
+            metrics.inc_counter("telegram_retries_total")
+            logger.warning(f"⚠️ 텔레그램 {method} 재시도 {attempt + 1}/{self.max_retries} ({delay:.1f}초 후): {body.get('description', '')}")
+            await asyncio.sleep(delay)
+        raise RuntimeError(f"재시도 초과: {body.get('description', '')}")
+
+    async def flush(self, timeout: float = 10):
+        """큐에 남은 메시지를 모두 보낼 때까지 기다립니다. (종료 전)"""
+        try:
+            await asyncio.wait_for(asyncio.gather(*(queue.join() for queue in self._queues.values())), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("⚠️ 텔레그램 발송 큐 비우기 시간 초과")
+
+    async def close(self):
+        await self.flush()
+        for task in self._workers.values():
+            task.cancel()
+        self._workers.clear()
+        self._queues.clear()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+# 프로세스 전역 텔레그램 발송기
+telegram_dispatcher = TelegramDispatcher()
@@ -1,28 +1,127 @@
-import json
-import os
-import requests
+import math
 from datetime import datetime
-from .config import logger, TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, TELEGRAM_ERROR_BOT_TOKEN, TELEGRAM_ERROR_CHAT_ID
+from .config import (
+    logger, TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, TELEGRAM_ERROR_BOT_TOKEN, TELEGRAM_ERROR_CHAT_ID, TELEGRAM_ALERT_MODE,
+    TELEGRAM_LIVE_PRICE_MINUTES
+)
 from .llm_analyzer import analyze_prediction_accuracy_with_gpt, analyze_price_movement_with_gpt
+from .telegram_dispatcher import telegram_dispatcher
+from .error_digest import ErrorCoalescer
+from .event_record import EventRecord
+from .news_event import NewsEvent
+from .live_alert import LiveAlert
 
-def send_error_notification(error_type: str, error_message: str, symbol: str = ""):
+async def _send_telegram_message(bot_token: str, chat_id: str, message: str):
+    """
+    텔레그램 sendMessage를 발송 큐에 넣고 바로 반환합니다. (발송 결과를 받을 future 반환)
+    """
+    return telegram_dispatcher.submit(bot_token, chat_id, "sendMessage", {
+        "text": message,
+        "parse_mode": "Markdown",
+        "disable_web_page_preview": True
+    })
+
+def _live_alert(event: NewsEvent):
+    """
+    live 알림 모드면 이벤트의 단일 메시지를 반환합니다. (처음이면 만듦, messages 모드면 None)
+    """
+    if TELEGRAM_ALERT_MODE != "live" or not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHAT_ID:
+        return None
+    if event.alert is None:
+        news_title = event.news.get('title', '제목 없음') if event.news else '뉴스 없음'
+        event.alert = LiveAlert(TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID)
+        event.alert.sections["header"] = f"""📰 *뉴스 실시간 분석*
+
+📈 *종목:* `{event.symbol}`
+📰 *제목:* {news_title}"""
+    return event.alert
+
+def _live_analysis_section(analysis: dict, preliminary: bool = False) -> str:
+    rating = analysis.get('rating', 3)
+    rating_emoji = "📈" if rating >= 4 else "📉" if rating <= 2 else "📊"
+    sentiment_emoji = {"positive": "😊", "negative": "😰", "neutral": "😐"}.get(analysis.get('sentiment', 'neutral'), "😐")
+    impact_emoji = {"high": "🔥", "medium": "⚡", "low": "💧"}.get(analysis.get('impact', 'medium'), "⚡")
+    text = f"""🤖 *AI 분석{' (예비)' if preliminary else ''}:* {rating_emoji}
+• AI 평점: {rating}/5 {sentiment_emoji}
+• 감성: {analysis.get('sentiment', 'neutral')}
+• 영향도: {analysis.get('impact', 'medium')} {impact_emoji}"""
+    if analysis.get('analysis'):
+        text += f"\n{analysis['analysis'][:800]}"
+    return text
+
+def _live_prediction_section(prediction_data: dict) -> str:
+    prediction_result = prediction_data["prediction"]
+    return f"""🔮 *AI 1시간 후 예측:*
+• 뉴스 시점가: ${prediction_data['current_price']:.2f}
+• 예상 가격: ${prediction_result.get('predicted_price', 0):.2f} ({prediction_result.get('change_percent', 0):+.2f}%)
+• 신뢰도: {prediction_result.get('confidence', 'N/A')}"""
+
+def update_live_price(event: NewsEvent, samples: int, minutes: int):
+    """
+    live 알림 모드에서 TELEGRAM_LIVE_PRICE_MINUTES분마다 현재가 섹션을 갱신합니다. (마지막 분은 최종 결과가 대신함)
+    """
+    if samples <= 0 or samples % TELEGRAM_LIVE_PRICE_MINUTES or samples >= minutes:
+        return
+    alert = _live_alert(event)
+    if alert is None:
+        return
+    price = event.record.pct_p[min(samples, len(event.record.pct_p)) - 1]
+    if math.isnan(price):
+        return
+
+    base_price = (event.prediction or {}).get('current_price') or event.record.pct_p[0]
+    change_text = ""
+    if base_price and not math.isnan(base_price):
+        change_text = f" ({(price - base_price) / base_price * 100:+.2f}%)"
+    alert.update("live", f"📡 *실시간 ({samples}/{minutes}분):* ${price:.2f}{change_text}")
+
+def _error_channel():
+    """에러 알림 (봇 토큰, 채팅 ID, 채널 설명) - 에러 전용 텔레그램 설정이 있으면 우선 사용"""
+    if TELEGRAM_ERROR_BOT_TOKEN and TELEGRAM_ERROR_CHAT_ID:
+        return TELEGRAM_ERROR_BOT_TOKEN, TELEGRAM_ERROR_CHAT_ID, " (에러 전용 채널)"
+    return TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, " (일반 채널)"
+
+async def _send_error_summary(error_type: str, summary: dict):
+    """묶어 둔 같은 유형 오류들의 요약 알림"""
+    try:
+        bot_token, chat_id, _ = _error_channel()
+        if not bot_token or not chat_id:
+            return
+        
+        symbols_text = f", {summary['symbols']}개 종목" if summary['symbols'] else ""
+        top_symbols = f"\n📈 *주요 종목:* {', '.join(summary['top_symbols'])}" if summary['top_symbols'] else ""
+        message = f"""🧯 *에러 요약*
+
+❌ *{error_type}* ×{summary['count']}{symbols_text} (최근 {summary['seconds']:.0f}초, 알림 {summary['suppressed']}건 생략){top_symbols}
+📝 *마지막 에러:*
+```
+{summary['last_message'][:500]}
+```
+
+🕐 *시간:* {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"""
+
+        await _send_telegram_message(bot_token, chat_id, message)
+        
+    except Exception:
+        pass
+
+# 오류 유형별 알림 폭주 제어 (창마다 첫 오류만 즉시, 나머지는 종목 수와 함께 요약)
+error_coalescer = ErrorCoalescer(_send_error_summary)
+
+async def send_error_notification(error_type: str, error_message: str, symbol: str = ""):
     """
     에러 발생시 텔레그램으로 알림을 보냅니다. (에러 전용 채널 우선 사용)
+    같은 유형의 에러는 첫 건부터 ERROR_COALESCE_WINDOW초 동안 첫 건만 보내고 나머지는 요약으로 묶습니다.
     """
     try:
-        # 에러 전용 텔레그램 설정이 있으면 우선 사용, 없으면 기본 설정 사용
-        if TELEGRAM_ERROR_BOT_TOKEN and TELEGRAM_ERROR_CHAT_ID:
-            bot_token = TELEGRAM_ERROR_BOT_TOKEN
-            chat_id = TELEGRAM_ERROR_CHAT_ID
-            channel_info = " (에러 전용 채널)"
-        else:
-            bot_token = TELEGRAM_BOT_TOKEN
-            chat_id = TELEGRAM_CHAT_ID
-            channel_info = " (일반 채널)"
+        bot_token, chat_id, channel_info = _error_channel()
         
         if not bot_token or not chat_id:
             return
         
+        if not error_coalescer.admit(error_type, error_message, symbol):
+            return
+        
         symbol_text = f" ({symbol})" if symbol else ""
         message = f"""🚨 *시스템 에러 알림*{symbol_text}
 
@@ -34,24 +133,15 @@ def send_error_notification(error_type: str, error_message: str, symbol: str = "
 
 🕐 *시간:* {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"""
 
-        telegram_url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
-        
-        payload = {
-            "chat_id": chat_id,
-            "text": message,
-            "parse_mode": "Markdown",
-            "disable_web_page_preview": True
-        }
-        
-        requests.post(telegram_url, json=payload, timeout=5)
+        await _send_telegram_message(bot_token, chat_id, message)
         
     except Exception:
         # 에러 알림 자체에서 에러가 나면 무시 (무한 루프 방지)
         pass
 
-def send_final_result_notification(symbol: str, price_data: list, volume_data: list, filepath: str):
+async def send_final_result_notification(event: NewsEvent):
     """
-    60분 후 실제 결과와 예측 비교 분석 알림
+    60분 후 실제 결과와 예측 비교 분석 알림 (예측은 뉴스 이벤트에 보관된 값 사용)
     """
     try:
         bot_token = TELEGRAM_BOT_TOKEN
@@ -60,9 +150,11 @@ def send_final_result_notification(symbol: str, price_data: list, volume_data: l
         if not bot_token or not chat_id:
             return
         
+        symbol = event.symbol
+        
         # 실제 결과 데이터
-        prices = [p for p in price_data if p is not None]
-        volumes = [v for v in volume_data if v is not None] if volume_data else []
+        prices = [p for p in EventRecord.values(event.record.pct_p) if p is not None]
+        volumes = [v for v in EventRecord.values(event.record.volume_p) if v is not None]
         
         if not prices:
             return
@@ -70,16 +162,7 @@ def send_final_result_notification(symbol: str, price_data: list, volume_data: l
         final_price = prices[-1]
         total_volume = sum(volumes) if volumes else 0
         
-        # 예측 데이터 가져오기
-        prediction_data = None
-        try:
-            prediction_filepath = filepath.replace('.csv', '_prediction.json')
-            if os.path.exists(prediction_filepath):
-                with open(prediction_filepath, 'r', encoding='utf-8') as f:
-                    prediction_data = json.load(f)
-        except Exception:
-            pass
-        
+        prediction_data = event.prediction
         if not prediction_data:
             return
         
@@ -94,10 +177,28 @@ def send_final_result_notification(symbol: str, price_data: list, volume_data: l
         change_accuracy = 100 - abs(predicted_change - actual_change) if predicted_change != 0 else 0
         
         # AI 결과 분석
-        result_analysis = analyze_prediction_accuracy_with_gpt(
+        result_analysis = await analyze_prediction_accuracy_with_gpt(
             symbol, predicted_price, final_price, predicted_change, actual_change, price_accuracy
         )
         
+        # 결과 이모지
+        accuracy_emoji = "🎯" if price_accuracy > 80 else "📊" if price_accuracy > 50 else "❌"
+        
+        alert = _live_alert(event)
+        if alert is not None:
+            alert.update("final", f"""🏁 *60분 후 최종 결과* {accuracy_emoji}
+• 예측가: ${predicted_price:.2f} → 실제가: ${final_price:.2f}
+• 예측 변화: {predicted_change:+.2f}% → 실제 변화: {actual_change:+.2f}%
+• 가격 정확도: {price_accuracy:.1f}%
+• 총 거래량: {total_volume:,.0f}
+
+🤖 *AI 결과 분석:*
+{result_analysis.get('analysis', '분석 실패')}
+
+🕐 *완료 시간:* {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}""", final=True)
+            await alert.flush()
+            return
+        
         # 1분별 데이터 (처음 10분만 표시)
         minute_details = ""
         display_minutes = min(len(prices), 10)
@@ -109,9 +210,6 @@ def send_final_result_notification(symbol: str, price_data: list, volume_data: l
         if len(prices) > 10:
             minute_details += f"... (총 {len(prices)}분 데이터)\n"
         
-        # 결과 이모지
-        accuracy_emoji = "🎯" if price_accuracy > 80 else "📊" if price_accuracy > 50 else "❌"
-        
         message = f"""🏁 *60분 후 최종 결과* {accuracy_emoji}
 
 📈 *종목:* `{symbol}`
@@ -135,21 +233,12 @@ def send_final_result_notification(symbol: str, price_data: list, volume_data: l
 
 🕐 *완료 시간:* {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"""
 
-        telegram_url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
-        
-        payload = {
-            "chat_id": chat_id,
-            "text": message,
-            "parse_mode": "Markdown",
-            "disable_web_page_preview": True
-        }
-        
-        requests.post(telegram_url, json=payload, timeout=5)
+        await _send_telegram_message(bot_token, chat_id, message)
         
     except Exception as e:
         logger.error(f"❌ 최종 결과 알림 오류: {e}")
 
-def send_monitoring_completion_notification(symbol: str, period_type: str, price_data: list, volume_data: list = None, original_news: dict = None):
+async def send_monitoring_completion_notification(symbol: str, period_type: str, price_data: list, volume_data: list = None, original_news: dict = None):
     """
     가격 모니터링 완료시 1분별 상세 데이터와 AI 분석을 포함해서 텔레그램으로 알림을 보냅니다.
     """
@@ -195,7 +284,7 @@ def send_monitoring_completion_notification(symbol: str, period_type: str, price
         ai_analysis = ""
         if original_news and period_type == "미래 60분":
             # 주가 변화를 포함한 재분석 요청
-            analysis_result = analyze_price_movement_with_gpt(symbol, original_news, price_change_pct, total_volume)
+            analysis_result = await analyze_price_movement_with_gpt(symbol, original_news, price_change_pct, total_volume)
             ai_analysis = f"""
 
 🤖 *AI 주가 분석:*
@@ -220,24 +309,15 @@ def send_monitoring_completion_notification(symbol: str, period_type: str, price
 
 🕐 *완료 시간:* {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"""
 
-        telegram_url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
-        
-        payload = {
-            "chat_id": chat_id,
-            "text": message,
-            "parse_mode": "Markdown",
-            "disable_web_page_preview": True
-        }
-        
-        requests.post(telegram_url, json=payload, timeout=5)
+        await _send_telegram_message(bot_token, chat_id, message)
         
     except Exception:
         # 알림 자체에서 에러가 나면 무시
         pass
 
-def send_historical_analysis_notification(symbol: str, price_data: list, volume_data: list, filepath: str):
+async def send_historical_analysis_notification(event: NewsEvent):
     """
-    과거 60분 데이터 분석 완료 및 1시간 후 가격 예측 알림
+    과거 60분 데이터 분석 완료 및 1시간 후 가격 예측 알림 (뉴스/분석/예측은 뉴스 이벤트에서 가져옴)
     """
     try:
         bot_token = TELEGRAM_BOT_TOKEN
@@ -246,54 +326,30 @@ def send_historical_analysis_notification(symbol: str, price_data: list, volume_
         if not bot_token or not chat_id:
             return
         
-        # 뉴스 데이터 가져오기
-        original_news = None
-        try:
-            analysis_filepath = filepath.replace('.csv', '_analysis.json')
-            if os.path.exists(analysis_filepath):
-                with open(analysis_filepath, 'r', encoding='utf-8') as f:
-                    analysis_data = json.load(f)
-                    original_news = analysis_data.get('news', {})
-        except Exception:
-            pass
+        symbol = event.symbol
+        prediction_data = event.prediction
+        original_news = event.news
+        news_analysis = event.llm_result
+        
+        alert = _live_alert(event)
+        if alert is not None:
+            if news_analysis:
+                alert.update("analysis", _live_analysis_section(news_analysis))
+            if prediction_data:
+                alert.update("prediction", _live_prediction_section(prediction_data))
+            return
         
         # 과거 데이터 분석
-        prices = [p for p in price_data if p is not None]
-        volumes = [v for v in volume_data if v is not None] if volume_data else []
+        prices = [p for p in EventRecord.values(event.record.pct_m) if p is not None]
+        volumes = [v for v in EventRecord.values(event.record.volume_m) if v is not None]
         
-        if not prices:
+        if not prices or not prediction_data:
             return
         
-        current_price = prices[-1]  # 뉴스 발표 시점 가격
+        current_price = prediction_data["current_price"]  # 뉴스 발표 시점 가격
         avg_price = sum(prices) / len(prices)
         total_volume = sum(volumes) if volumes else 0
-        
-        # AI로 1시간 후 가격 예측
-        from .llm_analyzer import predict_price_with_gpt
-        prediction_result = predict_price_with_gpt(symbol, original_news, prices, volumes)
-        
-        # 예측 결과를 파일에 저장 (나중에 비교용)
-        prediction_filepath = filepath.replace('.csv', '_prediction.json')
-        prediction_data = {
-            "symbol": symbol,
-            "current_price": current_price,
-            "prediction": prediction_result,
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        with open(prediction_filepath, 'w', encoding='utf-8') as f:
-            json.dump(prediction_data, f, ensure_ascii=False, indent=2)
-        
-        # 뉴스 분석 결과 가져오기
-        news_analysis = None
-        try:
-            analysis_filepath = filepath.replace('.csv', '_analysis.json')
-            if os.path.exists(analysis_filepath):
-                with open(analysis_filepath, 'r', encoding='utf-8') as f:
-                    analysis_data = json.load(f)
-                    news_analysis = analysis_data.get('llm_analysis', {})
-        except Exception:
-            pass
+        prediction_result = prediction_data["prediction"]
         
         # 뉴스 정보
         news_title = original_news.get('title', '제목 없음') if original_news else '뉴스 없음'
@@ -346,16 +402,87 @@ def send_historical_analysis_notification(symbol: str, price_data: list, volume_
 
 🕐 *분석 시간:* {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"""
 
-        telegram_url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
+        await _send_telegram_message(bot_token, chat_id, message)
+        
+    except Exception as e:
+        logger.error(f"❌ 과거 분석 알림 오류: {e}")
+
+async def send_preliminary_analysis_notification(event: NewsEvent, fields: dict):
+    """
+    뉴스 분석 스트리밍 중 평점/감성/영향도가 먼저 완성되면 보내는 예비 알림
+    (분석 본문과 가격 예측은 이후 과거 분석 알림으로 전송)
+    """
+    try:
+        bot_token = TELEGRAM_BOT_TOKEN
+        chat_id = TELEGRAM_CHAT_ID
+        
+        if not bot_token or not chat_id:
+            return
+        
+        alert = _live_alert(event)
+        if alert is not None:
+            alert.update("analysis", _live_analysis_section(fields, preliminary=True))
+            return
+        
+        symbol = event.symbol
+        original_news = event.news
+        rating = fields.get('rating', 3)
+        rating_emoji = "📈" if rating >= 4 else "📉" if rating <= 2 else "📊"
+        sentiment_emoji = {"positive": "😊", "negative": "😰", "neutral": "😐"}.get(fields.get('sentiment', 'neutral'), "😐")
+        impact_emoji = {"high": "🔥", "medium": "⚡", "low": "💧"}.get(fields.get('impact', 'medium'), "⚡")
+        news_title = original_news.get('title', '제목 없음') if original_news else '뉴스 없음'
+        
+        message = f"""⚡ *뉴스 예비 분석*
+
+📈 *종목:* `{symbol}` {rating_emoji}
+📰 *제목:* {news_title}
+• AI 평점: {rating}/5 {sentiment_emoji}
+• 감성: {fields.get('sentiment', 'neutral')}
+• 영향도: {fields.get('impact', 'medium')} {impact_emoji}
+
+🕐 *분석 시간:* {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"""
+
+        await _send_telegram_message(bot_token, chat_id, message)
+        
+    except Exception as e:
+        logger.error(f"❌ 예비 분석 알림 오류: {e}")
+
+async def send_price_move_alert(event: NewsEvent, reference_price: float, price: float, move_pct: float, bar: dict = None):
+    """
+    스트리밍 시세 기준 뉴스 발생 후 급등락 알림
+    """
+    try:
+        bot_token = TELEGRAM_BOT_TOKEN
+        chat_id = TELEGRAM_CHAT_ID
         
-        payload = {
-            "chat_id": chat_id,
-            "text": message,
-            "parse_mode": "Markdown",
-            "disable_web_page_preview": True
-        }
+        if not bot_token or not chat_id:
+            return
+        
+        symbol = event.symbol
+        move_emoji = "🚀" if move_pct > 0 else "💥"
+        
+        alert = _live_alert(event)
+        if alert is not None:
+            alert.update("move", f"{move_emoji} *급변동 감지:* ${reference_price:.2f} → ${price:.2f} ({move_pct:+.2f}%, {datetime.now().strftime('%H:%M:%S')})")
+            return
+        
+        bar_info = ""
+        if bar:
+            bar_info = f"""
+
+🕯️ *현재 1분봉:*
+• 시가 ${bar['open']:.2f} / 고가 ${bar['high']:.2f} / 저가 ${bar['low']:.2f} / 종가 ${bar['close']:.2f}
+• 거래량: {bar['volume']:,.0f}"""
         
-        requests.post(telegram_url, json=payload, timeout=5)
+        message = f"""{move_emoji} *뉴스 후 급변동 감지*
+
+📈 *종목:* `{symbol}`
+💰 *기준가:* ${reference_price:.2f} → *현재가:* ${price:.2f}
+📊 *변화율:* {move_pct:+.2f}%{bar_info}
+
+🕐 *감지 시간:* {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"""
+
+        await _send_telegram_message(bot_token, chat_id, message)
         
     except Exception as e:
-        logger.error(f"❌ 과거 분석 알림 오류: {e}")
+        logger.error(f"❌ 급변동 알림 오류: {e}")
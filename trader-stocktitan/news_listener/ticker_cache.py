@@ -0,0 +1,72 @@
+import json
+import os
+import tempfile
+from .config import logger, TICKER_CACHE_PATH, TICKER_UNIVERSE
+
+class TickerIdCache:
+    """
+    종목 → webull 티커 ID 디스크 캐시
+
+    티커 ID는 거의 바뀌지 않으므로 시작 시 파일에서 읽고, 새로 조회한 ID만 추가로 저장합니다.
+    """
+
+    def __init__(self, path: str = TICKER_CACHE_PATH):
+        self.path = path
+        self._ids = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._ids
+
+    def get(self, symbol: str):
+        return self._ids.get(symbol)
+
+    def put(self, symbol: str, ticker_id: str):
+        self._ids[symbol] = ticker_id
+
+    def missing(self, symbols: list) -> list:
+        """캐시에 없는 종목들"""
+        return [symbol for symbol in dict.fromkeys(symbols) if symbol not in self._ids]
+
+    def load(self) -> int:
+        """캐시 파일을 읽습니다. 없거나 손상됐으면 빈 캐시로 시작합니다."""
+        if not os.path.exists(self.path):
+            return 0
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._ids.update({symbol: str(ticker_id) for symbol, ticker_id in json.load(f).items()})
+            logger.info(f"📇 티커 ID 캐시 로드: {len(self._ids)}개")
+        except Exception as e:
+            logger.error(f"❌ 티커 ID 캐시 읽기 실패: {e}")
+        return len(self._ids)
+
+    def save(self):
+        """캐시 파일을 원자적으로 다시 씁니다."""
+        directory = os.path.dirname(self.path) or "."
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_", suffix=".json")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self._ids, f, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+def load_universe(value: str = TICKER_UNIVERSE) -> list:
+    """
+    워밍업할 종목 목록을 읽습니다. (쉼표로 구분한 종목들 또는 한 줄에 하나씩 적힌 파일 경로)
+    """
+    if not value:
+        return []
+    if os.path.exists(value):
+        with open(value, "r", encoding="utf-8") as f:
+            entries = [line.split("#")[0] for line in f]
+    else:
+        entries = value.split(",")
+    return list(dict.fromkeys(entry.strip().upper() for entry in entries if entry.strip()))
+
+# 프로세스 전역 티커 ID 캐시
+ticker_ids = TickerIdCache()
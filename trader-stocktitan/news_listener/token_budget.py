@@ -0,0 +1,94 @@
+import math
+import re
+from .config import logger, GPT_MODEL, LLM_INPUT_TOKEN_BUDGET
+
+# tiktoken은 requirements.txt에 포함 (설치되지 않은 환경에서는 UTF-8 바이트 수 기반 근사치 사용)
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# 잘라낸 본문 끝에 붙이는 표시
+TRUNCATION_MARK = " …(이하 생략)"
+
+_TAG_PATTERN = re.compile(r"<[^>]+>")
+_SPACE_PATTERN = re.compile(r"[ \t\r\f\v]+")
+_BLANK_LINES_PATTERN = re.compile(r"\n\s*\n+")
+
+# 보도자료 뒷부분의 상투적인 구간 (이 표지 이후는 분석에 거의 쓸모없음)
+_BOILERPLATE_PATTERNS = (
+    re.compile(
+        r"forward[- ]looking statements|safe harbor|cautionary (note|statement)|"
+        r"(media|investor|press) (contacts?|relations)\b|view (original|source) content|"
+        r"this press release (contains|includes|may contain)",
+        re.IGNORECASE
+    ),
+    re.compile(r"\n\s*About [A-Z][^\n]{0,80}\n"),
+    re.compile(r"\bSOURCE:? [A-Z][\w.,&' -]+$", re.MULTILINE)
+)
+
+# 본문 앞부분 보호 비율 (리드 문단에 나온 표지는 무시)
+_MIN_LEAD_FRACTION = 0.2
+
+_encodings = {}
+
+def _encoding(model: str):
+    if tiktoken is None:
+        return None
+    if model not in _encodings:
+        try:
+            _encodings[model] = tiktoken.encoding_for_model(model)
+        except KeyError:
+            _encodings[model] = tiktoken.get_encoding("o200k_base")
+        except Exception as e:
+            logger.warning(f"⚠️ 토큰 인코딩 로드 실패, 근사치 사용: {e}")
+            _encodings[model] = None
+    return _encodings[model]
+
+def count_tokens(text: str, model: str = GPT_MODEL) -> int:
+    """텍스트의 토큰 수 (tiktoken이 없으면 UTF-8 4바이트당 1토큰으로 근사)"""
+    if not text:
+        return 0
+    encoding = _encoding(model or "")
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text.encode("utf-8")) / 4)
+
+def strip_boilerplate(text: str) -> str:
+    """HTML 태그와 공백을 정리하고, 면책 조항/회사 소개/연락처 이후 구간을 잘라냅니다."""
+    text = _TAG_PATTERN.sub(" ", text or "")
+    text = _BLANK_LINES_PATTERN.sub("\n\n", _SPACE_PATTERN.sub(" ", text)).strip()
+    lead = int(len(text) * _MIN_LEAD_FRACTION)
+    starts = [match.start() for match in (pattern.search(text, lead) for pattern in _BOILERPLATE_PATTERNS) if match]
+    if starts:
+        text = text[:min(starts)].rstrip()
+    return text
+
+def fit_to_budget(text: str, budget: int = LLM_INPUT_TOKEN_BUDGET, model: str = GPT_MODEL) -> str:
+    """
+    기사 본문을 입력 토큰 예산에 맞춥니다.
+
+    상투적인 구간을 먼저 걷어내고, 그래도 넘치면 리드부터 문단/문장 경계를 유지하며 앞부분만 남깁니다.
+    (보도자료는 핵심 내용이 앞에 오므로 앞부분 보존)
+    """
+    text = strip_boilerplate(text)
+    if budget <= 0 or count_tokens(text, model) <= budget:
+        return text
+
+    # 예산에 맞는 가장 긴 앞부분을 이진 탐색 (문자 단위)
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if count_tokens(text[:middle], model) + count_tokens(TRUNCATION_MARK, model) <= budget:
+            low = middle
+        else:
+            high = middle - 1
+    cut = text[:low]
+
+    # 가능하면 문단 → 문장 경계에서 자름 (남는 길이의 절반 이상일 때만)
+    for boundary in ("\n\n", ". ", "다. "):
+        position = cut.rfind(boundary)
+        if position >= low // 2:
+            cut = cut[:position + len(boundary)]
+            break
+    return cut.rstrip() + TRUNCATION_MARK
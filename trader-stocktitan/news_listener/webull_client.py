@@ -1,20 +1,90 @@
-import pandas as pd
-from datetime import datetime, timedelta
+import asyncio
+import functools
+import time
+import numpy as np
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from webull import webull
-from .config import logger, WB_EMAIL, WB_PASSWORD, WB_TRADE_PIN
+from .config import (
+    logger, WB_EMAIL, WB_PASSWORD, WB_TRADE_PIN, WEBULL_EXECUTOR_WORKERS, QUOTE_BATCH_SIZE,
+    WEBULL_QUOTE_RATE, WEBULL_BARS_RATE, WEBULL_TICKER_RATE, WEBULL_RATE_BURST, WEBULL_MAX_CONCURRENCY,
+    WEBULL_MAX_RETRIES, WEBULL_BACKOFF_BASE, WEBULL_BREAKER_THRESHOLD, WEBULL_BREAKER_COOLDOWN,
+    TICKER_WARMUP_CONCURRENCY
+)
 from .telegram_notifier import send_error_notification
+from .bar_cache import bar_history, minute_floor
+from .rate_limiter import RateLimiter, CircuitBreaker, CircuitOpenError
+from .ticker_cache import ticker_ids, load_universe
+from . import metrics
 
 # webull 초기화
 wb = webull()
 
-def initialize_webull():
-    """Webull 클라이언트를 초기화하고 로그인합니다."""
+# 여러 종목 시세를 한 번에 조회하는 게이트웨이 엔드포인트 (webull 웹 앱과 동일)
+BATCH_QUOTE_URL = "https://quotes-gw.webullfintech.com/api/bgw/quote/realtime"
+
+# 진행 중인 티커 ID 조회 (같은 종목 동시 조회 병합) 및 webull에 없는 종목
+_ticker_lookups = {}
+_unknown_symbols = set()
+_warm_up_task = None
+
+# webull 라이브러리는 동기 방식이므로 전용 스레드 풀에서 실행
+_executor = ThreadPoolExecutor(max_workers=WEBULL_EXECUTOR_WORKERS, thread_name_prefix="webull")
+
+async def _run_webull(func, *args, **kwargs):
+    """동기 webull 호출을 이벤트 루프를 막지 않도록 스레드 풀에서 실행합니다."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+
+# 백그라운드 알림 태스크 (가비지 컬렉션 방지용 참조 보관)
+_notify_tasks = set()
+
+def _on_breaker_state_change(breaker: CircuitBreaker, old_state: str, new_state: str):
+    """브레이커가 열리거나 복구될 때 한 번만 알림을 보냅니다. (half-open 전환은 로그만)"""
+    if new_state == CircuitBreaker.OPEN and old_state == CircuitBreaker.CLOSED:
+        message = f"연속 {breaker.failures}회 실패 - {breaker.cooldown:.0f}초 동안 Webull 호출을 차단합니다."
+        task = asyncio.ensure_future(send_error_notification("Webull 서킷 브레이커 열림", message))
+    elif new_state == CircuitBreaker.CLOSED:
+        task = asyncio.ensure_future(send_error_notification("Webull 서킷 브레이커 복구", "Webull 호출이 정상화되었습니다."))
+    else:
+        return
+    _notify_tasks.add(task)
+    task.add_done_callback(_notify_tasks.discard)
+
+# 모든 webull 호출이 공유하는 엔드포인트별 호출 예산과 서킷 브레이커
+webull_breaker = CircuitBreaker("webull", WEBULL_BREAKER_THRESHOLD, WEBULL_BREAKER_COOLDOWN, _on_breaker_state_change)
+webull_limiter = RateLimiter(
+    "webull",
+    budgets={
+        "quote": (WEBULL_QUOTE_RATE, WEBULL_RATE_BURST),
+        "bars": (WEBULL_BARS_RATE, WEBULL_RATE_BURST),
+        "ticker": (WEBULL_TICKER_RATE, WEBULL_RATE_BURST)
+    },
+    max_concurrency=WEBULL_MAX_CONCURRENCY,
+    max_retries=WEBULL_MAX_RETRIES,
+    backoff_base=WEBULL_BACKOFF_BASE,
+    breaker=webull_breaker
+)
+
+async def _call_webull(endpoint: str, func, *args, **kwargs):
+    """webull 호출을 호출 예산/재시도/서킷 브레이커를 거쳐 스레드 풀에서 실행합니다."""
+    return await webull_limiter.call(endpoint, _run_webull, func, *args, **kwargs)
+
+async def initialize_webull():
+    """Webull 클라이언트를 초기화하고 로그인합니다. (티커 ID 캐시 로드 및 종목 유니버스 워밍업 시작)"""
+    global _warm_up_task
     try:
+        ticker_ids.load()
         if WB_EMAIL and WB_PASSWORD:
-            wb.login(WB_EMAIL, WB_PASSWORD)
+            await _run_webull(wb.login, WB_EMAIL, WB_PASSWORD)
             if WB_TRADE_PIN:
-                wb.get_trade_token(WB_TRADE_PIN)
+                await _run_webull(wb.get_trade_token, WB_TRADE_PIN)
             logger.info("✅ Webull 로그인 성공")
+
+            universe = load_universe()
+            if universe and _warm_up_task is None:
+                _warm_up_task = asyncio.ensure_future(warm_up_ticker_ids(universe))
             return True
         else:
             logger.warning("⚠️ Webull 로그인 정보 없음 - 더미 데이터 사용")
@@ -22,65 +92,80 @@ def initialize_webull():
     except Exception as e:
         error_msg = f"Webull 로그인 실패: {e}"
         logger.error(f"❌ {error_msg}")
-        send_error_notification("Webull 로그인 실패", error_msg)
+        await send_error_notification("Webull 로그인 실패", error_msg)
         return False
 
-def get_historical_data(symbol: str, minutes: int = 60) -> dict:
-    """webull 라이브러리로 과거 60분 히스토리 데이터를 수집합니다."""
+def _empty_history(minutes: int) -> dict:
+    """데이터가 없을 때의 히스토리 (NaN 배열)"""
+    return {
+        'prices': np.full(minutes, np.nan),
+        'volumes': np.full(minutes, np.nan),
+        'times': np.empty(0),
+        'timestamp': datetime.now()
+    }
+
+def _bars_to_arrays(bars) -> tuple:
+    """get_bars DataFrame을 (봉 시작 시각, 종가, 거래량) 배열로 변환합니다."""
+    if bars is None or bars.empty:
+        return np.empty(0), np.empty(0), np.empty(0)
+    times = np.array([ts.timestamp() for ts in bars.index], dtype=float)
+    return times, bars['close'].to_numpy(dtype=float), bars['volume'].to_numpy(dtype=float)
+
+async def get_historical_data(symbol: str, minutes: int = 60, end_ts: float = None) -> dict:
+    """
+    end_ts(기본: 현재) 이전에 시작한 1분봉 minutes개를 열 단위 배열로 반환합니다.
+
+    종목별 1분봉 캐시에서 응답하고, 캐시에 없는 최근 구간만 webull에서 가져옵니다.
+    """
     try:
         if WB_EMAIL and WB_PASSWORD:
-            # 현재 시간 기준 60분 전부터 1분 단위 데이터 가져오기
-            end_time = datetime.now()
-            start_time = end_time - timedelta(minutes=minutes)
-            
-            # get_bars로 1분봉 데이터 가져오기
-            bars = wb.get_bars(stock=symbol, interval='m1', count=minutes)
-            
-            if bars is not None and not bars.empty:
-                price_data = []
-                volume_data = []
-                
-                # DataFrame 인덱스로 순회
-                for idx, row in bars.iterrows():
-                    price_data.append(row['close'] if 'close' in row else None)
-                    volume_data.append(row['volume'] if 'volume' in row else None)
-                
+            now = time.time()
+            end_minute = minute_floor(now if end_ts is None else min(end_ts, now))
+
+            async with bar_history.lock(symbol):
+                entry = bar_history.get(symbol)
+                count, full = bar_history.missing_count(entry, end_minute, minutes, now)
+                if count:
+                    metrics.inc_counter("bar_cache_misses_total")
+                    metrics.inc_counter("webull_bar_requests_total")
+                    ticker_id = await _get_ticker_id(symbol)
+                    bars = await _call_webull("bars", wb.get_bars, tId=ticker_id, interval='m1', count=count)
+                    entry = bar_history.store(symbol, *_bars_to_arrays(bars), fetched_at=now, requested=count, full=full)
+                else:
+                    metrics.inc_counter("bar_cache_hits_total")
+                times, prices, volumes = entry.window(end_minute, minutes)
+
+            if len(times):
                 return {
-                    'prices': price_data,
-                    'volumes': volume_data,
+                    'prices': prices,
+                    'volumes': volumes,
+                    'times': times,
                     'timestamp': datetime.now()
                 }
         else:
             # 로그인 정보가 없으면 더미 데이터 반환
             logger.warning(f"⚠️ Webull 로그인 정보 없음 - {symbol} 더미 데이터 사용")
-            return {
-                'prices': [None] * minutes,  # 더미 가격
-                'volumes': [None] * minutes,  # 더미 볼륨
-                'timestamp': datetime.now()
-            }
+            return _empty_history(minutes)
+    except CircuitOpenError as e:
+        # 브레이커가 열린 동안은 상태 변경 시 한 번만 알리므로 개별 알림 생략
+        logger.warning(f"⚠️ Webull 히스토리 데이터 건너뜀 ({symbol}): {e}")
     except Exception as e:
         error_msg = f"Webull 히스토리 데이터 오류 ({symbol}): {e}"
         logger.error(f"❌ {error_msg}")
-        send_error_notification("Webull 히스토리 데이터 오류", error_msg, symbol)
+        await send_error_notification("Webull 히스토리 데이터 오류", error_msg, symbol)
     
     # 에러 발생 시 더미 데이터 반환
-    return {
-        'prices': [None] * minutes,
-        'volumes': [None] * minutes,
-        'timestamp': datetime.now()
-    }
+    return _empty_history(minutes)
 
-def get_realtime_data(symbol: str) -> dict:
+async def get_realtime_data(symbol: str) -> dict:
     """webull 라이브러리로 실시간 주식 데이터를 수집합니다."""
     try:
         if WB_EMAIL and WB_PASSWORD:
-            quote = wb.get_quote(symbol)
+            metrics.inc_counter("webull_quote_requests_total")
+            ticker_id = await _get_ticker_id(symbol)
+            quote = await _call_webull("quote", wb.get_quote, tId=ticker_id)
             if quote:
-                return {
-                    'price': quote.get('close', 0),
-                    'volume': quote.get('volume', 0),
-                    'timestamp': datetime.now()
-                }
+                return _parse_quote(quote)
         else:
             # 로그인 정보가 없으면 더미 데이터 반환
             logger.warning(f"⚠️ Webull 로그인 정보 없음 - {symbol} 더미 데이터 사용")
@@ -89,10 +174,159 @@ def get_realtime_data(symbol: str) -> dict:
                 'volume': None,  # 더미 볼륨
                 'timestamp': datetime.now()
             }
+    except CircuitOpenError as e:
+        logger.warning(f"⚠️ Webull 실시간 데이터 건너뜀 ({symbol}): {e}")
     except Exception as e:
         error_msg = f"Webull 실시간 데이터 오류 ({symbol}): {e}"
         logger.error(f"❌ {error_msg}")
-        send_error_notification("Webull 실시간 데이터 오류", error_msg, symbol)
+        await send_error_notification("Webull 실시간 데이터 오류", error_msg, symbol)
     
-    # 에러 발생 시 더미 데이터 반환
-    return {'price': 0, 'volume': 0, 'timestamp': datetime.now()}
+    # 에러 발생 시 가격 없음 (0은 실제 가격으로 오인되므로 사용하지 않음)
+    return {'price': None, 'volume': None, 'timestamp': datetime.now()}
+
+
+def _to_float(value):
+    """webull 응답의 숫자 문자열을 float으로 변환합니다."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def _parse_quote(quote: dict) -> dict:
+    """webull 시세 응답을 공통 형식으로 변환합니다."""
+    return {
+        'price': _to_float(quote.get('close')),
+        'volume': _to_float(quote.get('volume')),
+        'timestamp': datetime.now()
+    }
+
+def _lookup_ticker(symbol: str):
+    """webull에서 티커 ID를 조회합니다. 없는 종목이면 None (스레드 풀에서 실행)"""
+    try:
+        return str(wb.get_ticker(symbol))
+    except ValueError:
+        return None
+
+async def _resolve_ticker_id(symbol: str, persist: bool = True) -> str:
+    metrics.inc_counter("ticker_cache_misses_total")
+    ticker_id = await _call_webull("ticker", _lookup_ticker, symbol)
+    if ticker_id is None:
+        _unknown_symbols.add(symbol)
+        raise ValueError(f"티커 ID를 찾을 수 없음: {symbol}")
+
+    ticker_ids.put(symbol, ticker_id)
+    if persist:
+        try:
+            ticker_ids.save()
+        except Exception as e:
+            logger.error(f"❌ 티커 ID 캐시 저장 실패: {e}")
+    return ticker_id
+
+async def _get_ticker_id(symbol: str, persist: bool = True) -> str:
+    """
+    종목의 webull 티커 ID를 반환합니다. (디스크 캐시 우선, 같은 종목 동시 조회는 하나로 병합)
+    """
+    ticker_id = ticker_ids.get(symbol)
+    if ticker_id is not None:
+        metrics.inc_counter("ticker_cache_hits_total")
+        return ticker_id
+    if symbol in _unknown_symbols:
+        raise ValueError(f"티커 ID를 찾을 수 없음: {symbol}")
+
+    task = _ticker_lookups.get(symbol)
+    if task is None:
+        task = asyncio.ensure_future(_resolve_ticker_id(symbol, persist))
+        _ticker_lookups[symbol] = task
+        task.add_done_callback(lambda _: _ticker_lookups.pop(symbol, None))
+    return await asyncio.shield(task)
+
+async def warm_up_ticker_ids(symbols: list) -> int:
+    """
+    종목 유니버스의 티커 ID를 미리 조회해 디스크 캐시에 저장합니다.
+    (실시간 뉴스 조회가 끼어들 수 있도록 적은 동시성으로 나눠서 진행)
+    """
+    missing = ticker_ids.missing(symbols)
+    if not missing:
+        logger.info(f"📇 티커 ID 워밍업 불필요 (유니버스 {len(symbols)}개 모두 캐시됨)")
+        return 0
+
+    logger.info(f"📇 티커 ID 워밍업 시작: {len(missing)}개 / 유니버스 {len(symbols)}개")
+    resolved = 0
+    try:
+        for i in range(0, len(missing), TICKER_WARMUP_CONCURRENCY):
+            chunk = missing[i:i + TICKER_WARMUP_CONCURRENCY]
+            results = await asyncio.gather(
+                *(_get_ticker_id(symbol, persist=False) for symbol in chunk), return_exceptions=True
+            )
+            resolved += sum(1 for result in results if isinstance(result, str))
+            if any(isinstance(result, CircuitOpenError) for result in results):
+                logger.warning("⚠️ 서킷 브레이커 열림 - 티커 ID 워밍업 중단")
+                break
+    finally:
+        ticker_ids.save()
+
+    logger.info(f"✅ 티커 ID 워밍업 완료: {resolved}개 조회 (캐시 {len(ticker_ids)}개)")
+    return resolved
+
+def _fetch_quotes_batch(symbol_ids: dict) -> dict:
+    """여러 종목의 시세를 하나의 HTTP 요청으로 조회합니다. (스레드 풀에서 실행)"""
+    params = {
+        "ids": ",".join(symbol_ids.values()),
+        "includeSecu": 1,
+        "delay": 0,
+        "more": 1
+    }
+    metrics.inc_counter("webull_quote_requests_total")
+    response = requests.get(BATCH_QUOTE_URL, params=params, headers=wb.build_req_headers(), timeout=wb.timeout)
+    response.raise_for_status()
+
+    quotes = {str(quote.get('tickerId')): quote for quote in response.json()}
+    return {symbol: quotes.get(ticker_id) for symbol, ticker_id in symbol_ids.items()}
+
+async def get_realtime_data_batch(symbols: list) -> dict:
+    """
+    여러 종목의 실시간 데이터를 배치 요청으로 수집합니다.
+
+    티커 ID를 얻은 종목만 배치로 묶고, ID 조회에 실패했거나 배치 응답에 없는 종목만 종목별 조회로 대체합니다.
+    """
+    symbols = list(dict.fromkeys(symbols))
+    if not symbols:
+        return {}
+
+    if not (WB_EMAIL and WB_PASSWORD):
+        return {symbol: await get_realtime_data(symbol) for symbol in symbols}
+
+    results = {}
+    for i in range(0, len(symbols), QUOTE_BATCH_SIZE):
+        chunk = symbols[i:i + QUOTE_BATCH_SIZE]
+        metrics.observe("webull_quote_batch_size", len(chunk))
+        try:
+            resolved = await asyncio.gather(*(_get_ticker_id(symbol) for symbol in chunk), return_exceptions=True)
+            errors = [result for result in resolved if isinstance(result, BaseException)]
+            if any(isinstance(error, CircuitOpenError) for error in errors):
+                raise next(error for error in errors if isinstance(error, CircuitOpenError))
+            if errors:
+                logger.warning(f"⚠️ 티커 ID 조회 실패 {len(errors)}개 종목은 종목별 조회로 대체: {errors[0]}")
+            symbol_ids = {symbol: ticker_id for symbol, ticker_id in zip(chunk, resolved) if isinstance(ticker_id, str)}
+            if not symbol_ids:
+                continue
+            quotes = await _call_webull("quote", _fetch_quotes_batch, symbol_ids)
+            for symbol in symbol_ids:
+                if quotes.get(symbol):
+                    results[symbol] = _parse_quote(quotes[symbol])
+        except CircuitOpenError as e:
+            # 브레이커가 열려 있으면 종목별 조회도 거부되므로 가격 없음으로 응답
+            logger.warning(f"⚠️ Webull 배치 시세 조회 건너뜀 ({len(chunk)}개): {e}")
+            now = datetime.now()
+            for symbol in chunk:
+                results[symbol] = {'price': None, 'volume': None, 'timestamp': now}
+        except Exception as e:
+            logger.warning(f"⚠️ Webull 배치 시세 조회 실패, 종목별 조회로 대체 ({len(chunk)}개): {e}")
+
+    # 배치 응답에 없는 종목은 개별 조회
+    missing = [symbol for symbol in symbols if symbol not in results]
+    if missing:
+        fallback = await asyncio.gather(*(get_realtime_data(symbol) for symbol in missing))
+        results.update(zip(missing, fallback))
+
+    return results
@@ -0,0 +1,40 @@
+import os
+import tempfile
+
+# news_listener.config는 import 시점에 환경변수를 읽으므로, 런타임 출력 경로는 그 전에 임시 폴더로 돌림
+_runtime_dir = tempfile.mkdtemp(prefix="news_listener_test_")
+os.environ["MONITOR_CHECKPOINT_PATH"] = os.path.join(_runtime_dir, "monitor_checkpoint.json")
+os.environ["EVENT_STORE_DIR"] = os.path.join(_runtime_dir, "events")
+os.environ["LLM_CACHE_PATH"] = os.path.join(_runtime_dir, "llm_cache.sqlite3")
+os.environ["PRESCORER_MODEL_PATH"] = os.path.join(_runtime_dir, "prescorer.npz")
+os.environ["TICKER_CACHE_PATH"] = os.path.join(_runtime_dir, "ticker_ids.json")
+os.environ["MARKET_DATA_PROVIDER"] = "simulator"
+os.environ["TELEGRAM_BOT_TOKEN"] = ""
+os.environ["TELEGRAM_CHAT_ID"] = ""
+os.environ["TELEGRAM_ERROR_BOT_TOKEN"] = ""
+os.environ["TELEGRAM_ERROR_CHAT_ID"] = ""
+
+import time
+import pytest
+from news_listener import market_data
+from news_listener.news_event import NewsEvent
+from news_listener.simulator import SimulatorProvider
+
+@pytest.fixture
+def simulator():
+    """시계 600배속 시뮬레이터 시세 제공자 (1분 = 실제 0.1초)"""
+    previous = market_data.get_provider()
+    provider = SimulatorProvider(seed=7, speed=600)
+    market_data.set_provider(provider)
+    yield provider
+    market_data.set_provider(previous)
+
+def make_event(symbol: str = "SIM001", news_ts: float = None, title: str = None) -> NewsEvent:
+    """웹소켓 뉴스 메시지 형식으로 뉴스 이벤트를 만듭니다."""
+    news_ts = time.time() if news_ts is None else news_ts
+    return NewsEvent.from_payload({
+        "payload": {
+            "news": {"id": 1, "symbol": symbol, "title": title or f"{symbol} announces results", "timestamp": int(news_ts * 1000)},
+            "stock": {"marketCap": 120_000_000}
+        }
+    })
@@ -0,0 +1,54 @@
+import numpy as np
+from news_listener.bar_cache import SymbolBars, BarCache, minute_floor
+
+T0 = 1_760_000_000.0 - 1_760_000_000.0 % 60
+
+def test_ring_buffer_keeps_latest_bars_in_order():
+    bars = SymbolBars(capacity=4)
+    for i in range(6):
+        bars.append(T0 + i * 60, 10.0 + i, 100.0)
+    times, closes, _ = bars.window(T0 + 10 * 60, 10)
+    assert times.tolist() == [T0 + i * 60 for i in range(2, 6)]
+    assert closes.tolist() == [12.0, 13.0, 14.0, 15.0]
+
+def test_append_overwrites_current_minute_and_ignores_older_bars():
+    bars = SymbolBars(capacity=4)
+    bars.append(T0, 10.0, 100.0)
+    bars.append(T0, 10.5, 150.0)
+    bars.append(T0 - 60, 9.0, 50.0)
+    times, closes, volumes = bars.window(T0 + 60, 5)
+    assert times.tolist() == [T0]
+    assert closes.tolist() == [10.5]
+    assert volumes.tolist() == [150.0]
+
+def test_window_stops_before_end_minute():
+    bars = SymbolBars(capacity=10)
+    for i in range(5):
+        bars.append(T0 + i * 60, float(i), 1.0)
+    _, closes, _ = bars.window(T0 + 3 * 60, 2)
+    assert closes.tolist() == [1.0, 2.0]
+    assert bars.count_before(T0 + 3 * 60) == 3
+
+def test_missing_count_fetches_only_the_tail():
+    cache = BarCache(ttl=60, max_symbols=10, capacity=120)
+    now = T0 + 30
+    assert cache.missing_count(None, T0, 60, now) == (61, True)
+
+    times = T0 - 60 * np.arange(60, 0, -1)
+    entry = cache.store("SIM000", times, np.ones(60), np.ones(60), fetched_at=now, requested=61, full=True)
+    # 같은 분 안의 반복 요청은 캐시만으로 충분
+    assert cache.missing_count(entry, T0, 60, now) == (0, False)
+    # 3분 뒤에는 확정되지 않은 최근 구간만
+    assert cache.missing_count(entry, T0 + 180, 60, now + 180) == (4, False)
+
+def test_lru_evicts_least_recently_used_symbol():
+    cache = BarCache(ttl=60, max_symbols=2, capacity=10)
+    for symbol in ("A", "B"):
+        cache.store(symbol, np.array([T0]), np.ones(1), np.ones(1), fetched_at=T0 + 30, requested=1, full=True)
+    cache.get("A")
+    cache.store("C", np.array([T0]), np.ones(1), np.ones(1), fetched_at=T0 + 30, requested=1, full=True)
+    assert cache.get("B") is None
+    assert cache.get("A") is not None and cache.get("C") is not None
+
+def test_minute_floor():
+    assert minute_floor(T0 + 59.9) == T0
@@ -0,0 +1,49 @@
+import asyncio
+import json
+import pytest
+from news_listener import scheduler as scheduler_module
+from news_listener.checkpoint import load_checkpoint, context_path
+from news_listener.config import MONITOR_CHECKPOINT_PATH
+from news_listener.scheduler import MinuteScheduler, MonitorWindow
+from .conftest import make_event
+
+@pytest.fixture
+async def scheduler(simulator):
+    scheduler = MinuteScheduler()
+    scheduler.start()
+    yield scheduler
+    scheduler._task.cancel()
+
+async def test_checkpoint_holds_window_state_and_context_separately(scheduler, simulator):
+    event = make_event("SIM020", news_ts=simulator.now())
+    window = MonitorWindow(event, on_complete=lambda window: asyncio.sleep(0), minutes=30)
+    scheduler.add_window(window)
+    event.llm_result = {"rating": 5}
+    scheduler.checkpoint(window)
+    for _ in range(5):
+        scheduler.checkpoint()
+    await scheduler.flush_checkpoint()
+
+    with open(MONITOR_CHECKPOINT_PATH, encoding="utf-8") as f:
+        entry, = json.load(f)["windows"]
+    assert "news" not in entry and "llm_result" not in entry
+
+    entry, = load_checkpoint()
+    assert entry["event_id"] == event.event_id
+    assert entry["news"]["title"] == "SIM020 announces results"
+    assert entry["llm_result"] == {"rating": 5}
+
+async def test_context_journal_is_compacted(scheduler, simulator, monkeypatch):
+    monkeypatch.setattr(scheduler_module, "CONTEXT_COMPACT_LINES", 3)
+    event = make_event("SIM030", news_ts=simulator.now())
+    window = MonitorWindow(event, on_complete=lambda window: asyncio.sleep(0), minutes=30)
+    scheduler.add_window(window)
+    for rating in range(1, 6):
+        event.llm_result = {"rating": rating}
+        scheduler.checkpoint(window)
+        await scheduler.flush_checkpoint()
+
+    with open(context_path(MONITOR_CHECKPOINT_PATH), encoding="utf-8") as f:
+        lines = f.readlines()
+    assert len(lines) <= 3
+    assert json.loads(lines[-1])["llm_result"] == {"rating": 5}
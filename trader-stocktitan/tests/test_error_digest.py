@@ -0,0 +1,57 @@
+import asyncio
+from news_listener.error_digest import ErrorCoalescer
+
+def collecting_coalescer(window: float = 0.05):
+    summaries = []
+
+    async def on_summary(error_type, summary):
+        summaries.append((error_type, summary))
+
+    return ErrorCoalescer(on_summary, window=window), summaries
+
+async def test_outage_across_many_symbols_sends_one_alert_and_one_summary():
+    coalescer, summaries = collecting_coalescer()
+    admitted = [coalescer.admit("시세 조회 오류", f"timeout #{i}", f"SIM{i:03d}") for i in range(50)]
+    assert admitted.count(True) == 1 and admitted[0]
+
+    await asyncio.sleep(0.1)
+    assert len(summaries) == 1
+    error_type, summary = summaries[0]
+    assert error_type == "시세 조회 오류"
+    assert summary["count"] == 50 and summary["suppressed"] == 49
+    assert summary["symbols"] == 50
+    assert len(summary["top_symbols"]) == 5
+    assert summary["last_message"] == "timeout #49"
+
+async def test_error_types_are_windowed_separately():
+    coalescer, summaries = collecting_coalescer()
+    admitted = [
+        coalescer.admit("시세 조회 오류", "timeout", "AAA"),
+        coalescer.admit("시세 조회 오류", "timeout", "AAA"),
+        coalescer.admit("시세 조회 오류", "timeout", "BBB"),
+        coalescer.admit("뉴스 처리 오류", "boom"),
+    ]
+    assert admitted == [True, False, False, True]
+
+    await asyncio.sleep(0.1)
+    # 묻힌 오류가 없는 유형은 요약하지 않음
+    error_type, summary = summaries[0]
+    assert len(summaries) == 1 and error_type == "시세 조회 오류"
+    assert summary["symbols"] == 2 and summary["top_symbols"] == ["AAA", "BBB"]
+    assert coalescer.get_stats() == {
+        "시세 조회 오류": {"total": 3, "suppressed": 2},
+        "뉴스 처리 오류": {"total": 1, "suppressed": 0}
+    }
+
+async def test_window_is_tumbling():
+    coalescer, _ = collecting_coalescer()
+    assert coalescer.admit("오류", "a", "AAA")
+    await asyncio.sleep(0.03)
+    assert not coalescer.admit("오류", "b", "BBB")
+    await asyncio.sleep(0.04)
+    # 첫 오류부터 window초가 지나면 계속 오류가 들어와도 새 창
+    assert coalescer.admit("오류", "c", "CCC")
+
+async def test_zero_window_disables_coalescing():
+    coalescer, _ = collecting_coalescer(window=0)
+    assert all(coalescer.admit("오류", "a", "AAA") for _ in range(3))
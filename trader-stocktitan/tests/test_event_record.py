@@ -0,0 +1,23 @@
+import math
+from news_listener.event_record import EventRecord, WINDOW_MINUTES
+
+def make_record():
+    return EventRecord("SIM001_2024-01-02_10-00", "SIM001", 1_000_000, 3)
+
+def test_short_history_is_right_aligned_to_news_time():
+    record = make_record()
+    record.set_before([1.0, 2.0, 3.0], [10, 20, 30])
+
+    prices = EventRecord.values(record.pct_m)
+    volumes = EventRecord.values(record.volume_m)
+    assert prices[-3:] == [1.0, 2.0, 3.0]
+    assert volumes[-3:] == [10.0, 20.0, 30.0]
+    assert all(math.isnan(v) for v in record.pct_m[:WINDOW_MINUTES - 3])
+
+def test_long_history_keeps_most_recent_minutes():
+    record = make_record()
+    prices = [float(i) for i in range(WINDOW_MINUTES + 5)]
+    record.set_before(prices, prices)
+
+    assert EventRecord.values(record.pct_m) == prices[5:]
+    assert record.volume_m[-1] == prices[-1]
@@ -0,0 +1,93 @@
+import asyncio
+import os
+import numpy as np
+import pytest
+from news_listener.event_store import EventStore, read_events
+from .conftest import make_event
+
+def completed_event(symbol: str, news_ts: float, samples: int = 60):
+    event = make_event(symbol, news_ts=news_ts)
+    event.llm_result = {"rating": 3, "sentiment": "neutral", "impact": "low"}
+    event.record.llm_rating = 3
+    for minute in range(samples):
+        event.record.set_after_sample(minute, 10.0 + minute * 0.1, 1000.0, news_ts + (minute + 1) * 60, 0.5)
+    return event
+
+async def test_append_flush_read_roundtrip(tmp_path):
+    root = str(tmp_path / "events")
+    store = EventStore(root, batch_size=100, flush_seconds=60)
+    news_ts = 1_760_000_000.0
+    for i in range(3):
+        store.append(completed_event(f"SIM00{i}", news_ts + i * 60))
+    assert os.path.getsize(store.pending_path) > 0
+
+    await store.flush()
+    assert os.path.getsize(store.pending_path) == 0
+
+    events = read_events(root=root)
+    assert list(events["symbol"]) == ["SIM000", "SIM001", "SIM002"]
+    assert events["pct_p"].shape == (3, 60)
+    assert events["llm_rating"].tolist() == [3, 3, 3]
+    np.testing.assert_allclose(events["pct_p"][0, :2], [10.0, 10.1])
+
+    only = read_events(root=root, symbols=["SIM001"], columns=["symbol", "pct_p"])
+    assert list(only["symbol"]) == ["SIM001"]
+
+async def test_batch_size_triggers_flush(tmp_path):
+    root = str(tmp_path / "events")
+    store = EventStore(root, batch_size=2, flush_seconds=60)
+    store.append(completed_event("SIM000", 1_760_000_000.0))
+    store.append(completed_event("SIM001", 1_760_000_060.0))
+    await asyncio.sleep(0.2)
+    assert len(read_events(root=root)["event_id"]) == 2
+
+async def test_recover_rebuffers_unwritten_events(tmp_path):
+    root = str(tmp_path / "events")
+    crashed = EventStore(root, batch_size=100, flush_seconds=60)
+    crashed.append(completed_event("SIM000", 1_760_000_000.0))
+    crashed.append(completed_event("SIM001", 1_760_000_060.0))
+    crashed._flush_handle.cancel()  # 비정상 종료: Parquet으로 쓰지 못함
+
+    store = EventStore(root, batch_size=100, flush_seconds=60)
+    assert store.recover() == 2
+    await store.close()
+
+    events = read_events(root=root)
+    assert sorted(events["symbol"]) == ["SIM000", "SIM001"]
+    assert store.recover() == 0
+
+async def test_duplicate_event_ids_keep_last(tmp_path):
+    root = str(tmp_path / "events")
+    store = EventStore(root, batch_size=100, flush_seconds=60)
+    store.append(completed_event("SIM000", 1_760_000_000.0))
+    await store.flush()
+    event = completed_event("SIM000", 1_760_000_000.0)
+    event.record.llm_rating = 5
+    store.append(event)
+    await store.close()
+
+    events = read_events(root=root)
+    assert events["llm_rating"].tolist() == [5]
+
+async def test_failed_flush_is_retried_with_backoff(tmp_path):
+    root = str(tmp_path / "events")
+    store = EventStore(root, batch_size=1, flush_seconds=60, retry_base=0.02)
+    write_rows = store.write_rows
+    attempts = []
+
+    def flaky_write_rows(rows):
+        attempts.append(len(rows))
+        if len(attempts) <= 2:
+            raise OSError("disk full")
+        return write_rows(rows)
+
+    store.write_rows = flaky_write_rows
+    store.append(completed_event("SIM000", 1_760_000_000.0))
+    for _ in range(50):
+        if len(attempts) >= 3 and not store._buffer:
+            break
+        await asyncio.sleep(0.02)
+
+    assert len(attempts) == 3
+    assert store._failures == 0
+    assert len(read_events(root=root)["event_id"]) == 1
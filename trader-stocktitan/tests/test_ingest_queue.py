@@ -0,0 +1,25 @@
+import asyncio
+from news_listener import ingest_queue
+
+async def test_worker_survives_cancelled_item(monkeypatch):
+    handled = []
+
+    async def handle_news(data):
+        if data["id"] == 1:
+            raise asyncio.CancelledError()
+        handled.append(data["id"])
+
+    monkeypatch.setattr(ingest_queue, "handle_news", handle_news)
+    monkeypatch.setattr(ingest_queue, "_news_queue", asyncio.Queue())
+    worker = asyncio.ensure_future(ingest_queue._ingest_worker(1))
+    for news_id in (1, 2):
+        ingest_queue._news_queue.put_nowait((0.0, {"id": news_id}))
+
+    await asyncio.wait_for(ingest_queue._news_queue.join(), 1)
+    assert handled == [2]
+    assert not worker.done()
+
+    # 워커 자체 취소는 그대로 종료
+    worker.cancel()
+    await asyncio.gather(worker, return_exceptions=True)
+    assert worker.cancelled()
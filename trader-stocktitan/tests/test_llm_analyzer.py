@@ -0,0 +1,72 @@
+import asyncio
+import pytest
+from news_listener import llm_analyzer, news_handler, price_monitor
+from news_listener.llm_analyzer import EarlyFieldParser, get_default_analysis
+from news_listener.scheduler import MinuteScheduler
+from .conftest import make_event
+
+STREAMED = ['{"rating": 5, "sent', 'iment": "positive", "impact": "high", ', '"analysis": "긴 한국어 분석 본문']
+
+def stream_then(error: Exception):
+    """STREAMED 조각을 흘려보낸 뒤 error를 발생시키는 chat_completion_with_usage 대체"""
+    async def fake_completion(name, messages, deadline, on_delta=None, **kwargs):
+        for delta in STREAMED:
+            if on_delta is not None:
+                on_delta(delta)
+            await asyncio.sleep(0)
+        raise error
+    return fake_completion
+
+def test_early_field_parser_fires_once_when_all_fields_complete():
+    fired = []
+    parser = EarlyFieldParser(fired.append)
+    parser.feed('{"rating": 4, "sentiment": "neg')
+    assert fired == [] and parser.fields == {"rating": 4}
+    parser.feed('ative", "impact": "low", "analysis": "')
+    parser.feed('더 많은 본문')
+    assert fired == [{"rating": 4, "sentiment": "negative", "impact": "low"}]
+
+async def test_timeout_keeps_streamed_fields_as_partial_result(monkeypatch):
+    monkeypatch.setattr(llm_analyzer, "chat_completion_with_usage", stream_then(asyncio.TimeoutError()))
+    fired = []
+    result, tokens, cacheable = await llm_analyzer._analyze_news_uncached(
+        {"symbol": "SIM001", "title": "t", "content": "c"}, on_fields=fired.append
+    )
+    assert fired and fired[0]["rating"] == 5
+    assert result["partial"] and not result.get("fallback")
+    assert (result["rating"], result["sentiment"], result["impact"]) == (5, "positive", "high")
+    assert not cacheable
+
+async def test_timeout_before_any_field_returns_default(monkeypatch):
+    async def slow_completion(name, messages, deadline, on_delta=None, **kwargs):
+        raise asyncio.TimeoutError()
+
+    monkeypatch.setattr(llm_analyzer, "chat_completion_with_usage", slow_completion)
+    result, _, cacheable = await llm_analyzer._analyze_news_uncached({"symbol": "SIM001"}, on_fields=lambda fields: None)
+    assert result["fallback"] and result["rating"] == 3
+    assert not cacheable
+
+@pytest.fixture
+async def scheduler(monkeypatch, simulator):
+    scheduler = MinuteScheduler()
+    monkeypatch.setattr(news_handler, "monitor_scheduler", scheduler)
+    monkeypatch.setattr(price_monitor, "monitor_scheduler", scheduler)
+    scheduler.start()
+    yield scheduler
+    scheduler._task.cancel()
+
+async def test_handler_does_not_overwrite_preliminary_rating_with_default(scheduler, simulator, monkeypatch):
+    async def analyze(news, on_fields=None, model=None):
+        on_fields({"rating": 1, "sentiment": "negative", "impact": "high"})
+        await asyncio.sleep(0)
+        return get_default_analysis("시간 초과")
+
+    monkeypatch.setattr(news_handler, "analyze_news_with_gpt", analyze)
+    event = make_event("SIM001", news_ts=simulator.now())
+    data = {"payload": {"news": event.news, "stock": {"marketCap": 1}}}
+    assert await news_handler.handle_news(data) == event.event_id
+
+    window, = scheduler.windows_for("SIM001")
+    assert window.record.llm_rating == 1
+    assert window.event.llm_result["partial"]
+    assert window.event.llm_result["sentiment"] == "negative"
@@ -0,0 +1,91 @@
+import asyncio
+import time
+import pytest
+from news_listener.llm_cache import LLMResultCache, news_cache_key
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "llm_cache.sqlite3")
+
+async def test_get_or_compute_caches_result(cache_path):
+    cache = LLMResultCache(path=cache_path, ttl=60, memory_size=8)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return {"rating": 4}, 120, True
+
+    assert await cache.get_or_compute("test", "key", compute) == {"rating": 4}
+    assert await cache.get_or_compute("test", "key", compute) == {"rating": 4}
+    assert len(calls) == 1
+
+    # 메모리가 비어도 SQLite에서 다시 읽음
+    reopened = LLMResultCache(path=cache_path, ttl=60, memory_size=8)
+    assert reopened.get("key") == ({"rating": 4}, 120)
+
+async def test_concurrent_requests_share_one_computation(cache_path):
+    cache = LLMResultCache(path=cache_path, ttl=60, memory_size=8)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return {"rating": 2}, 50, True
+
+    results = await asyncio.gather(*(cache.get_or_compute("test", "key", compute) for _ in range(5)))
+    assert results == [{"rating": 2}] * 5
+    assert len(calls) == 1
+
+async def test_uncacheable_result_is_not_stored(cache_path):
+    cache = LLMResultCache(path=cache_path, ttl=60, memory_size=8)
+
+    async def fallback():
+        return {"rating": 3, "analysis": "분석 실패"}, 10, False
+
+    await cache.get_or_compute("test", "key", fallback)
+    assert cache.get("key") is None
+
+async def test_failed_computation_is_not_cached(cache_path):
+    cache = LLMResultCache(path=cache_path, ttl=60, memory_size=8)
+
+    async def failing():
+        raise RuntimeError("api error")
+
+    with pytest.raises(RuntimeError):
+        await cache.get_or_compute("test", "key", failing)
+    assert cache.get("key") is None
+    assert "key" not in cache._inflight
+
+def test_expired_entries_are_ignored(cache_path, monkeypatch):
+    cache = LLMResultCache(path=cache_path, ttl=10, memory_size=8)
+    cache.put("key", {"rating": 1}, 5)
+    later = time.time() + 11
+    monkeypatch.setattr(time, "time", lambda: later)
+    assert cache.get("key") is None
+
+def test_news_cache_key_ignores_whitespace_and_case():
+    first = news_cache_key({"title": "Acme  Announces Merger", "content": "Body"})
+    second = news_cache_key({"title": "acme announces merger", "content": " body "})
+    assert first == second
+    assert news_cache_key({"title": "Acme", "content": "Body"}, namespace="other") != news_cache_key({"title": "Acme", "content": "Body"})
+
+async def test_waiters_recompute_when_owner_is_cancelled(cache_path):
+    cache = LLMResultCache(path=cache_path, ttl=60, memory_size=8)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"rating": 5}, 30, True
+
+    owner = asyncio.ensure_future(cache.get_or_compute("test", "key", compute))
+    await asyncio.sleep(0)
+    waiters = [asyncio.ensure_future(cache.get_or_compute("test", "key", compute)) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    owner.cancel()
+
+    assert await asyncio.gather(*waiters) == [{"rating": 5}] * 3
+    assert owner.cancelled()
+    # 취소된 계산 1번 + 대기자 중 하나가 다시 계산 1번
+    assert len(calls) == 2
+    assert "key" not in cache._inflight
@@ -0,0 +1,79 @@
+import asyncio
+import json
+import openai
+import pytest
+from aiohttp.test_utils import TestServer
+from news_listener import llm_client, llm_scheduler
+from news_listener.llm_client import PriorityGate, PRIORITY_CRITICAL, PRIORITY_BACKGROUND
+from news_listener.llm_scheduler import RetrospectiveScheduler
+from news_listener.llm_standin import StandinState, create_app
+
+MESSAGES = [{"role": "user", "content": "review"}]
+
+@pytest.fixture
+async def standin(monkeypatch):
+    """로컬 스탠드인 서버를 띄우고 llm_client가 그 서버를 쓰도록 바꿉니다."""
+    state = StandinState(latency_ms=30, batch_delay=0.05, chunk_ms=1)
+    server = TestServer(create_app(state))
+    await server.start_server()
+    client = openai.AsyncOpenAI(api_key="standin", base_url=str(server.make_url("/v1")), max_retries=0)
+    monkeypatch.setattr(llm_client, "client", client)
+    monkeypatch.setattr(llm_scheduler, "LLM_BATCH_POLL_SECONDS", 0.01)
+    yield server
+    await client.close()
+    await server.close()
+
+async def test_critical_call_preempts_queued_background_calls(standin, monkeypatch):
+    monkeypatch.setattr(llm_client, "llm_gate", PriorityGate(limit=1, background_limit=1))
+    finished = []
+
+    async def call(label: str, priority: int):
+        await llm_client.chat_completion(label, MESSAGES, deadline=5, priority=priority)
+        finished.append(label)
+
+    async def until_waiting(priority: int, count: int):
+        while llm_client.llm_gate.waiting(priority) < count:
+            await asyncio.sleep(0.001)
+
+    running = asyncio.ensure_future(call("background-0", PRIORITY_BACKGROUND))
+    queued = [asyncio.ensure_future(call(f"background-{i}", PRIORITY_BACKGROUND)) for i in (1, 2)]
+    await asyncio.wait_for(until_waiting(PRIORITY_BACKGROUND, 2), 1)
+    critical = asyncio.ensure_future(call("critical", PRIORITY_CRITICAL))
+    await asyncio.wait_for(until_waiting(PRIORITY_CRITICAL, 1), 1)
+    assert llm_client.llm_gate.active == 1
+
+    await asyncio.gather(running, critical, *queued)
+    assert finished == ["background-0", "critical", "background-1", "background-2"]
+
+async def test_batch_api_answers_coalesced_requests(standin):
+    app = standin.app
+    scheduler = RetrospectiveScheduler(defer_seconds=0.01, batch_size=10, use_batch_api=True)
+    first = scheduler.submit("review", MESSAGES)
+    duplicate = scheduler.submit("review", MESSAGES)
+    other = scheduler.submit("review", [{"role": "user", "content": "other"}])
+    assert first is duplicate
+
+    results = await asyncio.wait_for(asyncio.gather(first, other), 5)
+    assert all("analysis" in json.loads(result) for result in results)
+    state = app["state"]
+    assert [batch["status"] for batch in state.batches.values()] == ["completed"]
+    assert state.requests == 0
+    # 끝난 배치 작업은 서버 작업 목록에서 빠짐
+    assert not app["tasks"]
+
+async def test_expired_batch_falls_back_to_individual_calls(standin, monkeypatch):
+    app = standin.app
+    state = app["state"]
+    state.batch_delay = 0.3
+    monkeypatch.setattr(llm_scheduler, "LLM_BATCH_MAX_WAIT", 0.05)
+    scheduler = RetrospectiveScheduler(defer_seconds=0.01, batch_size=10, use_batch_api=True)
+    futures = [scheduler.submit("review", [{"role": "user", "content": f"review {i}"}]) for i in range(3)]
+
+    results = await asyncio.wait_for(asyncio.gather(*futures), 5)
+    assert len(results) == 3
+    assert [batch["status"] for batch in state.batches.values()] == ["cancelled"]
+    assert state.requests == 3
+
+    # 취소된 배치 작업도 끝나면 서버 작업 목록에서 빠짐
+    await asyncio.sleep(0.3)
+    assert not app["tasks"]
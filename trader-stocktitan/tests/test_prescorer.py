@@ -0,0 +1,80 @@
+import random
+import numpy as np
+from news_listener.event_store import EventStore
+from news_listener.prescorer import (
+    HeadlinePrescorer, headline_features, label_analysis, load_examples, ROUTE_DROP, ROUTE_CHEAP, ROUTE_FULL
+)
+from .conftest import make_event
+
+def synthetic_headlines(count: int, seed: int = 0) -> tuple:
+    """중요 헤드라인(인수/승인/실적 급증)과 일상 헤드라인이 섞인 합성 데이터"""
+    rng = random.Random(seed)
+    important = ["announces acquisition by", "receives FDA approval for", "reports record revenue growth in"]
+    routine = ["to present at investor conference", "announces date of annual meeting", "to participate in webcast"]
+    titles, labels = [], []
+    for i in range(count):
+        label = rng.random() < 0.3
+        phrase = rng.choice(important if label else routine)
+        titles.append(f"SIM{i % 50:03d} {phrase} Q{rng.randint(1, 4)} {rng.randint(2020, 2026)}")
+        labels.append(int(label))
+    return titles, labels
+
+def test_headline_features_normalize_digits():
+    assert headline_features("Q3 2025 results").tolist() == headline_features("Q4 2026 RESULTS").tolist()
+
+def test_label_analysis():
+    assert label_analysis({"rating": 5}) == 1
+    assert label_analysis({"rating": 3, "impact": "high"}) == 1
+    assert label_analysis({"rating": 3, "impact": "low"}) == 0
+    assert label_analysis({"rating": 3, "analysis": "분석 실패: JSON 파싱 오류"}) is None
+    assert label_analysis(None) is None
+
+def test_fit_separates_important_headlines():
+    titles, labels = synthetic_headlines(400)
+    prescorer = HeadlinePrescorer(path="unused.npz", drop_below=0.1, full_above=0.4).fit(titles[:300], labels[:300])
+    result = prescorer.evaluate(titles[300:], labels[300:])
+    assert result["auc"] > 0.95
+    assert result["dropped_positive_rate"] == 0.0
+
+def test_save_load_roundtrip(tmp_path):
+    titles, labels = synthetic_headlines(200)
+    path = str(tmp_path / "prescorer.npz")
+    trained = HeadlinePrescorer(path=path).fit(titles, labels)
+    trained.save()
+
+    loaded = HeadlinePrescorer(path=path)
+    assert loaded.load()
+    assert abs(loaded.score(titles[0]) - trained.score(titles[0])) < 1e-6
+
+def test_routes():
+    prescorer = HeadlinePrescorer(path="missing.npz", drop_below=0.1, full_above=0.4)
+    # 모델이 없으면 모든 뉴스를 전체 모델로
+    assert not prescorer.load()
+    assert prescorer.route("anything")["route"] == ROUTE_FULL
+    assert [prescorer.route_for(score) for score in (0.05, 0.2, 0.9)] == [ROUTE_DROP, ROUTE_CHEAP, ROUTE_FULL]
+
+def test_explore_sends_low_scores_to_full_model():
+    titles, _ = synthetic_headlines(100)
+    prescorer = HeadlinePrescorer(path="unused.npz", drop_below=0.1, full_above=0.4, explore_rate=0.5, seed=1)
+    # 모든 헤드라인이 버림 구간 점수가 되도록 (약 0.007)
+    prescorer.weights, prescorer.bias = np.zeros(1 << prescorer.hash_bits, dtype=np.float32), -5.0
+    routes = [prescorer.route(title) for title in titles]
+
+    explored = [route for route in routes if route.get("explore")]
+    assert 20 < len(explored) < 80
+    assert all(route["route"] == ROUTE_FULL and route["explore"] == ROUTE_DROP for route in explored)
+    assert all(route["route"] == ROUTE_DROP for route in routes if not route.get("explore"))
+
+async def test_load_examples_skips_cheap_routed_rows(tmp_path):
+    store = EventStore(str(tmp_path), batch_size=100, flush_seconds=60)
+    for i, (route, rating) in enumerate([(ROUTE_FULL, 5), (ROUTE_CHEAP, 5), (None, 3)]):
+        event = make_event(f"SIM00{i}", news_ts=1_760_000_000.0 + i * 60)
+        event.prescore = {"score": 0.5, "route": route} if route else {}
+        event.llm_result = {"rating": rating, "impact": "low"}
+        store.append(event)
+    await store.flush()
+
+    examples = load_examples(str(tmp_path))
+    assert sorted((title, label) for _, title, label in examples) == [
+        ("SIM000 announces results", 1), ("SIM002 announces results", 0)
+    ]
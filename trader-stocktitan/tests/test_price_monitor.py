@@ -0,0 +1,47 @@
+import asyncio
+import pytest
+from news_listener import price_monitor
+from news_listener.checkpoint import serialize_window, serialize_context, save_checkpoint, append_contexts, load_checkpoint
+from news_listener.scheduler import MinuteScheduler, MonitorWindow
+from .conftest import make_event
+
+@pytest.fixture
+async def scheduler(monkeypatch, simulator):
+    """테스트마다 새 스케줄러 (프로세스 전역 스케줄러 대신 사용)"""
+    scheduler = MinuteScheduler()
+    monkeypatch.setattr(price_monitor, "monitor_scheduler", scheduler)
+    monkeypatch.setattr(price_monitor, "_resumed", False)
+    scheduler.start()
+    yield scheduler
+    scheduler._task.cancel()
+
+@pytest.fixture
+def checkpoint_path(tmp_path, monkeypatch, simulator):
+    """진행 중인 창 하나가 들어 있는 체크포인트"""
+    path = str(tmp_path / "checkpoint.json")
+    event = make_event("SIM001", news_ts=simulator.now() - 30)
+    event.llm_result = {"rating": 4, "sentiment": "positive"}
+    window = MonitorWindow(event, on_complete=price_monitor.finish_post_news_window)
+    window.history_done = True
+    append_contexts([serialize_context(event)], path)
+    save_checkpoint([serialize_window(window)], path)
+    monkeypatch.setattr(price_monitor, "load_checkpoint", lambda: load_checkpoint(path))
+    return path
+
+async def test_resume_runs_once_per_process(scheduler, checkpoint_path):
+    assert await price_monitor.resume_monitoring() == 1
+    # 재연결로 main()이 다시 돌아도 창이 중복 등록되지 않음
+    assert await price_monitor.resume_monitoring() == 0
+    assert len(scheduler.windows_for("SIM001")) == 1
+
+async def test_resume_skips_registered_event_ids(scheduler, checkpoint_path, monkeypatch):
+    assert await price_monitor.resume_monitoring() == 1
+    monkeypatch.setattr(price_monitor, "_resumed", False)
+    assert await price_monitor.resume_monitoring() == 0
+    assert len(scheduler.windows_for("SIM001")) == 1
+
+async def test_resumed_window_keeps_news_context(scheduler, checkpoint_path):
+    await price_monitor.resume_monitoring()
+    window, = scheduler.windows_for("SIM001")
+    assert window.event.news["title"] == "SIM001 announces results"
+    assert window.event.llm_result["rating"] == 4
@@ -0,0 +1,83 @@
+import asyncio
+from datetime import datetime
+import pytest
+from news_listener import market_data
+from news_listener.market_data import MarketDataProvider
+from news_listener.quote_cache import QuoteSnapshot
+
+class CountingProvider(MarketDataProvider):
+    """배치 조회 호출을 기록하는 시세 제공자"""
+    name = "counting"
+
+    def __init__(self, fail: bool = False):
+        self.batches = []
+        self.fail = fail
+
+    async def get_realtime_data_batch(self, symbols: list) -> dict:
+        self.batches.append(sorted(symbols))
+        await asyncio.sleep(0.01)
+        if self.fail:
+            raise RuntimeError("upstream down")
+        return {symbol: {'price': 10.0, 'volume': 100.0, 'timestamp': datetime.now()} for symbol in symbols}
+
+@pytest.fixture
+def provider():
+    previous = market_data.get_provider()
+    provider = CountingProvider()
+    market_data.set_provider(provider)
+    yield provider
+    market_data.set_provider(previous)
+
+async def test_concurrent_requests_share_one_batch(provider):
+    snapshot = QuoteSnapshot(ttl=5, batch_window=0.01)
+    results = await asyncio.gather(
+        snapshot.get("AAA"), snapshot.get("AAA"), snapshot.get("BBB"), snapshot.get_many(["AAA", "CCC"])
+    )
+    assert provider.batches == [["AAA", "BBB", "CCC"]]
+    assert results[0]["price"] == 10.0
+    assert set(results[3]) == {"AAA", "CCC"}
+
+async def test_snapshot_served_within_ttl(provider):
+    snapshot = QuoteSnapshot(ttl=5, batch_window=0.0)
+    await snapshot.get("AAA")
+    await snapshot.get("AAA")
+    assert provider.batches == [["AAA"]]
+
+async def test_failed_batch_returns_empty_quotes_and_is_not_cached(provider):
+    provider.fail = True
+    snapshot = QuoteSnapshot(ttl=5, batch_window=0.0)
+    quote = await snapshot.get("AAA")
+    assert quote["price"] is None
+
+    provider.fail = False
+    assert (await snapshot.get("AAA"))["price"] == 10.0
+    assert len(provider.batches) == 2
+
+async def test_webull_batch_falls_back_only_for_unresolved_symbols(monkeypatch):
+    from news_listener import webull_client
+
+    async def get_ticker_id(symbol, persist=True):
+        if symbol == "BAD":
+            raise ValueError(f"티커 ID를 찾을 수 없음: {symbol}")
+        return f"id-{symbol}"
+
+    batches, fallback = [], []
+
+    async def call_webull(endpoint, func, symbol_ids):
+        batches.append(dict(symbol_ids))
+        return {symbol: {"close": "10.5", "volume": "100"} for symbol in symbol_ids}
+
+    async def get_realtime_data(symbol):
+        fallback.append(symbol)
+        return {'price': None, 'volume': None, 'timestamp': datetime.now()}
+
+    monkeypatch.setattr(webull_client, "WB_EMAIL", "user")
+    monkeypatch.setattr(webull_client, "WB_PASSWORD", "secret")
+    monkeypatch.setattr(webull_client, "_get_ticker_id", get_ticker_id)
+    monkeypatch.setattr(webull_client, "_call_webull", call_webull)
+    monkeypatch.setattr(webull_client, "get_realtime_data", get_realtime_data)
+
+    results = await webull_client.get_realtime_data_batch(["AAA", "BAD", "BBB"])
+    assert batches == [{"AAA": "id-AAA", "BBB": "id-BBB"}]
+    assert fallback == ["BAD"]
+    assert results["AAA"]["price"] == 10.5 and results["BAD"]["price"] is None
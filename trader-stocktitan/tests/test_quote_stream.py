@@ -0,0 +1,141 @@
+import asyncio
+import time
+from datetime import datetime
+import pytest
+from news_listener import market_data, quote_cache
+from news_listener.market_data import MarketDataProvider
+from news_listener.quote_cache import QuoteSnapshot
+from news_listener.quote_stream import BarAggregator, FakeQuoteStream, StreamingQuoteService, _parse_push_message
+
+T0 = 1_760_000_000 - 1_760_000_000 % 60
+
+async def wait_until(condition, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "조건이 시간 안에 충족되지 않음"
+        await asyncio.sleep(0.01)
+
+def test_aggregator_builds_minute_bars():
+    aggregator = BarAggregator(history=10)
+    aggregator.on_tick("AAA", 10.0, 100, 1000, T0 + 1)
+    aggregator.on_tick("AAA", 10.5, 50, 1050, T0 + 20)
+    aggregator.on_tick("AAA", 9.8, 25, 1075, T0 + 59)
+    aggregator.on_tick("AAA", 10.1, 10, 1085, T0 + 61)
+
+    first, current = aggregator.get_bars("AAA")
+    assert first.to_dict() == {"minute": T0, "open": 10.0, "high": 10.5, "low": 9.8, "close": 9.8, "volume": 175}
+    assert (current.minute, current.open, current.volume) == (T0 + 60, 10.1, 10)
+    assert aggregator.get_bars("AAA", include_current=False) == [first]
+    assert aggregator.latest("AAA") == (T0 + 61, 10.1, 1085)
+
+def test_aggregator_accumulates_day_volume_when_missing():
+    aggregator = BarAggregator()
+    aggregator.on_tick("AAA", 10.0, 100, None, T0)
+    aggregator.on_tick("AAA", 10.0, 40, None, T0 + 1)
+    assert aggregator.latest("AAA")[2] == 140
+
+def test_aggregator_keeps_bounded_history_and_drops_symbols():
+    aggregator = BarAggregator(history=3)
+    for minute in range(6):
+        aggregator.on_tick("AAA", 10.0 + minute, 1, None, T0 + minute * 60)
+    bars = aggregator.get_bars("AAA", include_current=False)
+    assert [bar.minute for bar in bars] == [T0 + 60 * m for m in (2, 3, 4)]
+    aggregator.drop("AAA")
+    assert aggregator.get_bars("AAA") == [] and aggregator.latest("AAA") is None
+
+def test_parse_push_message():
+    assert _parse_push_message({"deal": {"price": "12.5", "volume": "300"}, "volume": "10000"}) == (12.5, 300.0, 10000.0)
+    assert _parse_push_message({"close": "12.4"}) == (12.4, 0.0, None)
+    assert _parse_push_message({"pPrice": "12.6", "volume": "5"})[0] == 12.6
+    assert _parse_push_message({})[0] is None
+
+@pytest.fixture
+async def service():
+    service = StreamingQuoteService(FakeQuoteStream(tick_interval=0.01), reconnect_base=0.02, reconnect_max=0.05)
+    yield service
+    for symbol in list(service._refcounts):
+        await service.release(symbol)
+    if service._reconnect_task is not None:
+        service._reconnect_task.cancel()
+
+async def test_fake_feed_ticks_flow_into_quotes(service):
+    await service.start()
+    await service.acquire("AAA")
+    await wait_until(lambda: service.get_quote("AAA") is not None)
+
+    quote = service.get_quote("AAA")
+    received_at = service.aggregator.latest("AAA")[0]
+    # 시세 시각은 조회 시각이 아니라 틱 수신 시각
+    assert quote["timestamp"] == datetime.fromtimestamp(received_at)
+    assert quote["price"] > 0 and quote["volume"] > 0
+    assert service.aggregator.get_bars("AAA")
+
+async def test_refcounted_subscription(service):
+    await service.start()
+    await service.acquire("AAA")
+    await service.acquire("AAA")
+    await service.release("AAA")
+    assert "AAA" in service.source._tasks
+    await service.release("AAA")
+    assert "AAA" not in service.source._tasks
+    assert service.get_quote("AAA") is None
+
+async def test_stale_tick_is_not_served(service):
+    await service.start()
+    service.aggregator.on_tick("AAA", 10.0, 1, 100, time.time() - 120)
+    assert service.get_quote("AAA", max_age=60) is None
+    assert service.get_quote("AAA", max_age=300)["timestamp"] < datetime.now()
+
+async def test_reconnects_after_failed_start_and_subscribes_pending_symbols(service):
+    service.source.fail_starts = 2
+    await service.start()
+    assert not service.connected
+
+    # 끊긴 동안 들어온 구독은 연결 후 처리
+    await service.acquire("AAA")
+    await wait_until(lambda: service.connected)
+    await wait_until(lambda: service.get_quote("AAA") is not None)
+
+async def test_resubscribes_after_disconnect(service):
+    await service.start()
+    await service.acquire("AAA")
+    await wait_until(lambda: service.get_quote("AAA") is not None)
+
+    service.source.disconnect()
+    assert not service.connected
+    assert "AAA" not in service.source._tasks
+
+    await wait_until(lambda: service.connected)
+    await wait_until(lambda: "AAA" in service.source._tasks)
+    ticks_at = service.aggregator.latest("AAA")[0]
+    await wait_until(lambda: service.aggregator.latest("AAA")[0] > ticks_at)
+
+class PollingProvider(MarketDataProvider):
+    """폴링 대체 조회를 기록하는 시세 제공자"""
+    name = "polling"
+
+    def __init__(self):
+        self.polled = []
+
+    async def get_realtime_data_batch(self, symbols: list) -> dict:
+        self.polled.extend(symbols)
+        return {symbol: {'price': 99.0, 'volume': 1.0, 'timestamp': datetime.now()} for symbol in symbols}
+
+async def test_quote_snapshot_falls_back_to_polling_when_stream_is_stale(service, monkeypatch):
+    provider = PollingProvider()
+    previous = market_data.get_provider()
+    market_data.set_provider(provider)
+    monkeypatch.setattr(quote_cache, "streaming_quotes", service)
+    try:
+        await service.start()
+        now = time.time()
+        service.aggregator.on_tick("FRESH", 10.0, 1, 100, now)
+        service.aggregator.on_tick("STALE", 20.0, 1, 100, now - 600)
+
+        quotes = await QuoteSnapshot(ttl=5, batch_window=0.0).get_many(["FRESH", "STALE"])
+        assert quotes["FRESH"]["price"] == 10.0
+        assert quotes["FRESH"]["timestamp"] == datetime.fromtimestamp(now)
+        assert quotes["STALE"]["price"] == 99.0
+        assert provider.polled == ["STALE"]
+    finally:
+        market_data.set_provider(previous)
@@ -0,0 +1,74 @@
+import asyncio
+import time
+import pytest
+from news_listener.rate_limiter import TokenBucket, CircuitBreaker, CircuitOpenError, RateLimiter
+
+def make_limiter(threshold: int = 2, cooldown: float = 0.05, max_retries: int = 2, budgets: dict = None):
+    breaker = CircuitBreaker("test", threshold=threshold, cooldown=cooldown)
+    return RateLimiter("test", budgets or {}, max_concurrency=4, max_retries=max_retries,
+                       backoff_base=0.001, breaker=breaker)
+
+async def failing():
+    raise RuntimeError("upstream error")
+
+async def succeeding():
+    return "ok"
+
+async def test_token_bucket_allows_burst_then_paces():
+    bucket = TokenBucket(rate=50, burst=3)
+    started_at = time.monotonic()
+    for _ in range(3):
+        assert await bucket.acquire() == 0.0
+    waited = await bucket.acquire()
+    assert waited > 0
+    assert time.monotonic() - started_at >= 0.015
+
+async def test_breaker_counts_one_failure_per_logical_call():
+    limiter = make_limiter(threshold=2, max_retries=2)
+    with pytest.raises(RuntimeError):
+        await limiter.call("quote", failing)
+    # 재시도 3번이 실패 1번으로 기록됨
+    assert limiter.breaker.failures == 1
+    assert limiter.breaker.state == CircuitBreaker.CLOSED
+
+    with pytest.raises(RuntimeError):
+        await limiter.call("quote", failing)
+    assert limiter.breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        await limiter.call("quote", succeeding)
+
+async def test_breaker_half_open_trial_success_closes():
+    limiter = make_limiter(threshold=1, max_retries=0)
+    with pytest.raises(RuntimeError):
+        await limiter.call("quote", failing)
+    await asyncio.sleep(0.06)
+    assert await limiter.call("quote", succeeding) == "ok"
+    assert limiter.breaker.state == CircuitBreaker.CLOSED
+
+async def test_breaker_recovers_after_cancelled_trial():
+    limiter = make_limiter(threshold=1, max_retries=0)
+    with pytest.raises(RuntimeError):
+        await limiter.call("quote", failing)
+    await asyncio.sleep(0.06)
+
+    trial = asyncio.create_task(limiter.call("quote", asyncio.sleep, 10))
+    await asyncio.sleep(0.01)
+    assert limiter.breaker.state == CircuitBreaker.HALF_OPEN
+    # 시험 호출이 진행 중이면 다른 호출은 거부
+    with pytest.raises(CircuitOpenError):
+        await limiter.call("quote", succeeding)
+
+    trial.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await trial
+
+    # 취소된 시험 호출이 자리를 반환해서 다음 호출이 다시 시험할 수 있음
+    assert await limiter.call("quote", succeeding) == "ok"
+    assert limiter.breaker.state == CircuitBreaker.CLOSED
+
+async def test_limiter_applies_endpoint_budget():
+    limiter = make_limiter(budgets={"quote": (100, 1)})
+    started_at = time.monotonic()
+    for _ in range(3):
+        await limiter.call("quote", succeeding)
+    assert time.monotonic() - started_at >= 0.015
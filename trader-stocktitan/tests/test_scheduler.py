@@ -0,0 +1,64 @@
+import asyncio
+import math
+import pytest
+from news_listener import scheduler as scheduler_module
+from news_listener.scheduler import MinuteScheduler, MonitorWindow
+from .conftest import make_event
+
+@pytest.fixture
+async def scheduler(simulator):
+    scheduler = MinuteScheduler()
+    scheduler.start()
+    yield scheduler
+    scheduler._task.cancel()
+
+async def test_windows_complete_on_simulator_clock(scheduler, simulator):
+    completed = []
+
+    async def on_complete(window):
+        completed.append(window)
+
+    for i in range(3):
+        event = make_event(f"SIM00{i}", news_ts=simulator.now())
+        scheduler.add_window(MonitorWindow(event, on_complete=on_complete, minutes=3))
+
+    # 600배속: 3분 창은 실제 약 0.3초
+    for _ in range(50):
+        if len(completed) == 3:
+            break
+        await asyncio.sleep(0.05)
+
+    assert len(completed) == 3
+    for window in completed:
+        assert window.samples == 3
+        assert not any(math.isnan(value) for value in window.record.pct_p[:3])
+    await asyncio.sleep(0)
+    assert scheduler.windows_for("SIM000") == set()
+
+async def test_tick_keeps_windows_when_batch_fetch_fails(scheduler, simulator, monkeypatch):
+    completed = []
+
+    async def on_complete(window):
+        completed.append(window)
+
+    calls = []
+    original = scheduler_module.quote_snapshot.get_many
+
+    async def flaky_get_many(symbols):
+        calls.append(symbols)
+        if len(calls) == 1:
+            raise RuntimeError("upstream down")
+        return await original(symbols)
+
+    monkeypatch.setattr(scheduler_module.quote_snapshot, "get_many", flaky_get_many)
+    scheduler.add_window(MonitorWindow(make_event("SIM010", news_ts=simulator.now()), on_complete=on_complete, minutes=2))
+
+    for _ in range(50):
+        if completed:
+            break
+        await asyncio.sleep(0.05)
+
+    window, = completed
+    assert window.samples == 2
+    assert math.isnan(window.record.pct_p[0])
+    assert not math.isnan(window.record.pct_p[1])
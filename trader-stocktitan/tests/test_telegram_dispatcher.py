@@ -0,0 +1,63 @@
+import time
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from news_listener.telegram_dispatcher import TelegramDispatcher
+
+@pytest.fixture
+async def bot_api():
+    """봇 API 흉내: 본문이 "429"로 시작하는 메시지는 처음 한 번 429(retry_after), 그 외는 성공"""
+    received = []
+
+    async def handler(request):
+        payload = await request.json()
+        throttled = payload["text"].startswith("429") and not any(sent["text"] == payload["text"] for _, sent, _ in received)
+        received.append((request.match_info["method"], payload, time.monotonic()))
+        if throttled:
+            return web.json_response(
+                {"ok": False, "error_code": 429, "description": "Too Many Requests", "parameters": {"retry_after": 0.1}},
+                status=429
+            )
+        return web.json_response({"ok": True, "result": {"message_id": len(received)}})
+
+    app = web.Application()
+    app.router.add_post("/bot{token}/{method}", handler)
+    server = TestServer(app)
+    await server.start_server()
+    yield str(server.make_url("")).rstrip("/"), received
+    await server.close()
+
+async def test_429_waits_retry_after_then_delivers(bot_api):
+    api_url, received = bot_api
+    dispatcher = TelegramDispatcher(chat_rate=100, chat_burst=10, global_rate=100, max_retries=2, api_url=api_url)
+    try:
+        result = await dispatcher.submit("token", "chat", "sendMessage", {"text": "429 hello"})
+        assert result == {"message_id": 2}
+        assert len(received) == 2
+        assert received[1][2] - received[0][2] >= 0.1
+        assert received[1][1] == {"text": "429 hello", "chat_id": "chat"}
+    finally:
+        await dispatcher.close()
+
+async def test_chat_bucket_paces_and_keeps_order(bot_api):
+    api_url, received = bot_api
+    dispatcher = TelegramDispatcher(chat_rate=20, chat_burst=1, global_rate=100, max_retries=2, api_url=api_url)
+    try:
+        futures = [dispatcher.submit("token", "chat", "sendMessage", {"text": str(i)}) for i in range(3)]
+        for future in futures:
+            await future
+        texts = [payload["text"] for _, payload, _ in received]
+        assert texts == ["0", "1", "2"]
+        # 버스트 1, 초당 20건: 두 번째 이후 발송은 0.05초 간격
+        assert received[-1][2] - received[0][2] >= 0.09
+    finally:
+        await dispatcher.close()
+
+async def test_full_queue_drops_message(bot_api):
+    api_url, _ = bot_api
+    dispatcher = TelegramDispatcher(queue_size=1, chat_rate=1, chat_burst=1, global_rate=100, api_url=api_url)
+    try:
+        assert dispatcher.submit("token", "chat", "sendMessage", {"text": "a"}) is not None
+        assert dispatcher.submit("token", "chat", "sendMessage", {"text": "b"}) is None
+    finally:
+        await dispatcher.close()